@@ -1,21 +1,37 @@
+import contextvars
+import math
 import os
-from fpdf import FPDF
-from docx import Document
-from openpyxl import Workbook
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict
 from research_agent.core.llm.base import BaseLLMProvider
 from research_agent.core.llm.factory import get_llm_provider
+from research_agent.core.context.budget import ContextBudgeter, estimate_tokens
+from research_agent.core.reports.markdown import parse_markdown
+from research_agent.core.reports.renderers import FILE_FORMATS, get_render_pool, render_file, reset_render_pool
 from research_agent.config.settings import settings
 
+NO_FINDINGS = "No relevant findings."
+
 class AnalyzerAgent:
     def __init__(self):
-        self.llm: BaseLLMProvider = get_llm_provider()
+        self.llm: BaseLLMProvider = get_llm_provider("report")
         self.output_dir = settings.REPORT_OUTPUT_DIR
+        self.map_llm: BaseLLMProvider = get_llm_provider("report_map")
+        self.budgeter = ContextBudgeter(settings.REPORT_CONTEXT_TOKEN_BUDGET, chunk_tokens=settings.REPORT_CONTEXT_CHUNK_TOKENS)
+        self.map_reduce_budgeter = ContextBudgeter(settings.REPORT_MAP_REDUCE_TOKEN_BUDGET, chunk_tokens=settings.REPORT_CONTEXT_CHUNK_TOKENS)
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def analyze(self, query: str, collected_data: Dict, history: List[Dict] = [], requested_formats: List[str] = ["pdf"], status_callback=None) -> Dict:
+    def analyze(self, query: str, collected_data: Dict, history: List[Dict] = [], requested_formats: List[str] = ["pdf"], status_callback=None, token_callback=None, wait_for_files: bool = True) -> Dict:
         """
         Analyze collected data and generate a report.
+        If token_callback is given, the report is streamed and each chunk of text is passed
+        to it as it arrives; files are rendered once the stream has finished.
+        In map_reduce mode, batches of the collected context are first condensed into findings
+        by parallel LLM calls, and the report is written from those findings.
+        Files are rendered in worker processes. With wait_for_files=False the result is returned
+        as soon as rendering has started, so the caller can do other work meanwhile, and
+        finish_files() fills in the file paths.
         """
         if status_callback:
             status_callback(f"Analyzer Agent: Analyzing collected data for '{query}'...")
@@ -26,15 +42,40 @@ class AnalyzerAgent:
         sources = collected_data.get("sources", [])
         documents = collected_data.get("documents", [])
 
+        passages = collected_data.get("passages") or [context]
+        synthesis_mode = self._synthesis_mode(passages)
+
+        # Keep only the most relevant passages that fit the report prompt budget
+        budget = (self.map_reduce_budgeter if synthesis_mode == "map_reduce" else self.budgeter).pack(query, passages)
+        context = budget["context"]
+        if budget["dropped"]:
+            print(f"DEBUG: Context budget kept {budget['kept']} chunks ({budget['tokens']} tokens), dropped {len(budget['dropped'])}.")
+
+        context_label = "Collected Information"
+        if synthesis_mode == "map_reduce":
+            findings = self._map_findings(query, budget["chunks"], status_callback)
+            if findings:
+                context = findings
+                context_label = "Findings Extracted From The Collected Sources"
+            else:
+                print("DEBUG: No findings from map step, falling back to a single report prompt.")
+                synthesis_mode = "single"
+                budget = self.budgeter.pack(query, passages)
+                context = budget["context"]
+
         # Step 1: Generate Report Content (Markdown)
+        # The collected context goes in the system prompt, ahead of the history and the query, so
+        # providers with prompt caching can reuse it for follow-ups and reformats of the same data.
+        system_prompt = f"""You are a helpful analyst. Write detailed reports.
+
+        {context_label}:
+        {context}
+        """
         report_prompt = f"""
         You are an expert Analyst. Your goal is to synthesize the collected information into a detailed, real-time report.
         
         User Query: {query}
         
-        Collected Information:
-        {context}
-        
         Please generate a comprehensive report in Markdown format.
         Structure the report with:
         - Executive Summary
@@ -42,7 +83,7 @@ class AnalyzerAgent:
         - Key Findings
         - Conclusion
         
-        Do not hallucinate. Base your report strictly on the collected information.
+        Do not hallucinate. Base your report strictly on the {context_label.lower()} in your instructions.
         Do NOT include a references or documents section - this will be added separately.
         """
         
@@ -50,7 +91,10 @@ class AnalyzerAgent:
             status_callback("Generating comprehensive report...")
         print("DEBUG: Calling LLM for report generation...")
         try:
-            report_content = self.llm.generate(report_prompt, history=history, system_prompt="You are a helpful analyst. Write detailed reports.")
+            if token_callback:
+                report_content = self._stream_report(report_prompt, history, system_prompt, token_callback)
+            else:
+                report_content = self.llm.generate(report_prompt, history=history, system_prompt=system_prompt)
             print("DEBUG: Report generated successfully.")
         except Exception as e:
             print(f"DEBUG: Report Generation Failed: {e}")
@@ -58,168 +102,151 @@ class AnalyzerAgent:
         
         # Append Sources to Report Body (properly formatted)
         if sources:
-            report_content += "\n\n## References\n\n"
+            references = "\n\n## References\n\n"
             for source in sources:
-                report_content += f"- [{source['title']}]({source['url']})\n"
+                references += f"- [{source['title']}]({source['url']})\n"
+            report_content += references
+            if token_callback:
+                token_callback(references)
 
-        # Step 2: Generate Files
+        # Step 2: Generate Files, in worker processes
+        file_formats = [fmt for fmt in FILE_FORMATS if fmt == "pdf" or fmt in requested_formats]
         if status_callback:
-            status_callback("Creating PDF report...")
-        pdf_path = self._generate_pdf(query, report_content)
-        
-        docx_path = None
-        if "docx" in requested_formats:
-            if status_callback:
-                status_callback("Creating DOCX report...")
-            docx_path = self._generate_docx(query, report_content)
-            
-        excel_path = None
-        if "excel" in requested_formats:
-            if status_callback:
-                status_callback("Creating Excel data sheet...")
-            excel_path = self._generate_excel(query, sources, documents)
-        
-        return {
+            status_callback(f"Creating {', '.join(fmt.upper() for fmt in file_formats)} report files...")
+        result = {
             "report_content": report_content,
-            "pdf_path": pdf_path,
-            "docx_path": docx_path,
-            "excel_path": excel_path,
+            "pdf_path": None,
+            "docx_path": None,
+            "excel_path": None,
             "sources": sources,
-            "documents": documents
+            "documents": documents,
+            "context_budget": budget,
+            "synthesis_mode": synthesis_mode,
+            "file_jobs": self.render_files(query, report_content, sources, documents, file_formats)
         }
+        return self.finish_files(result) if wait_for_files else result
 
-    def _generate_pdf(self, title: str, content: str) -> str:
+    def render_files(self, title: str, content: str, sources: List[Dict], documents: List[Dict], file_formats: List[str]) -> Dict[str, tuple]:
         """
-        Convert Markdown content to PDF with improved formatting.
+        Start rendering the given file formats in the render process pool.
+        Returns {format: (future, render_file args)}; with REPORT_RENDER_PROCESSES = 0 the files
+        are rendered here and the futures are already done.
         """
-        import re
-        
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        
-        # Title
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(0, 10, f"Research Report: {title}", 0, 1, 'C')
-        pdf.ln(10)
-        
-        # Content
-        pdf.set_font("Arial", size=11)
-        in_references = False
-        
-        for line in content.split('\n'):
-            safe_line = line.encode('latin-1', 'replace').decode('latin-1')
-            
-            # Check if we're entering References section
-            if line.startswith('## References'):
-                in_references = True
-                pdf.ln(5)
-                pdf.set_font("Arial", 'B', 12)
-                pdf.cell(0, 10, 'References', 0, 1)
-                pdf.ln(3)
-                pdf.set_font("Arial", size=11)
-                continue
+        # Parsed once here; every renderer works from the same blocks
+        blocks = parse_markdown(content)
+        jobs = {}
+        for file_format in file_formats:
+            args = (file_format, self.output_dir, title, blocks, sources, documents)
+            future = None
+            if settings.REPORT_RENDER_PROCESSES > 0:
+                try:
+                    future = get_render_pool(settings.REPORT_RENDER_PROCESSES).submit(render_file, *args)
+                except (BrokenProcessPool, RuntimeError) as e:
+                    print(f"DEBUG: Render pool unavailable ({e}), rendering {file_format} in-process.")
+                    reset_render_pool()
+            if future is None:
+                future = Future()
+                try:
+                    future.set_result(render_file(*args))
+                except Exception as e:
+                    future.set_exception(e)
+            jobs[file_format] = (future, args)
+        return jobs
+
+    def finish_files(self, result: Dict) -> Dict:
+        """Wait for the files started by analyze(wait_for_files=False) and fill in their paths."""
+        for file_format, (future, args) in result.pop("file_jobs", {}).items():
+            try:
+                path = future.result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed for memory); render this file here instead
+                print(f"DEBUG: Render worker failed ({e}), rendering {file_format} in-process.")
+                reset_render_pool()
+                path = render_file(*args)
+            result[f"{file_format}_path"] = path
+        return result
+
+    def _synthesis_mode(self, passages: List[str]) -> str:
+        mode = settings.REPORT_SYNTHESIS_MODE.lower()
+        if mode == "auto":
+            # Map-reduce costs a round of LLM calls before the report starts, so it is only used
+            # when a single prompt would drop most of the context and the map step is one wave
+            total = sum(estimate_tokens(p) for p in passages if p.strip())
+            if total <= self.budgeter.token_budget:
+                return "single"
+            dropped_share = 1 - self.budgeter.token_budget / total
+            batches = math.ceil(min(total, self.map_reduce_budgeter.token_budget) / settings.REPORT_MAP_BATCH_TOKENS)
+            if dropped_share >= settings.REPORT_MAP_REDUCE_MIN_DROPPED and batches <= settings.REPORT_MAP_MAX_WORKERS:
+                return "map_reduce"
+            return "single"
+        return "map_reduce" if mode == "map_reduce" else "single"
+
+    @staticmethod
+    def _map_batches(chunks: List[str], batch_tokens: int) -> List[str]:
+        batches, current, used = [], [], 0
+        for chunk in chunks:
+            tokens = estimate_tokens(chunk)
+            if current and used + tokens > batch_tokens:
+                batches.append("\n\n".join(current))
+                current, used = [], 0
+            current.append(chunk)
+            used += tokens
+        if current:
+            batches.append("\n\n".join(current))
+        return batches
+
+    def _map_findings(self, query: str, chunks: List[str], status_callback=None) -> str:
+        """Condense batches of context into cited findings with parallel LLM calls."""
+        batches = self._map_batches(chunks, settings.REPORT_MAP_BATCH_TOKENS)
+        if not batches:
+            return ""
+        if status_callback:
+            status_callback(f"Extracting findings from {len(batches)} source batches...")
+        print(f"DEBUG: Map step over {len(batches)} batches ({settings.REPORT_MAP_MAX_WORKERS} at a time)...")
+
+        def extract(index: int, batch: str) -> str:
+            map_prompt = f"""
+            You are an expert Analyst extracting findings for a report.
             
-            # Handle section headers
-            if line.startswith('# '):
-                pdf.ln(5)
-                pdf.set_font("Arial", 'B', 14)
-                pdf.cell(0, 10, safe_line.replace('# ', ''), 0, 1)
-                pdf.set_font("Arial", size=11)
-            elif line.startswith('## '):
-                pdf.ln(3)
-                pdf.set_font("Arial", 'B', 12)
-                pdf.cell(0, 10, safe_line.replace('## ', ''), 0, 1)
-                pdf.set_font("Arial", size=11)
-            elif line.startswith('- '):
-                # Handle bullet points (especially in References)
-                if in_references:
-                    # Extract link from Markdown: [title](url)
-                    match = re.search(r'\[(.*?)\]\((.*?)\)', line)
-                    if match:
-                        link_text = match.group(1)
-                        link_url = match.group(2)
-                        safe_text = link_text.encode('latin-1', 'replace').decode('latin-1')
-                        
-                        # Create clickable bullet with link
-                        pdf.set_x(15)
-                        pdf.set_font("Arial", 'U', 11)  # Underline for links
-                        pdf.set_text_color(0, 0, 255)   # Blue color for links
-                        
-                        # Add bullet
-                        pdf.write(6, chr(149) + " ")
-                        
-                        # Add clickable link
-                        pdf.cell(0, 6, safe_text, 0, 1, link=link_url)
-                        
-                        # Reset formatting
-                        pdf.set_font("Arial", size=11)
-                        pdf.set_text_color(0, 0, 0)
-                        pdf.ln(2)  # Add spacing between references
-                    else:
-                        pdf.set_x(15)
-                        pdf.multi_cell(0, 6, chr(149) + " " + safe_line.replace('- ', ''))
-                else:
-                    # Regular bullet points
-                    pdf.set_x(15)
-                    pdf.multi_cell(0, 6, chr(149) + " " + safe_line.replace('- ', ''))
-            else:
-                if line.strip():  # Only add non-empty lines
-                    pdf.multi_cell(0, 6, safe_line)
-                
-        filename = f"{self._sanitize_filename(title)}_report.pdf"
-        filepath = os.path.join(self.output_dir, filename)
-        pdf.output(filepath)
-        return filepath
-
-    def _generate_docx(self, title: str, content: str) -> str:
-        """
-        Generate DOCX report.
-        """
-        doc = Document()
-        doc.add_heading(f"Research Report: {title}", 0)
-        
-        for line in content.split('\n'):
-            if line.startswith('# '):
-                doc.add_heading(line.replace('# ', ''), level=1)
-            elif line.startswith('## '):
-                doc.add_heading(line.replace('## ', ''), level=2)
-            elif line.startswith('### '):
-                doc.add_heading(line.replace('### ', ''), level=3)
-            elif line.startswith('- '):
-                doc.add_paragraph(line.replace('- ', ''), style='List Bullet')
-            else:
-                if line.strip():
-                    doc.add_paragraph(line)
-                    
-        filename = f"{self._sanitize_filename(title)}_report.docx"
-        filepath = os.path.join(self.output_dir, filename)
-        doc.save(filepath)
-        return filepath
-
-    def _generate_excel(self, title: str, sources: List[Dict], documents: List[Dict]) -> str:
-        """
-        Generate Excel sheet with sources and documents.
-        """
-        wb = Workbook()
-        
-        # Sources Sheet
-        ws_sources = wb.active
-        ws_sources.title = "Sources"
-        ws_sources.append(["Title", "URL"])
-        for source in sources:
-            ws_sources.append([source.get("title"), source.get("url")])
+            User Query: {query}
             
-        # Documents Sheet
-        ws_docs = wb.create_sheet("Documents")
-        ws_docs.append(["Title", "Type", "URL"])
-        for doc in documents:
-            ws_docs.append([doc.get("title"), doc.get("type"), doc.get("url")])
+            Sources (part {index + 1} of {len(batches)}):
+            {batch}
             
-        filename = f"{self._sanitize_filename(title)}_data.xlsx"
-        filepath = os.path.join(self.output_dir, filename)
-        wb.save(filepath)
-        return filepath
+            List the facts, figures, dates and claims from these sources that are relevant to the query,
+            as concise Markdown bullet points. End each bullet with the source URL in parentheses.
+            If nothing is relevant, answer exactly: {NO_FINDINGS}
+            """
+            return self.map_llm.generate(map_prompt, system_prompt="You are a helpful analyst. Extract findings precisely.")
+
+        findings = []
+        with ThreadPoolExecutor(max_workers=max(1, settings.REPORT_MAP_MAX_WORKERS), thread_name_prefix="report-map") as executor:
+            # Each call runs in a copy of this context so it shares the turn's retry budget
+            futures = [executor.submit(contextvars.copy_context().run, extract, i, batch) for i, batch in enumerate(batches)]
+            for i, future in enumerate(futures):
+                try:
+                    result = (future.result() or "").strip()
+                except Exception as e:
+                    print(f"DEBUG: Findings for batch {i + 1} failed: {e}")
+                    continue
+                if result and NO_FINDINGS.lower() not in result.lower()[:len(NO_FINDINGS) + 10]:
+                    findings.append(result)
+        print(f"DEBUG: Map step produced findings for {len(findings)} of {len(batches)} batches.")
+        return "\n\n".join(findings)
 
-    def _sanitize_filename(self, filename: str) -> str:
-        return "".join([c for c in filename if c.isalpha() or c.isdigit() or c=='_' or c=='.']).rstrip()
+    def _stream_report(self, prompt: str, history: List[Dict], system_prompt: str, token_callback) -> str:
+        """Stream the report, forwarding chunks to token_callback. Keeps partial text if the stream breaks."""
+        parts = []
+        try:
+            for chunk in self.llm.stream(prompt, history=history, system_prompt=system_prompt):
+                if chunk:
+                    parts.append(chunk)
+                    token_callback(chunk)
+        except Exception as e:
+            if not parts:
+                raise
+            print(f"DEBUG: Report stream interrupted: {e}")
+            note = "\n\n*The report was cut short by an error while it was being generated.*"
+            parts.append(note)
+            token_callback(note)
+        return "".join(parts)
@@ -1,32 +1,72 @@
 import json
-from typing import List, Dict
+from itertools import zip_longest
+from typing import Callable, Iterator, List, Dict, Optional
+from research_agent.agent.events import CollectorEvent, SourceFound, DocumentFound, QueryFinished, QueryFailed
 from research_agent.core.llm.base import BaseLLMProvider
-from research_agent.core.search.serper_provider import SerperProvider
-from research_agent.core.search.exa_provider import ExaSearchProvider
+from research_agent.core.search.factory import get_search_provider
+from research_agent.core.search.fanout import SearchFanOut
+from research_agent.core.search.dedupe import ResultDeduplicator
 from research_agent.core.llm.factory import get_llm_provider
+from research_agent.core.llm.json_stream import StreamingArrayParser
+from research_agent.core.cache.store import get_sqlite_cache, make_cache_key
+from research_agent.core.context.budget import tokenize, bm25_scores
+from research_agent.core.documents.ingest import DocumentIngestor
+from research_agent.core.web.fetcher import PageFetcher
 from research_agent.config.settings import settings
 
 class CollectorAgent:
     def __init__(self, use_deep_research: bool = False):
-        self.llm: BaseLLMProvider = get_llm_provider()
+        self.llm: BaseLLMProvider = get_llm_provider("plan")
         self.use_deep_research = use_deep_research
-        
-        if use_deep_research:
-            self.search_tool = ExaSearchProvider()
-        elif settings.DEFAULT_SEARCH_PROVIDER == "mock":
-            from research_agent.core.search.mock_provider import MockSearchProvider
-            self.search_tool = MockSearchProvider()
-        elif settings.DEFAULT_SEARCH_PROVIDER == "tavily":
-            from research_agent.core.search.tavily_provider import TavilySearchProvider
-            self.search_tool = TavilySearchProvider()
-        else:
-            self.search_tool = SerperProvider()
+        self.search_tool = get_search_provider(use_deep_research)
+        self.page_fetcher = PageFetcher() if settings.PAGE_FETCH_ENABLED else None
+        self.document_ingestor = DocumentIngestor() if settings.DOCUMENT_INGEST_ENABLED else None
+        self.plan_cache = None
+        if settings.PLAN_CACHE_ENABLED:
+            self.plan_cache = get_sqlite_cache(settings.PLAN_CACHE_PATH, "search_plans", settings.PLAN_CACHE_MAX_ENTRIES)
 
-    def collect(self, query: str, history: List[Dict] = [], status_callback=None) -> Dict:
+    def collect(self, query: str, history: List[Dict] = [], status_callback=None, plan: Optional[Dict] = None) -> Dict:
         """
         Collect information about the query.
         Returns a dictionary with collected context and sources.
         """
+        collected_data = []
+        sources = []
+        documents = []
+        found_sources = []
+
+        # Ordered so the report context does not depend on which provider answered first
+        for event in self.iter_collect(query, history, status_callback=status_callback, ordered=True, plan=plan):
+            if isinstance(event, SourceFound):
+                found_sources.append((len(collected_data), event))
+                collected_data.append(event.passage)
+                sources.append({"title": event.title, "url": event.url})
+            elif isinstance(event, DocumentFound):
+                documents.append({"title": event.title, "url": event.url, "type": event.type})
+                if event.passage:
+                    collected_data.append(event.passage)
+
+        # Deep research already returns page text; standard search only has snippets
+        if self.page_fetcher and not self.use_deep_research and found_sources:
+            self._read_top_pages(found_sources, collected_data, status_callback)
+
+        if self.document_ingestor and documents:
+            self._read_documents(query, documents, collected_data, status_callback)
+
+        return {
+            "context": "\n\n".join(collected_data),
+            "passages": collected_data,
+            "sources": sources,
+            "documents": documents
+        }
+
+    def iter_collect(self, query: str, history: List[Dict] = [], status_callback=None, ordered: bool = False, plan: Optional[Dict] = None) -> Iterator[CollectorEvent]:
+        """
+        Collect information about the query, yielding events as search results arrive.
+        Yields SourceFound, DocumentFound, QueryFinished and QueryFailed events.
+        With ordered=True, results are yielded in query order instead of arrival order.
+        A plan from plan() can be passed in to skip the planning LLM call.
+        """
         if status_callback:
             status_callback(f"Collector Agent: Analyzing query '{query}'...")
         else:
@@ -41,108 +81,229 @@ class CollectorAgent:
             try:
                 # Exa handles its own multi-query/depth logic
                 results = self.search_tool.search(query)
-                collected_data = []
-                sources = []
-                documents = []
-                
-                for result in results:
-                    collected_data.append(f"Source: {result['title']} ({result['url']})\nContent: {result['content']}")
-                    sources.append({"title": result['title'], "url": result['url']})
-                    if result['url'].lower().endswith(('.pdf', '.docx', '.xlsx')):
-                         documents.append({"title": result['title'], "url": result['url'], "type": result['url'].split('.')[-1]})
-                
-                return {
-                    "context": "\n\n".join(collected_data),
-                    "sources": sources,
-                    "documents": documents
-                }
             except Exception as e:
                 print(f"DEBUG: Exa Deep Research Failed: {e}. Falling back to standard search.")
                 if status_callback:
                     status_callback("Exa failed. Falling back to standard search...")
+            else:
+                dedupe = ResultDeduplicator()
+                for result in results:
+                    if not dedupe.add(result):
+                        continue
+                    yield from self._source_events(query, result)
+                yield QueryFinished(query=query, result_count=len(results))
+                return
 
         # Standard Search Logic (Serper/Tavily)
-        # Step 1: Generate search queries
-        plan_prompt = f"""
-        You are an expert Information Collector. Your goal is to gather comprehensive information about the user's query.
-        Analyze the query and generate 3-5 distinct search queries to cover different aspects of the topic.
-        Also, identify if we should specifically look for documents (PDF, DOCX, XLSX).
+        # Step 1: Generate search queries (unless a plan was prepared speculatively).
+        # Queries are submitted as soon as they are known, while the plan is still streaming.
+        with SearchFanOut(
+            self.search_tool.search,
+            max_in_flight=settings.SEARCH_MAX_IN_FLIGHT,
+            timeout=settings.SEARCH_QUERY_TIMEOUT
+        ) as fanout:
+            if plan is None:
+                plan = self.plan(query, history, status_callback=status_callback, on_query=lambda q: self._submit(fanout, q))
+            else:
+                for q in plan["search_queries"]:
+                    self._submit(fanout, q)
+            search_queries = plan["search_queries"]
+            look_for_documents = plan["look_for_documents"]
 
-        User Query: {query}
+            dedupe = ResultDeduplicator()
 
-        Return a JSON object with:
-        - "search_queries": list of strings
-        - "look_for_documents": boolean (true if the query implies need for papers, reports, data sheets)
+            # Step 2: Execute planned and document searches concurrently
+            # Always check for documents if the query implies research
+            doc_queries = []
+            if look_for_documents or True: # Force document search for deep research
+                # Aggressive search for multiple file types
+                doc_queries = [
+                    f"{query} filetype:pdf",
+                    f"{query} filetype:docx",
+                    f"{query} filetype:xlsx"
+                ]
+            doc_indices = {self._submit(fanout, q) for q in doc_queries}
+            fanout.close()
+
+            if status_callback:
+                status_callback(f"Searching {len(search_queries)} queries and {len(doc_queries)} document queries in parallel...")
+
+            for outcome in fanout.results(ordered=ordered):
+                if outcome["error"] is not None:
+                    print(f"DEBUG: Search Failed for '{outcome['query']}': {outcome['error']}")
+                    yield QueryFailed(query=outcome["query"], error=str(outcome["error"]))
+                    continue
+
+                for result in outcome["results"]:
+                    if outcome["index"] not in doc_indices:
+                        if dedupe.add(result):
+                            yield from self._source_events(outcome["query"], result)
+                        continue
+
+                    # Step 3: Document specific results
+                    ext = result['url'].split('.')[-1].lower()
+                    # Avoid duplicates (including documents already found by the planned searches)
+                    if ext in ['pdf', 'docx', 'xlsx'] and dedupe.add(result):
+                        yield DocumentFound(
+                            query=outcome["query"],
+                            title=result['title'],
+                            url=result['url'],
+                            type=ext,
+                            passage=f"Document Found: {result['title']} ({result['url']})\nContent: {result['content']}"
+                        )
+
+                if status_callback:
+                    status_callback(f"Finished searching: {outcome['query']}")
+                yield QueryFinished(query=outcome["query"], result_count=len(outcome["results"]))
+
+        if dedupe.dropped:
+            print(f"DEBUG: Dropped {dedupe.dropped} duplicate search results.")
+
+    def plan(self, query: str, history: List[Dict] = [], status_callback=None, on_query: Optional[Callable[[str], None]] = None) -> Dict:
         """
-        
+        Ask the LLM for a search plan.
+        Returns a dict with 'search_queries' and 'look_for_documents'; falls back to the raw query.
+        If on_query is given it is called once per search query as soon as the query is known:
+        with PLAN_STREAMING the plan is streamed and each query is emitted as soon as its string
+        is complete, so searches can start before the model has finished the plan.
+        """
+        emitted: List[str] = []
+
+        def emit(search_query):
+            if on_query and isinstance(search_query, str) and search_query.strip() and search_query not in emitted:
+                emitted.append(search_query)
+                on_query(search_query)
+
+        cache_key = self.plan_cache_key(query, history) if self.plan_cache else None
+        if cache_key:
+            cached = self.plan_cache.get(cache_key)
+            if cached is not None:
+                print("DEBUG: Search plan cache hit, skipping planning call.")
+                for search_query in cached["search_queries"]:
+                    emit(search_query)
+                return cached
+
         if status_callback:
             status_callback("Planning search strategy...")
         print("DEBUG: Calling LLM for search plan...")
+        cacheable = True
+        system_prompt = "You are a helpful assistant. Output only JSON."
         try:
-            response = self.llm.generate(plan_prompt, history=history, system_prompt="You are a helpful assistant. Output only JSON.")
+            if on_query and settings.PLAN_STREAMING:
+                parser = StreamingArrayParser("search_queries")
+                for chunk in self.llm.stream(self._plan_prompt(query), history=history, system_prompt=system_prompt):
+                    for search_query in parser.feed(chunk):
+                        emit(search_query)
+                response = parser.text
+            else:
+                response = self.llm.generate(self._plan_prompt(query), history=history, system_prompt=system_prompt)
             print("DEBUG: LLM plan generated successfully.")
         except Exception as e:
             print(f"DEBUG: LLM Planning Failed: {e}")
             # Fallback plan
             response = json.dumps({"search_queries": [query], "look_for_documents": False})
-        
+            cacheable = False
+
+        plan = self._parse_plan(response, query)
+        if plan is None:
+            # Queries already streamed have been searched; only fall back when there are none
+            plan = {"search_queries": emitted or [query], "look_for_documents": False}
+            cacheable = False
+
+        for search_query in plan["search_queries"]:
+            emit(search_query)
+        if on_query:
+            plan["search_queries"] = emitted
+        # Only cache real plans, never the fallback
+        if cache_key and cacheable:
+            self.plan_cache.set(cache_key, plan, settings.PLAN_CACHE_TTL)
+        return plan
+
+    @staticmethod
+    def _plan_prompt(query: str) -> str:
+        return f"""
+        You are an expert Information Collector. Your goal is to gather comprehensive information about the user's query.
+        Analyze the query and generate 3-5 distinct search queries to cover different aspects of the topic.
+        Also, identify if we should specifically look for documents (PDF, DOCX, XLSX).
+
+        User Query: {query}
+
+        Return a JSON object with:
+        - "search_queries": list of strings
+        - "look_for_documents": boolean (true if the query implies need for papers, reports, data sheets)
+        """
+
+    @staticmethod
+    def _parse_plan(response: str, query: str) -> Optional[Dict]:
         try:
             response = response.replace("```json", "").replace("```", "").strip()
             plan = json.loads(response)
             search_queries = plan.get("search_queries", [query])
             look_for_documents = plan.get("look_for_documents", False)
-        except json.JSONDecodeError:
-            search_queries = [query]
-            look_for_documents = False
+        except (json.JSONDecodeError, AttributeError):
+            return None
+        return {"search_queries": search_queries, "look_for_documents": look_for_documents}
 
-        collected_data = []
-        sources = []
-        documents = []
+    @staticmethod
+    def plan_cache_key(query: str, history: List[Dict] = []) -> str:
+        """
+        Cache key for a search plan: the canonical query (case, whitespace, punctuation and
+        stopwords removed) plus the canonical previous user message, which is what
+        follow-up questions like "How old is he?" depend on.
+        """
+        previous = next((m.get("content") or "" for m in reversed(history) if m.get("role") == "user"), "")
+        return make_cache_key("search_plan", " ".join(tokenize(query)), " ".join(tokenize(previous)))
 
-        # Step 2: Execute searches
-        for q in search_queries:
-            if status_callback:
-                status_callback(f"Searching for: {q}...")
-            print(f"Collector Agent: Searching for '{q}'...")
-            try:
-                results = self.search_tool.search(q)
-            except Exception as e:
-                print(f"DEBUG: Search Failed for '{q}': {e}")
+    def _read_top_pages(self, found_sources: List[tuple], collected_data: List[str], status_callback=None):
+        """
+        Fetch the top-ranked source pages and replace their snippet passages with page text.
+        found_sources holds (passage index, SourceFound) pairs; pages are picked round-robin
+        across queries so every query's best hits are read.
+        """
+        by_query: Dict[str, List[tuple]] = {}
+        for item in found_sources:
+            by_query.setdefault(item[1].query, []).append(item)
+        ranked = [item for rank in zip_longest(*by_query.values()) for item in rank if item is not None]
+        top = ranked[:settings.PAGE_FETCH_TOP_N]
+
+        if status_callback:
+            status_callback(f"Reading {len(top)} top pages...")
+        texts = self.page_fetcher.fetch_many([event.url for _, event in top])
+        for index, event in top:
+            if event.url in texts:
+                collected_data[index] = f"{event.passage}\n\n{texts[event.url]}"
+        print(f"DEBUG: Read full text for {len(texts)} of {len(top)} top pages.")
+
+    def _read_documents(self, query: str, documents: List[Dict], collected_data: List[str], status_callback=None):
+        """
+        Download and extract the first found documents. All extracted chunks become passages
+        (the analyzer's budgeter keeps the relevant ones) and the best-matching chunk is kept
+        on the document as its 'excerpt' for the Excel export.
+        """
+        top = documents[:settings.DOCUMENT_INGEST_MAX_DOCS]
+        if status_callback:
+            status_callback(f"Reading {len(top)} documents...")
+        extracted = self.document_ingestor.ingest(top)
+        for doc in top:
+            chunks = extracted.get(doc["url"])
+            if not chunks:
                 continue
-            for result in results:
-                collected_data.append(f"Source: {result['title']} ({result['url']})\nContent: {result['content']}")
-                sources.append({"title": result['title'], "url": result['url']})
-                
-                # Check for documents
-                if result['url'].lower().endswith(('.pdf', '.docx', '.xlsx')):
-                     documents.append({"title": result['title'], "url": result['url'], "type": result['url'].split('.')[-1]})
-
-        # Step 3: Optional document specific search
-        # Always check for documents if the query implies research
-        if look_for_documents or True: # Force document search for deep research
-            # Aggressive search for multiple file types
-            doc_queries = [
-                f"{query} filetype:pdf",
-                f"{query} filetype:docx",
-                f"{query} filetype:xlsx"
-            ]
-            
-            if status_callback:
-                status_callback("Aggressively searching for documents...")
-            print(f"Collector Agent: Aggressively searching for documents...")
-            for doc_query in doc_queries:
-                print(f"  - Searching: '{doc_query}'")
-                doc_results = self.search_tool.search(doc_query)
-                for result in doc_results:
-                     ext = result['url'].split('.')[-1].lower()
-                     if ext in ['pdf', 'docx', 'xlsx']:
-                         # Avoid duplicates
-                         if not any(d['url'] == result['url'] for d in documents):
-                             documents.append({"title": result['title'], "url": result['url'], "type": ext})
-                             collected_data.append(f"Document Found: {result['title']} ({result['url']})\nContent: {result['content']}")
+            collected_data.extend(f"Document: {doc['title']} ({doc['url']})\n{chunk}" for chunk in chunks)
+            doc["excerpt"] = chunks[int(bm25_scores(query, chunks).argmax())][:2000]
+        print(f"DEBUG: Extracted text from {len(extracted)} of {len(top)} documents.")
 
-        return {
-            "context": "\n\n".join(collected_data),
-            "sources": sources,
-            "documents": documents
-        }
+    def _source_events(self, query: str, result: Dict) -> Iterator[CollectorEvent]:
+        yield SourceFound(
+            query=query,
+            title=result['title'],
+            url=result['url'],
+            content=result['content'],
+            passage=f"Source: {result['title']} ({result['url']})\nContent: {result['content']}"
+        )
+        # Check for documents
+        if result['url'].lower().endswith(('.pdf', '.docx', '.xlsx')):
+            yield DocumentFound(query=query, title=result['title'], url=result['url'], type=result['url'].split('.')[-1].lower())
+
+    def _submit(self, fanout: SearchFanOut, search_query: str) -> int:
+        print(f"Collector Agent: Searching for '{search_query}'...")
+        return fanout.submit(search_query)
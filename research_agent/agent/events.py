@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+@dataclass
+class SourceFound:
+    """A new (non-duplicate) search result."""
+    query: str
+    title: str
+    url: str
+    content: str
+    passage: str  # Formatted text for the analysis context
+
+@dataclass
+class DocumentFound:
+    """A PDF/DOCX/XLSX result. passage is None when the result was already yielded as a source."""
+    query: str
+    title: str
+    url: str
+    type: str
+    passage: Optional[str] = None
+
+@dataclass
+class QueryFinished:
+    query: str
+    result_count: int
+
+@dataclass
+class QueryFailed:
+    query: str
+    error: str
+
+CollectorEvent = Union[SourceFound, DocumentFound, QueryFinished, QueryFailed]
@@ -1,70 +1,62 @@
+import contextvars
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from research_agent.core.llm.factory import get_llm_provider
+from research_agent.core.llm.history import HistoryManager
+from research_agent.core.intent.classifier import IntentClassifier
 from research_agent.core.tts.factory import get_tts_provider
+from research_agent.core.search.factory import get_search_provider
+from research_agent.core.retry import retry_budget
 from research_agent.config.settings import settings
 from research_agent.agent.collector import CollectorAgent
 from research_agent.agent.analyzer import AnalyzerAgent
+from research_agent.agent.router import RouterDecision, route
+
+def is_research_verdict(response: str) -> bool:
+    """
+    Whether a classifier response is a RESEARCH verdict. Only these are shared between
+    similar queries by the semantic cache: a CHAT verdict carries a reply written for the
+    exact request, which a near-identical one ("...named Max" vs "...named Mia") must not get.
+    """
+    try:
+        return json.loads(response.replace("```json", "").replace("```", "").strip()).get("type") == "RESEARCH"
+    except (ValueError, AttributeError):
+        return False
 
 class ResearchAgent:
     def __init__(self, use_deep_research: bool = False):
         self.collector = CollectorAgent(use_deep_research=use_deep_research)
         self.analyzer = AnalyzerAgent()
+        self.classifier_llm = get_llm_provider("classify")
+        self.summary_llm = get_llm_provider("summary")
+        self.router_llm = get_llm_provider("router") if settings.LLM_FUSED_ROUTER else None
+        self.history = HistoryManager()
+        self.intent_classifier = IntentClassifier() if settings.INTENT_LOCAL_CLASSIFIER else None
+        self._canned_audio = {}
         self.tts_tool = get_tts_provider()
         self.last_collected_data = None
         self.last_query = None
         self.use_deep_research = use_deep_research
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="research-agent")
         print(f"DEBUG: Active TTS Provider: {self.tts_tool.__class__.__name__}")
         print(f"DEBUG: Deep Research Mode: {use_deep_research}")
 
-    def process_query(self, query: str, history: list[dict] = [], status_callback=None, use_deep_research: Optional[bool] = None) -> dict:
+    def process_query(self, query: str, history: list[dict] = [], status_callback=None, use_deep_research: Optional[bool] = None, token_callback=None) -> dict:
         """
         Process a user query:
         1. Classify: Chat or Research?
         2. If Chat: Respond directly.
         3. If Research: Collect, Analyze, Speak.
+        token_callback, if given, receives the report text chunk by chunk while it is generated.
+        LLM retries are limited to TURN_RETRY_BUDGET seconds for the whole turn.
+        Each LLM call gets a compacted view of the history sized for its call site.
         """
-        
-        # ... (Classification logic remains the same) ...
-        
-        # Step 1: Classify
-        classify_prompt = f"""
-        You are a smart AI assistant should sound like FRIDAY for ironman and your name is FRIDAY. Your job is to strictly categorize the user's input into one of two categories:
-        
-        1. "CHAT": Casual conversation, greetings, compliments, personal questions about you (the AI), or simple requests that do NOT require external information.
-           Examples: "Hi", "Hello", "How are you?", "Who are you?", "Good morning", "Thanks", "Write a poem about love".
-           
-        2. "RESEARCH": Questions that require factual information, data, news, or knowledge from the internet.
-           ALSO include requests to generate documents (PDF, Word, Excel) from previous topics.
-           Examples: "Who is the CEO of Google?", "Cricket Score", "Latest stock price of Apple", "Explain quantum computing", "History of Rome", "Weather in London", "Make it a word doc", "Save as PDF".
-        
-        User Query: "{query}"
-        
-        Return a JSON object with:
-        - "type": "CHAT" or "RESEARCH"
-        - "response": string (if CHAT, provide a friendly, natural response here. If RESEARCH, return null)
-        """
-        
-        try:
-            classify_response = self.collector.llm.generate(classify_prompt, history=history, system_prompt="You are a helpful assistant. Output only JSON.")
-            classify_response = classify_response.replace("```json", "").replace("```", "").strip()
-            classification = json.loads(classify_response)
-        except Exception:
-            # Fallback to research if classification fails
-            classification = {"type": "RESEARCH"}
+        with retry_budget(settings.TURN_RETRY_BUDGET):
+            return self._process_query(query, history, status_callback, use_deep_research, token_callback)
 
-        if classification.get("type") == "CHAT":
-            answer = classification.get("response", "Hello! How can I help you today?")
-            audio_bytes = self.tts_tool.speak(answer)
-            return {
-                "answer": answer,
-                "audio": audio_bytes,
-                "sources": [],
-                "documents": [],
-                "pdf_path": None
-            }
-
-        # Step 2: Determine if this is a formatting request for previous data
+    def _process_query(self, query: str, history: list[dict], status_callback, use_deep_research: Optional[bool], token_callback) -> dict:
+        # Determine if this is a formatting request for previous data
         # We check if the query implies formatting AND we have previous data
         is_formatting_request = False
         query_lower = query.lower()
@@ -76,6 +68,55 @@ class ResearchAgent:
             if len(query.split()) < 10: 
                 is_formatting_request = True
 
+        # Step 1: Classify, locally when the input is obvious
+        classification = self.intent_classifier.classify(query) if self.intent_classifier else None
+        if classification:
+            print(f"DEBUG: Local intent {classification['type']} ({classification['source']}, {classification['confidence']:.2f})")
+
+        # Optionally classify and plan in one structured call; on failure use the separate calls below
+        plan = None
+        if classification is None and self.router_llm:
+            decision = self._route_with_llm(query, history)
+            if decision:
+                classification = {"type": decision.type, "response": decision.response, "output_formats": decision.output_formats}
+                if decision.type == "RESEARCH":
+                    plan = {"search_queries": decision.search_queries, "look_for_documents": decision.look_for_documents}
+
+        # Speculatively plan the searches while the LLM classifies; the plan is discarded for CHAT turns.
+        # Already known research turns leave planning to the collector, which streams the plan
+        # and starts searching before it is complete.
+        deep_research = self.collector.use_deep_research if use_deep_research is None else use_deep_research
+        plan_history = self.history.view(history, "plan")
+        plan_future = None
+        is_chat = classification is not None and classification["type"] == "CHAT"
+        streams_plan = classification is not None and settings.PLAN_STREAMING
+        if settings.SPECULATIVE_PLANNING and not is_formatting_request and not deep_research and not is_chat and not streams_plan and plan is None:
+            # Run in a copy of this context so the planner shares the turn's retry budget
+            plan_future = self._executor.submit(contextvars.copy_context().run, self.collector.plan, query, plan_history)
+
+        if classification is None:
+            classification = self._classify_with_llm(query, history)
+
+        if classification.get("type") == "CHAT":
+            if plan_future:
+                plan_future.cancel()
+                print("DEBUG: Discarding speculative search plan for CHAT turn.")
+            answer = classification.get("response", "Hello! How can I help you today?")
+            if classification.get("source") == "rule":
+                # Canned replies repeat, so their audio is synthesised once
+                if answer not in self._canned_audio:
+                    self._canned_audio[answer] = self.tts_tool.speak(answer)
+                audio_bytes = self._canned_audio[answer]
+            else:
+                audio_bytes = self.tts_tool.speak(answer)
+            return {
+                "answer": answer,
+                "audio": audio_bytes,
+                "sources": [],
+                "documents": [],
+                "pdf_path": None
+            }
+
         collected_data = None
         
         if is_formatting_request:
@@ -92,16 +133,17 @@ class ResearchAgent:
             print("Starting Collection Phase...")
             
             # If a one-off flag is passed, update collector
-            if use_deep_research is not None:
+            # (only when the mode changes, so the providers keep their state between turns)
+            if use_deep_research is not None and use_deep_research != self.collector.use_deep_research:
                 self.collector.use_deep_research = use_deep_research
-                if use_deep_research:
-                    from research_agent.core.search.exa_provider import ExaSearchProvider
-                    self.collector.search_tool = ExaSearchProvider()
-                else:
-                    from research_agent.core.search.serper_provider import SerperProvider
-                    self.collector.search_tool = SerperProvider()
-
-            collected_data = self.collector.collect(query, history, status_callback=status_callback)
+                self.collector.search_tool = get_search_provider(use_deep_research)
+
+            if plan_future:
+                try:
+                    plan = plan_future.result()
+                except Exception as e:
+                    print(f"DEBUG: Speculative planning failed: {e}")
+            collected_data = self.collector.collect(query, plan_history, status_callback=status_callback, plan=plan)
             
             # Update state
             self.last_collected_data = collected_data
@@ -113,6 +155,9 @@ class ResearchAgent:
             requested_formats.append("docx")
         if "excel" in query_lower or "spreadsheet" in query_lower or "csv" in query_lower:
             requested_formats.append("excel")
+        for fmt in classification.get("output_formats") or []:
+            if fmt not in requested_formats:
+                requested_formats.append(fmt)
 
         # Step 3: Analyze
         if status_callback:
@@ -126,10 +171,10 @@ class ResearchAgent:
         # Better to use last_query if it's a formatting request.
         analysis_query = self.last_query if is_formatting_request else query
         
-        analysis_result = self.analyzer.analyze(analysis_query, collected_data, history, requested_formats=requested_formats, status_callback=status_callback)
+        # Files keep rendering in worker processes while the spoken summary and audio are generated
+        analysis_result = self.analyzer.analyze(analysis_query, collected_data, self.history.view(history, "report"), requested_formats=requested_formats, status_callback=status_callback, token_callback=token_callback, wait_for_files=False)
         
         report_content = analysis_result["report_content"]
-        pdf_path = analysis_result["pdf_path"]
         sources = analysis_result["sources"]
         documents = analysis_result["documents"]
 
@@ -141,12 +186,11 @@ class ResearchAgent:
         Report:
         {report_content}
         """
-        # We can use the collector's LLM for this simple task
         if status_callback:
             status_callback("Generating spoken summary...")
         print("DEBUG: Generating summary...")
         try:
-            summary = self.collector.llm.generate(summary_prompt, history=history, system_prompt="You are a helpful assistant. Be concise.")
+            summary = self.summary_llm.generate(summary_prompt, history=self.history.view(history, "summary"), system_prompt="You are a helpful assistant. Be concise.")
             print(f"DEBUG: Summary generated: {summary[:50]}...")
         except Exception as e:
             print(f"DEBUG: Summary Generation Failed: {e}")
@@ -162,6 +206,9 @@ class ResearchAgent:
             print(f"DEBUG: Audio Generation Failed: {e}")
             audio_bytes = None
 
+        analysis_result = self.analyzer.finish_files(analysis_result)
+        pdf_path = analysis_result["pdf_path"]
+
         return {
             "answer": report_content,
             "audio": audio_bytes,
@@ -171,3 +218,39 @@ class ResearchAgent:
             "docx_path": analysis_result.get("docx_path"),
             "excel_path": analysis_result.get("excel_path")
         }
+
+    def _classify_with_llm(self, query: str, history: list[dict]) -> dict:
+        classify_prompt = f"""
+        You are a smart AI assistant should sound like FRIDAY for ironman and your name is FRIDAY. Your job is to strictly categorize the user's input into one of two categories:
+        
+        1. "CHAT": Casual conversation, greetings, compliments, personal questions about you (the AI), or simple requests that do NOT require external information.
+           Examples: "Hi", "Hello", "How are you?", "Who are you?", "Good morning", "Thanks", "Write a poem about love".
+           
+        2. "RESEARCH": Questions that require factual information, data, news, or knowledge from the internet.
+           ALSO include requests to generate documents (PDF, Word, Excel) from previous topics.
+           Examples: "Who is the CEO of Google?", "Cricket Score", "Latest stock price of Apple", "Explain quantum computing", "History of Rome", "Weather in London", "Make it a word doc", "Save as PDF".
+        
+        User Query: "{query}"
+        
+        Return a JSON object with:
+        - "type": "CHAT" or "RESEARCH"
+        - "response": string (if CHAT, provide a friendly, natural response here. If RESEARCH, return null)
+        """
+        
+        try:
+            classify_response = self.classifier_llm.generate(classify_prompt, history=self.history.view(history, "classify"), system_prompt="You are a helpful assistant. Output only JSON.",
+                                                             semantic_key=query, semantic_filter=is_research_verdict)
+            classify_response = classify_response.replace("```json", "").replace("```", "").strip()
+            return json.loads(classify_response)
+        except Exception:
+            # Fallback to research if classification fails
+            return {"type": "RESEARCH"}
+
+    def _route_with_llm(self, query: str, history: list[dict]) -> Optional[RouterDecision]:
+        try:
+            decision = route(self.router_llm, query, self.history.view(history, "router"))
+            print(f"DEBUG: Router decision {decision.type} with {len(decision.search_queries)} queries.")
+            return decision
+        except Exception as e:
+            print(f"DEBUG: Router call failed, falling back to separate classify and plan calls: {e}")
+            return None
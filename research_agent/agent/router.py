@@ -0,0 +1,42 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+from research_agent.core.llm.base import BaseLLMProvider
+
+MAX_SEARCH_QUERIES = 5
+
+class RouterDecision(BaseModel):
+    """Classification and search plan for one turn, produced by a single LLM call."""
+    type: Literal["CHAT", "RESEARCH"]
+    response: Optional[str] = Field(default=None, description="Friendly reply for CHAT, null for RESEARCH")
+    search_queries: List[str] = Field(default_factory=list, description="3-5 targeted web search queries for RESEARCH")
+    look_for_documents: bool = Field(default=False, description="Whether PDFs/spreadsheets would help")
+    output_formats: List[Literal["pdf", "docx", "excel"]] = Field(default_factory=list, description="File formats the user asked for")
+
+    @model_validator(mode="after")
+    def check_consistency(self):
+        self.search_queries = [q.strip() for q in self.search_queries if q and q.strip()][:MAX_SEARCH_QUERIES]
+        if self.type == "CHAT" and not (self.response or "").strip():
+            raise ValueError("CHAT decisions need a response")
+        if self.type == "RESEARCH" and not self.search_queries:
+            raise ValueError("RESEARCH decisions need at least one search query")
+        return self
+
+def route(llm: BaseLLMProvider, query: str, history: List[dict] = []) -> RouterDecision:
+    """Classify the query and plan its searches in one structured call. Raises on invalid output."""
+    router_prompt = f"""
+    You are FRIDAY, a smart AI assistant that should sound like FRIDAY from Iron Man. Decide how to handle the user's input.
+
+    1. "CHAT": Casual conversation, greetings, compliments, personal questions about you (the AI), or simple requests that do NOT require external information.
+       Examples: "Hi", "How are you?", "Who are you?", "Thanks", "Write a poem about love".
+       Give a friendly, natural reply in "response".
+
+    2. "RESEARCH": Questions that require factual information, data, news, or knowledge from the internet,
+       including requests to generate documents (PDF, Word, Excel) from previous topics.
+       Examples: "Who is the CEO of Google?", "Cricket Score", "Latest stock price of Apple", "History of Rome", "Make it a word doc".
+       Break the request into 3-5 distinct, targeted search queries that cover different aspects. Use the conversation
+       history to resolve references like "he" or "it". Set "look_for_documents" if reports, papers or data files
+       would help, and list any file formats the user asked for in "output_formats".
+
+    User Query: "{query}"
+    """
+    return llm.generate_json(router_prompt, RouterDecision, history=history, system_prompt="You are a helpful assistant. Output only JSON.")
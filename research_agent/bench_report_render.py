@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from research_agent.core.reports.markdown import parse_markdown
+from research_agent.core.reports.renderers import render_docx, render_pdf
+
+def synthetic_report(sections: int) -> str:
+    """A report shaped like the analyzer's output: headings, prose with inline markup, lists, tables, references."""
+    parts = ["# Executive Summary", "", "Fusion research made **measurable progress** this year, see [ITER](https://www.iter.org/)."]
+    for s in range(sections):
+        parts += [
+            "", f"## Topic {s + 1}: Plasma confinement and *materials*", "",
+            f"Section {s + 1} covers **tokamak** and *stellarator* results, with figures from "
+            f"[source {s}](https://example.com/{s}) and the `Q > 1` milestone. " * 3,
+            "Results were reproduced by several independent groups.", "",
+            f"1. Record pulse of {s + 10} seconds",
+            "2. **Net energy gain** reported at NIF",
+            "   - Follow-up shots confirmed the result",
+            "- Private funding grew — “the largest year so far”",
+            "", "| Device | Country | Result |", "|---|---|---|",
+            f"| JET | UK | {s + 59} MJ |", "| EAST | China | 1066 s |", "| KSTAR | Korea | 100 M°C |",
+        ]
+    parts += ["", "## References", ""] + [f"- [Source {s}](https://example.com/{s})" for s in range(sections)]
+    return "\n".join(parts)
+
+def timed(fn, repeat: int) -> np.ndarray:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return np.array(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing and rendering a large synthetic report.")
+    parser.add_argument("--sections", type=int, default=200, help="topic sections in the synthetic report")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per step")
+    args = parser.parse_args()
+
+    content = synthetic_report(args.sections)
+    blocks = parse_markdown(content)
+    print(f"Report: {len(content) / 1024:.0f} KiB, {content.count(chr(10)) + 1} lines, {len(blocks)} blocks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        steps = [
+            ("parse", lambda: parse_markdown(content)),
+            ("pdf", lambda: render_pdf(tmp, "benchmark", blocks)),
+            ("docx", lambda: render_docx(tmp, "benchmark", blocks)),
+        ]
+        for name, fn in steps:
+            times = timed(fn, args.repeat)
+            print(f"{name:>5}: median {np.median(times):.1f} ms, min {times.min():.1f} ms ({args.repeat} runs)")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,6 +7,7 @@ class Settings(BaseSettings):
     # LLM Keys
     OPENAI_API_KEY: str = Field(default="")
     ANTHROPIC_API_KEY: str = Field(default="")
+    ANTHROPIC_BASE_URL: str = Field(default="")  # empty uses the public API
     GOOGLE_API_KEY: str = Field(default="")
 
     # Search Keys
@@ -28,10 +30,109 @@ class Settings(BaseSettings):
 
     # LLM Config
     LLM_TEMPERATURE: float = 0.7
-    LLM_MODEL: str = "gpt-4o" # or gpt-3.5-turbo, etc.
+    LLM_MODEL: str = ""  # if set, used for every call site instead of the tiers below
+    LLM_FAST_MODELS: Dict[str, str] = {"openai": "gpt-4o-mini", "google": "gemini-2.5-flash-lite", "anthropic": "claude-haiku-4-5"}
+    LLM_STRONG_MODELS: Dict[str, str] = {"openai": "gpt-4o", "google": "gemini-2.5-flash", "anthropic": "claude-sonnet-4-5"}
+    LLM_CALL_SITE_MODELS: Dict[str, str] = {  # "fast", "strong" or an explicit model name
+        "classify": "fast", "plan": "fast", "router": "fast", "summary": "fast", "report_map": "fast", "report": "strong"
+    }
+    ANTHROPIC_MAX_TOKENS: int = 8192  # output limit per call, required by the Messages API
+    ANTHROPIC_PROMPT_CACHING: bool = True  # cache the system prompt and history prefix between calls
+    SPECULATIVE_PLANNING: bool = True  # plan searches in parallel with classification
+    PLAN_STREAMING: bool = True  # stream the search plan and start each search as soon as its query is parsed
+    PLAN_CACHE_ENABLED: bool = True
+    PLAN_CACHE_PATH: str = ".cache/plan_cache.sqlite3"
+    PLAN_CACHE_TTL: int = 24 * 3600
+    PLAN_CACHE_MAX_ENTRIES: int = 1000
+    HISTORY_KEEP_TURNS: int = 3  # recent user/assistant exchanges sent with a prompt
+    HISTORY_CALL_SITE_TURNS: Dict[str, int] = {"classify": 1, "plan": 2, "router": 2, "report": 3, "summary": 0}
+    HISTORY_TOKEN_BUDGET: int = 2000  # for the recent turns
+    HISTORY_MESSAGE_MAX_TOKENS: int = 500  # longer messages (e.g. earlier reports) are clipped
+    HISTORY_SUMMARY_TOKENS: int = 300  # rolling summary of older turns, 0 disables it
+    LLM_FUSED_ROUTER: bool = False  # one structured call for classification + search plan
+    INTENT_LOCAL_CLASSIFIER: bool = True  # answer obvious CHAT/RESEARCH inputs without the LLM
+    INTENT_LOCAL_THRESHOLD: float = 0.8  # model confidence needed to skip the LLM classifier
+    INTENT_MODEL_PATH: str = ".cache/intent_model.pkl"
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_CALL_SITES: List[str] = ["classify", "router", "report", "report_map", "summary"]  # exact-match response cache
+    LLM_SEMANTIC_CACHE_CALL_SITES: List[str] = ["classify"]  # also reuse responses for near-identical queries
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.9  # character trigram cosine similarity
+    LLM_CACHE_PATH: str = ".cache/llm_cache.sqlite3"
+    LLM_CACHE_TTL: int = 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 2000
+    LLM_SEMANTIC_CACHE_MAX_ENTRIES: int = 2000
+
+    # HTTP Config (shared by search providers)
+    HTTP_POOL_SIZE: int = 16  # keep-alive connections per host
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 10.0
+    EXA_READ_TIMEOUT: float = 60.0  # deep research responses are slow
+
+    # Resilience Config (shared by search and LLM providers)
+    PROVIDER_RATE_LIMITS: Dict[str, float] = {  # requests per second, 0 = unlimited
+        "serper": 10.0, "tavily": 5.0, "exa": 2.0, "openai": 5.0, "google": 2.0, "anthropic": 5.0
+    }
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures before failing fast
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds before a trial call is allowed
+    SEARCH_SERVE_STALE_ON_OPEN_CIRCUIT: bool = True  # serve expired cached results while a provider is down
+    LLM_RETRY_MAX_ATTEMPTS: int = 4  # including the first call
+    LLM_RETRY_BASE_DELAY: float = 1.0  # exponential backoff start, with jitter
+    LLM_RETRY_MAX_DELAY: float = 30.0  # cap for backoff and for server Retry-After values
+    TURN_RETRY_BUDGET: float = 90.0  # seconds into a turn after which no more retries are scheduled
+
+    # Search Config
+    SEARCH_MAX_IN_FLIGHT: int = 8  # concurrent searches per research turn (1 = sequential)
+    SEARCH_QUERY_TIMEOUT: float = 30.0  # seconds per search query, 0 disables the deadline
+    SEARCH_HEDGE_MODE: str = "hedge"  # off, hedge (secondary after primary's p95 latency), race
+    SEARCH_HEDGE_PROVIDER: str = ""  # secondary for standard search, e.g. "tavily"; empty disables
+    SEARCH_HEDGE_INITIAL_DELAY: float = 3.0  # hedge delay until enough latency samples exist
+    SEARCH_HEDGE_MIN_DELAY: float = 0.5  # floor for the p95-based hedge delay
+    EXA_HEDGE_INITIAL_DELAY: float = 30.0  # deep research hedges to DEFAULT_SEARCH_PROVIDER
+    EXA_CONTENT_MODE: str = "bounded"  # bounded (highlights first, full text for top results) or full
+    EXA_MAX_CHARS_PER_RESULT: int = 4000
+    EXA_FULL_TEXT_RESULTS: int = 5  # top-ranked results that get full text in bounded mode
+    EXA_FULL_TEXT_CHAR_BUDGET: int = 20000  # total full-text characters per deep research query
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_PATH: str = ".cache/search_cache.sqlite3"
+    SEARCH_CACHE_MAX_ENTRIES: int = 5000
+    SEARCH_CACHE_TTL_SHORT: int = 3600  # news, prices, scores, weather
+    SEARCH_CACHE_TTL_LONG: int = 7 * 24 * 3600  # evergreen topics
+
+    # Page Fetch Config (full text for the top standard search hits)
+    PAGE_FETCH_ENABLED: bool = True
+    PAGE_FETCH_TOP_N: int = 8
+    PAGE_FETCH_MAX_WORKERS: int = 8
+    PAGE_FETCH_PER_HOST: int = 2
+    PAGE_FETCH_MAX_BYTES: int = 2_000_000
+    PAGE_FETCH_MAX_CHARS: int = 20000  # extracted text kept per page
+    PAGE_FETCH_TIMEOUT: float = 8.0
+    PAGE_FETCH_MAX_REDIRECTS: int = 5  # each hop is checked against private addresses
+    PAGE_FETCH_ALLOW_PRIVATE: bool = False  # allow loopback/private/link-local hosts (local testing only)
+    PAGE_CACHE_PATH: str = ".cache/page_cache.sqlite3"
+    PAGE_CACHE_FRESH_SECONDS: int = 6 * 3600  # after this, cached pages are revalidated
+    PAGE_CACHE_TTL: int = 30 * 24 * 3600
+    PAGE_CACHE_MAX_ENTRIES: int = 2000
+
+    # Document Ingestion Config (text of found PDF/DOCX/XLSX files)
+    DOCUMENT_INGEST_ENABLED: bool = True
+    DOCUMENT_INGEST_MAX_DOCS: int = 5
+    DOCUMENT_MAX_BYTES: int = 25_000_000
+    DOCUMENT_MAX_CHARS: int = 60000  # extracted characters kept per document
+    DOCUMENT_DOWNLOAD_TIMEOUT: float = 20.0
+    DOCUMENT_WORKERS: int = 2  # extraction processes
+    DOCUMENT_DIR: str = ".cache/documents"
+    DOCUMENT_DIR_MAX_BYTES: int = 500_000_000  # least recently used downloads are removed above this
 
     # Report Config
     REPORT_OUTPUT_DIR: str = "reports"
+    REPORT_CONTEXT_TOKEN_BUDGET: int = 12000  # max tokens of collected context in the report prompt
+    REPORT_CONTEXT_CHUNK_TOKENS: int = 400
+    REPORT_SYNTHESIS_MODE: str = "single"  # single, map_reduce, or auto (see REPORT_MAP_REDUCE_MIN_DROPPED)
+    REPORT_MAP_REDUCE_MIN_DROPPED: float = 0.5  # auto: map_reduce when a single prompt would drop this share of the context and the map step fits in one wave of workers
+    REPORT_MAP_REDUCE_TOKEN_BUDGET: int = 60000  # collected context considered in map_reduce mode
+    REPORT_MAP_BATCH_TOKENS: int = 6000  # context per parallel findings call
+    REPORT_MAP_MAX_WORKERS: int = 4  # concurrent findings calls
+    REPORT_RENDER_PROCESSES: int = 2  # worker processes rendering PDF/DOCX/Excel files, 0 renders in-process
 
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
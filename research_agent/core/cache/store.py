@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+class SQLiteCache:
+    """
+    Small persistent key/value cache backed by SQLite.
+
+    Values are stored as JSON with an expiry time. Reads refresh an entry's last access
+    time, and writes trim the table to max_entries by evicting the least recently used
+    entries. The database is opened lazily on first use.
+    """
+
+    def __init__(self, path: str, table: str = "cache", max_entries: int = 5000):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired (unless allow_stale)."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is None or (row[1] < now and not allow_stale):
+                self.misses += 1
+                return None
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Like get(), but leaves the hit/miss counters and the entry's access time alone."""
+        with self._lock:
+            row = self._connect().execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def count_miss(self):
+        """Record a miss for a lookup that was answered without get() (e.g. after peek())."""
+        with self._lock:
+            self.misses += 1
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a JSON-serialisable value for ttl seconds."""
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now)
+            )
+            overflow = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+            conn.commit()
+
+    def items(self, limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Unexpired (key, value) pairs, most recently used first."""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT key, value FROM {self.table} WHERE expires_at >= ? ORDER BY accessed_at DESC LIMIT ?",
+                (time.time(), -1 if limit is None else limit)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+_caches: Dict[tuple, SQLiteCache] = {}
+_caches_lock = threading.Lock()
+
+def get_sqlite_cache(path: str, table: str, max_entries: int) -> SQLiteCache:
+    """Return a shared cache instance so all users of one table share a connection and counters."""
+    with _caches_lock:
+        key = (os.path.abspath(path) if path != ":memory:" else path, table)
+        if key not in _caches:
+            _caches[key] = SQLiteCache(path, table=table, max_entries=max_entries)
+        return _caches[key]
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable hash key from JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,118 @@
+import re
+from collections import Counter
+from typing import Dict, List
+import numpy as np
+
+CHARS_PER_TOKEN = 4  # Rough average for English text; avoids a tokenizer dependency
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "please", "tell", "that", "the", "this",
+    "to", "was", "what", "when", "where", "which", "who", "why", "with", "you", "about", "give"
+}
+_TOKEN_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+def chunk_passage(passage: str, max_tokens: int) -> List[str]:
+    """
+    Split a long passage into chunks of at most max_tokens.
+    Collected passages start with a 'Source: ...' line; it is repeated on every chunk
+    so each chunk keeps its attribution. Splits on paragraphs, then sentences.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(passage) <= max_chars:
+        return [passage]
+
+    header, _, body = passage.partition("\n")
+    if not body:
+        header, body = "", passage
+    budget = max(max_chars - len(header) - 1, max_chars // 2)
+
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", body):
+        if len(paragraph) <= budget:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_RE.split(paragraph):
+            # Hard-wrap anything still too long (e.g. extracted text without punctuation)
+            pieces.extend(sentence[i:i + budget] for i in range(0, len(sentence), budget))
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > budget:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return [f"{header}\n{chunk}" if header else chunk for chunk in chunks]
+
+def bm25_scores(query: str, texts: List[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """BM25 score of every text for the query, computed over the texts as the corpus."""
+    terms = sorted(set(tokenize(query)))
+    if not terms or not texts:
+        return np.zeros(len(texts))
+
+    counts = [Counter(tokenize(text)) for text in texts]
+    tf = np.array([[c[t] for t in terms] for c in counts], dtype=np.float64)
+    lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+    avg_length = lengths.mean() or 1.0
+
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / avg_length)
+    return (idf * tf * (k1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+class ContextBudgeter:
+    """
+    Packs the passages most relevant to a query into a fixed token budget.
+    Passages are chunked, scored with BM25 against the query and packed greedily by
+    score. Kept chunks are returned in their original order; dropped chunks are recorded.
+    """
+
+    def __init__(self, token_budget: int, chunk_tokens: int = 400, k1: float = 1.5, b: float = 0.75):
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, chunks: List[str]) -> np.ndarray:
+        """BM25 score of every chunk for the query."""
+        return bm25_scores(query, chunks, k1=self.k1, b=self.b)
+
+    def pack(self, query: str, passages: List[str]) -> Dict:
+        """
+        Returns a dict with the packed 'context', the kept 'chunks' themselves, the number of
+        'kept' chunks, 'tokens' used and a 'dropped' list describing each chunk that did not fit.
+        """
+        chunks = [chunk for passage in passages if passage.strip() for chunk in chunk_passage(passage, self.chunk_tokens)]
+        tokens = [estimate_tokens(chunk) for chunk in chunks]
+        scores = self.score(query, chunks)
+
+        kept, dropped, used = [], [], 0
+        # Stable sort keeps the original order among equally scored chunks
+        for i in sorted(range(len(chunks)), key=lambda i: -scores[i]):
+            if used + tokens[i] <= self.token_budget:
+                kept.append(i)
+                used += tokens[i]
+            else:
+                dropped.append({
+                    "source": chunks[i].split("\n", 1)[0][:200],
+                    "tokens": tokens[i],
+                    "score": round(float(scores[i]), 3)
+                })
+
+        kept_chunks = [chunks[i] for i in sorted(kept)]
+        return {
+            "context": "\n\n".join(kept_chunks),
+            "chunks": kept_chunks,
+            "kept": len(kept),
+            "tokens": used,
+            "dropped": dropped
+        }
@@ -0,0 +1,217 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional
+import requests
+import urllib3
+from research_agent.core.context.budget import CHARS_PER_TOKEN
+from research_agent.core.http import get_session, request_timeout
+from research_agent.core.workers import worker_context
+from research_agent.config.settings import settings
+
+def _pdf_pages(path: str) -> Iterator[str]:
+    from pypdf import PdfReader
+
+    # Memory-map the file so pages are read from the OS page cache instead of a copy in memory
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        reader = PdfReader(mapped)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+def _docx_blocks(path: str) -> Iterator[str]:
+    from docx import Document
+
+    doc = Document(path)
+    for paragraph in doc.paragraphs:
+        yield paragraph.text
+    for table in doc.tables:
+        for row in table.rows:
+            yield " | ".join(cell.text.strip() for cell in row.cells)
+
+def _xlsx_rows(path: str) -> Iterator[str]:
+    from openpyxl import load_workbook
+
+    # read_only streams rows instead of loading the whole sheet
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            yield f"Sheet: {ws.title}"
+            for row in ws.iter_rows(values_only=True):
+                if any(value is not None for value in row):
+                    yield " | ".join("" if value is None else str(value) for value in row)
+    finally:
+        wb.close()
+
+def extract_document_chunks(path: str, doc_type: str, max_chars: int, chunk_chars: int) -> List[str]:
+    """
+    Extract text from a PDF/DOCX/XLSX file incrementally (page by page / row by row),
+    returning chunks of about chunk_chars and stopping after max_chars.
+    Runs in a worker process, so it only takes picklable arguments.
+    """
+    readers = {"pdf": _pdf_pages, "docx": _docx_blocks, "xlsx": _xlsx_rows}
+    if doc_type not in readers:
+        return []
+
+    chunks, current, total = [], [], 0
+    current_len = 0
+    try:
+        for block in readers[doc_type](path):
+            block = block.strip()
+            if not block:
+                continue
+            block = block[:max_chars - total]
+            current.append(block)
+            current_len += len(block) + 1
+            total += len(block)
+            if current_len >= chunk_chars:
+                chunks.append("\n".join(current))
+                current, current_len = [], 0
+            if total >= max_chars:
+                break
+    except Exception as e:
+        # Corrupt or truncated files: keep whatever was extracted so far
+        print(f"DEBUG: Extraction stopped for {path}: {e}")
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=settings.DOCUMENT_WORKERS, mp_context=worker_context())
+        return _process_pool
+
+def reset_process_pool(pool: ProcessPoolExecutor):
+    """
+    Kill the workers of a pool stuck on an extraction and drop it, so the next call starts a fresh
+    one. Future.cancel() cannot stop a task that is already running, and one pathological PDF
+    would otherwise hold a worker for every later turn.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    # ProcessPoolExecutor has no public way to stop running tasks
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _iter_arrived(response: requests.Response, chunk_size: int = 65536) -> Iterator[bytes]:
+    """
+    Yield the body as it arrives. iter_content() blocks until a whole chunk is filled, so a server
+    dripping bytes could hold one chunk for hours; read1() returns what is already there.
+    """
+    read1 = getattr(response.raw, "read1", None)
+    if read1 is None:  # older urllib3
+        yield from response.iter_content(chunk_size=chunk_size)
+        return
+    while True:
+        chunk = read1(chunk_size, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+class DocumentIngestor:
+    """
+    Streams found documents to disk with a size limit and extracts their text in a
+    process pool. Downloads are kept in DOCUMENT_DIR keyed by URL, so repeat turns skip them;
+    the directory is capped at DOCUMENT_DIR_MAX_BYTES by removing the least recently used files.
+    """
+
+    def __init__(self):
+        self.download_dir = settings.DOCUMENT_DIR
+        self.max_bytes = settings.DOCUMENT_MAX_BYTES
+        self.max_chars = settings.DOCUMENT_MAX_CHARS
+        self.chunk_chars = settings.REPORT_CONTEXT_CHUNK_TOKENS * CHARS_PER_TOKEN
+        self.timeout = settings.DOCUMENT_DOWNLOAD_TIMEOUT
+        self.max_dir_bytes = settings.DOCUMENT_DIR_MAX_BYTES
+
+    def download(self, url: str, doc_type: str) -> Optional[str]:
+        """Stream a document to disk. Returns the path, or None if it failed or exceeded max_bytes."""
+        os.makedirs(self.download_dir, exist_ok=True)
+        path = os.path.join(self.download_dir, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.{doc_type}")
+        if os.path.exists(path):
+            os.utime(path)  # Mark as recently used for the LRU cap
+            return path
+
+        # A unique temporary name, so concurrent downloads of the same URL don't write into one file
+        partial = None
+        deadline = time.monotonic() + self.timeout
+        try:
+            with get_session().get(url, stream=True, timeout=request_timeout(self.timeout)) as response:
+                response.raise_for_status()
+                size = 0
+                with tempfile.NamedTemporaryFile(dir=self.download_dir, suffix=".part", delete=False) as f:
+                    partial = f.name
+                    for chunk in _iter_arrived(response):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise ValueError(f"larger than {self.max_bytes} bytes")
+                        # The read timeout only bounds each read; this bounds the whole download
+                        if time.monotonic() > deadline:
+                            raise ValueError(f"took longer than {self.timeout} s")
+                        f.write(chunk)
+            os.replace(partial, path)
+            return path
+        # read1() raises urllib3's own errors, which iter_content() would have wrapped
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, ValueError, OSError) as e:
+            print(f"DEBUG: Document download skipped for {url}: {e}")
+            if partial and os.path.exists(partial):
+                os.remove(partial)
+            return None
+
+    def evict(self):
+        """Remove the least recently used downloads until DOCUMENT_DIR fits in max_dir_bytes."""
+        try:
+            entries = [entry for entry in os.scandir(self.download_dir) if entry.is_file()]
+        except OSError:
+            return
+        files = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries)
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= self.max_dir_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            print(f"DEBUG: Removed {removed} cached documents to stay under {self.max_dir_bytes} bytes.")
+
+    def ingest(self, documents: List[Dict]) -> Dict[str, List[str]]:
+        """Download and extract documents; returns url -> text chunks."""
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="doc-download") as executor:
+            paths = list(executor.map(lambda d: self.download(d["url"], d["type"]), documents))
+
+        pool = get_process_pool()
+        futures = {
+            doc["url"]: pool.submit(extract_document_chunks, path, doc["type"], self.max_chars, self.chunk_chars)
+            for doc, path in zip(documents, paths) if path
+        }
+        # One deadline for the whole batch rather than a timeout per document
+        _, not_done = wait(futures.values(), timeout=self.timeout * 3)
+        chunks = {}
+        for url, future in futures.items():
+            if future in not_done:
+                print(f"DEBUG: Document extraction timed out for {url}")
+                continue
+            try:
+                chunks[url] = future.result()
+            except Exception as e:
+                print(f"DEBUG: Document extraction failed for {url}: {e}")
+        if not_done:
+            reset_process_pool(pool)
+        # Only evict once this batch is extracted, so its own files are not removed underneath it
+        self.evict()
+        return {url: c for url, c in chunks.items() if c}
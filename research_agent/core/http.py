@@ -0,0 +1,74 @@
+import asyncio
+import ipaddress
+import socket
+import threading
+import weakref
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from research_agent.config.settings import settings
+
+_session = None
+_session_lock = threading.Lock()
+# httpx async clients are bound to the event loop they were created on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def get_session() -> requests.Session:
+    """
+    Shared keep-alive session for provider HTTP calls.
+    Connections are pooled per host, so repeated calls to one API reuse the TCP+TLS connection.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.HTTP_POOL_SIZE,
+                pool_maxsize=settings.HTTP_POOL_SIZE,
+                max_retries=0
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared async client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_POOL_SIZE,
+                max_keepalive_connections=settings.HTTP_POOL_SIZE
+            ),
+            timeout=httpx.Timeout(settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+        )
+        _async_clients[loop] = client
+    return client
+
+def request_timeout(read_timeout: float = None) -> tuple:
+    """(connect, read) timeout tuple for requests."""
+    return (settings.HTTP_CONNECT_TIMEOUT, read_timeout or settings.HTTP_READ_TIMEOUT)
+
+def async_timeout(read_timeout: float = None) -> httpx.Timeout:
+    return httpx.Timeout(read_timeout or settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+
+def ensure_public_url(url: str):
+    """
+    Raise ValueError unless url is http(s) and every address its host resolves to is public.
+    Used before requesting third-party URLs (search results), so they cannot reach loopback,
+    private, link-local (cloud metadata) or other internal addresses.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"not an http(s) URL: {url!r}")
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise ValueError(f"cannot resolve {parts.hostname}: {e}") from e
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"{parts.hostname} resolves to non-public address {address}")
@@ -0,0 +1,130 @@
+import json
+import os
+import pickle
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from research_agent.config.settings import settings
+
+TRAINING_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_train.jsonl")
+MODEL_VERSION = 1
+FEATURE_DIM = 1 << 14
+LABELS = ("CHAT", "RESEARCH")
+
+# Whole-message small talk, answered locally with a canned reply
+CHAT_RULES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"^(hi+|hello+|hey+|hiya|howdy|yo|greetings|good (morning|afternoon|evening))( there)?( friday)?$"),
+     "Hello! I'm FRIDAY. What would you like me to look into today?"),
+    (re.compile(r"^(how are you|how are you doing|how r u|how's it going|what's up|sup)( today)?( friday)?$"),
+     "I'm running at full capacity and ready to help. What can I research for you?"),
+    (re.compile(r"^(thanks|thank you|thank u|thx|cheers|many thanks|thanks a lot|thank you so much)( friday)?$"),
+     "You're welcome! Let me know if you need anything else."),
+    (re.compile(r"^(bye|goodbye|bye bye|see you|see ya|see you later|good night|talk to you later)( friday)?$"),
+     "Goodbye! I'll be here whenever you need me."),
+    (re.compile(r"^(who are you|who are u|what are you|what is your name|what's your name)$"),
+     "I'm FRIDAY, your research assistant. I search the web, analyze what I find and write reports for you."),
+]
+# Clear information requests go straight to research
+RESEARCH_RULE = re.compile(
+    r"^(who (is|was|won|invented|founded|discovered)|what (is|are|was) the|when (is|was|did)|how (many|much)|"
+    r"latest|current|explain|history of|compare|research|summarize|population of|weather (in|for)|"
+    r"price of|news (about|on)|statistics on)\b"
+    r"|\b(stock price|score|forecast|exchange rate|gdp|filetype:)\b"
+)
+# Second-person, personal or creative wording: never decided as RESEARCH locally, since
+# "how much do you love me" or "write a poem about the current state of love" are chat
+CHAT_MARKERS = re.compile(
+    r"\b(you|your|yours|yourself|u|me|my|myself|i|i'm|write|poem|poems|joke|jokes|story|stories|song|"
+    r"thanks|thank)\b"
+)
+_NORMALIZE_RE = re.compile(r"[^\w\s']")
+
+def normalize(text: str) -> str:
+    return " ".join(_NORMALIZE_RE.sub(" ", text.lower()).split())
+
+def featurize(text: str) -> np.ndarray:
+    """Hashed, L2-normalised character 2-4 gram and word counts."""
+    normalized = normalize(text)
+    padded = f" {normalized} "
+    vector = np.zeros(FEATURE_DIM, dtype=np.float32)
+    grams = [padded[i:i + n] for n in (2, 3, 4) for i in range(len(padded) - n + 1)]
+    grams += [f"w:{word}" for word in normalized.split()]
+    for gram in grams:
+        vector[zlib.crc32(gram.encode("utf-8")) % FEATURE_DIM] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def load_examples(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def train_model(examples: List[Dict], epochs: int = 300, learning_rate: float = 2.0, l2: float = 1e-3) -> Dict:
+    """Logistic regression (P(RESEARCH)) fitted with full-batch gradient descent."""
+    X = np.stack([featurize(example["text"]) for example in examples])
+    y = np.array([1.0 if example["label"] == "RESEARCH" else 0.0 for example in examples], dtype=np.float32)
+    weights = np.zeros(FEATURE_DIM, dtype=np.float32)
+    bias = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(X @ weights + bias)))
+        error = p - y
+        weights -= learning_rate * (X.T @ error / len(y) + l2 * weights)
+        bias -= learning_rate * float(error.mean())
+    return {"version": MODEL_VERSION, "weights": weights, "bias": bias}
+
+class IntentClassifier:
+    """
+    Local CHAT/RESEARCH classifier in front of the LLM classifier.
+
+    1. Rules: whole-message small talk is CHAT with a canned reply; clear information
+       requests are RESEARCH unless they contain personal or creative markers (CHAT_MARKERS),
+       which always go to the LLM.
+    2. A logistic regression over hashed character n-grams, trained from intent_train.jsonl
+       on first use and pickled to INTENT_MODEL_PATH.
+    classify() returns None when neither is confident; the caller then asks the LLM.
+    Model CHAT predictions have no reply to give, so only confident RESEARCH predictions
+    are returned from the model.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, threshold: Optional[float] = None):
+        self.model_path = model_path or settings.INTENT_MODEL_PATH
+        self.threshold = threshold if threshold is not None else settings.INTENT_LOCAL_THRESHOLD
+        self._model: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def _load_model(self) -> Dict:
+        with self._lock:
+            if self._model is None:
+                try:
+                    with open(self.model_path, "rb") as f:
+                        model = pickle.load(f)
+                    if model.get("version") != MODEL_VERSION:
+                        raise ValueError("outdated model")
+                except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+                    model = train_model(load_examples(TRAINING_DATA_PATH))
+                    os.makedirs(os.path.dirname(os.path.abspath(self.model_path)), exist_ok=True)
+                    with open(self.model_path, "wb") as f:
+                        pickle.dump(model, f)
+                self._model = model
+            return self._model
+
+    def research_probability(self, text: str) -> float:
+        model = self._load_model()
+        return float(1.0 / (1.0 + np.exp(-(featurize(text) @ model["weights"] + model["bias"]))))
+
+    def classify(self, text: str) -> Optional[Dict]:
+        """Returns {"type", "response", "confidence", "source"} for confident cases, else None."""
+        normalized = normalize(text)
+        for pattern, response in CHAT_RULES:
+            if pattern.match(normalized):
+                return {"type": "CHAT", "response": response, "confidence": 1.0, "source": "rule"}
+        if CHAT_MARKERS.search(normalized):
+            return None
+        if RESEARCH_RULE.search(normalized):
+            return {"type": "RESEARCH", "response": None, "confidence": 1.0, "source": "rule"}
+
+        probability = self.research_probability(text)
+        if probability >= self.threshold:
+            return {"type": "RESEARCH", "response": None, "confidence": probability, "source": "model"}
+        return None
@@ -0,0 +1,108 @@
+import threading
+from typing import Any, Dict, Generator, Optional
+from anthropic import Anthropic
+from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.resilience import get_guard
+from research_agent.core.retry import RetryPolicy
+from research_agent.config.settings import settings
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+class AnthropicProvider(BaseLLMProvider):
+    """
+    Claude via the Messages API, with prompt caching of the stable prefix.
+
+    The system prompt (where callers put large repeated context, such as the analyzer's collected
+    research) and the conversation history are marked with cache_control breakpoints, so a later
+    request with the same prefix (a follow-up or a reformat of the same report) reads it from the
+    cache instead of processing it again. Only the new user prompt is uncached.
+    Token usage, including cache writes and reads, is accumulated in usage_stats().
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        # Retries are handled by RetryPolicy so they share backoff, budget and metrics
+        self.client = Anthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL or None,
+            max_retries=0
+        )
+        self.model = model or "claude-sonnet-4-5"
+        self.max_tokens = settings.ANTHROPIC_MAX_TOKENS
+        self.prompt_caching = settings.ANTHROPIC_PROMPT_CACHING
+        self.guard = get_guard("anthropic")
+        self.retry = RetryPolicy("anthropic")
+        self._usage = {"input_tokens": 0, "output_tokens": 0, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        self._usage_lock = threading.Lock()
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {"model": self.model}
+
+    def _request(self, prompt: str, history: list[dict], system_prompt: Optional[str]) -> Dict[str, Any]:
+        messages = []
+        for msg in history:
+            if msg.get("role") not in ["user", "assistant"] or not msg.get("content"):
+                continue
+            # The API expects alternating roles; merge consecutive messages of the same role
+            if messages and messages[-1]["role"] == msg["role"]:
+                messages[-1]["content"][0]["text"] += "\n\n" + msg["content"]
+            else:
+                messages.append({"role": msg["role"], "content": [{"type": "text", "text": msg["content"]}]})
+        # The conversation has to start with a user turn
+        while messages and messages[0]["role"] != "user":
+            messages.pop(0)
+
+        if self.prompt_caching and messages:
+            # Breakpoint after the history: everything before the new prompt is reusable next turn
+            messages[-1]["content"][-1]["cache_control"] = CACHE_CONTROL
+        if messages and messages[-1]["role"] == "user":
+            messages[-1]["content"].append({"type": "text", "text": prompt})
+        else:
+            messages.append({"role": "user", "content": [{"type": "text", "text": prompt}]})
+
+        request = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": messages
+        }
+        if system_prompt:
+            system_block = {"type": "text", "text": system_prompt}
+            if self.prompt_caching:
+                # Separate breakpoint so the system prompt is still a hit when the history changes
+                system_block["cache_control"] = CACHE_CONTROL
+            request["system"] = [system_block]
+        return request
+
+    def _record_usage(self, usage: Any):
+        counts = {field: getattr(usage, field, None) or 0 for field in self._usage}
+        with self._usage_lock:
+            for field, value in counts.items():
+                self._usage[field] += value
+        print(f"DEBUG: Anthropic usage: {counts['input_tokens']} input, {counts['cache_read_input_tokens']} cache read, "
+              f"{counts['cache_creation_input_tokens']} cache write, {counts['output_tokens']} output tokens.")
+
+    def usage_stats(self) -> Dict[str, int]:
+        """Accumulated token counts; cache_read_input_tokens are the prompt tokens served from the cache."""
+        with self._usage_lock:
+            return dict(self._usage)
+
+    def generate(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> str:
+        response = self.retry.call(self.guard.call, self.client.messages.create, **self._request(prompt, history, system_prompt))
+        self._record_usage(response.usage)
+        return "".join(block.text for block in response.content if block.type == "text")
+
+    def stream(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> Generator[str, None, None]:
+        request = self._request(prompt, history, system_prompt)
+        yield from self.retry.stream(lambda: self._stream_chunks(request))
+
+    def _stream_chunks(self, request: Dict[str, Any]) -> Generator[str, None, None]:
+        stream = self.guard.call(self.client.messages.create, stream=True, **request)
+        usage = None
+        for event in stream:
+            if event.type == "message_start":
+                usage = event.message.usage
+            elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                yield event.delta.text
+            elif event.type == "message_delta" and usage is not None:
+                usage.output_tokens = event.usage.output_tokens
+        if usage is not None:
+            self._record_usage(usage)
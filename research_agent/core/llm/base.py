@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Generator, Optional
+from typing import Any, Dict, Generator, Optional, Type
+from pydantic import BaseModel
+from research_agent.core.llm.structured import ModelT, parse_model, schema_instruction
 
 class BaseLLMProvider(ABC):
     @abstractmethod
@@ -11,3 +13,18 @@ class BaseLLMProvider(ABC):
     def stream(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> Generator[str, None, None]:
         """Stream a response from the LLM."""
         pass
+
+    def generate_json(self, prompt: str, schema: Type[ModelT], history: list[dict] = [], system_prompt: Optional[str] = None) -> ModelT:
+        """
+        Generate a response validated against a pydantic model.
+        Raises StructuredOutputError if the output does not match the schema.
+        """
+        return parse_model(self._generate_json_text(prompt, schema, history, system_prompt), schema)
+
+    def _generate_json_text(self, prompt: str, schema: Type[BaseModel], history: list[dict], system_prompt: Optional[str]) -> str:
+        """Raw JSON text for generate_json(); providers override this to use their native JSON mode."""
+        return self.generate(prompt + schema_instruction(schema), history=history, system_prompt=system_prompt)
+
+    def cache_params(self) -> Dict[str, Any]:
+        """Provider settings that change the output (e.g. model), used in response cache keys."""
+        return {}
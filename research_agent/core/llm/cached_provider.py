@@ -0,0 +1,177 @@
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, Generator, List, Optional, Type
+import numpy as np
+from research_agent.core.cache.store import SQLiteCache, get_sqlite_cache, make_cache_key
+from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.llm.structured import ModelT
+from research_agent.config.settings import settings
+
+NGRAM_SIZE = 3
+VECTOR_DIM = 4096
+_WORD_RE = re.compile(r"\w+")
+
+def normalize_text(text: str) -> str:
+    """Lowercase words only, so punctuation and spacing do not affect similarity."""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+def ngram_vector(text: str) -> np.ndarray:
+    """L2-normalised hashed character trigram counts, so cosine similarity is a dot product."""
+    padded = f" {normalize_text(text)} "
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for i in range(max(1, len(padded) - NGRAM_SIZE + 1)):
+        # crc32 rather than hash(): it is stable across processes, so vectors match the stored entries
+        vector[zlib.crc32(padded[i:i + NGRAM_SIZE].encode("utf-8")) % VECTOR_DIM] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class CachedLLMProvider(BaseLLMProvider):
+    """
+    Response-caching decorator around an LLM provider for one call site.
+
+    exact: responses are keyed by provider, model, temperature, system prompt, history and prompt.
+    semantic: callers may pass a semantic_key (e.g. the raw user query) to generate(); a response
+    cached for a key whose character trigram cosine similarity is at least semantic_threshold is
+    reused, regardless of history. Only meant for call sites like the classifier whose answer
+    depends on the user's wording rather than the conversation. Near-identical wordings can
+    still ask for different things ("a story about Max" vs "about Mia"), so callers pass a
+    semantic_filter that admits only responses safe to share, e.g. a bare label.
+    With both tiers off it simply passes calls through.
+    """
+
+    def __init__(self, provider: BaseLLMProvider, call_site: str, exact: bool = True, semantic: bool = False,
+                 cache: Optional[SQLiteCache] = None, semantic_cache: Optional[SQLiteCache] = None):
+        self.provider = provider
+        self.call_site = call_site
+        self.exact = exact
+        self.semantic = semantic
+        self.ttl = settings.LLM_CACHE_TTL
+        self.semantic_threshold = settings.LLM_SEMANTIC_CACHE_THRESHOLD
+        self.cache = cache or get_sqlite_cache(settings.LLM_CACHE_PATH, "llm_responses", settings.LLM_CACHE_MAX_ENTRIES)
+        self.semantic_cache = semantic_cache or get_sqlite_cache(
+            settings.LLM_CACHE_PATH, "llm_semantic", settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES
+        )
+        # In-memory similarity index over the semantic table, loaded on first use
+        self._index_keys: Optional[List[str]] = None
+        self._index_namespaces: Optional[List[str]] = None
+        self._index_vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def cache_params(self) -> Dict[str, Any]:
+        return self.provider.cache_params()
+
+    def _namespace(self, system_prompt: Optional[str]) -> List[Any]:
+        return [self.call_site, self.provider.__class__.__name__, self.provider.cache_params(),
+                settings.LLM_TEMPERATURE, system_prompt]
+
+    def cache_key(self, prompt: str, history: list[dict], system_prompt: Optional[str]) -> str:
+        turns = [[m.get("role"), m.get("content")] for m in history if m.get("role") in ["user", "assistant"]]
+        return make_cache_key(*self._namespace(system_prompt), turns, prompt)
+
+    def _semantic_entry_key(self, semantic_key: str, system_prompt: Optional[str]) -> str:
+        return make_cache_key(*self._namespace(system_prompt), normalize_text(semantic_key))
+
+    def _load_index(self):
+        if self._index_keys is None:
+            entries = self.semantic_cache.items(limit=settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES)
+            self._index_keys = [key for key, _ in entries]
+            self._index_namespaces = [value["namespace"] for _, value in entries]
+            self._index_vectors = np.array([ngram_vector(value["text"]) for _, value in entries], dtype=np.float32).reshape(-1, VECTOR_DIM)
+
+    def _semantic_lookup(self, semantic_key: str, system_prompt: Optional[str],
+                         semantic_filter: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        namespace = make_cache_key(*self._namespace(system_prompt))
+        with self._lock:
+            self._load_index()
+            # Entries of other call sites/prompts share the table; only this namespace is scored
+            rows = np.array([i for i, ns in enumerate(self._index_namespaces) if ns == namespace], dtype=np.int64)
+            similarities = self._index_vectors[rows] @ ngram_vector(semantic_key)
+            order = np.argsort(-similarities)
+            candidates = [self._index_keys[rows[i]] for i in order if similarities[i] >= self.semantic_threshold]
+        for key in candidates:
+            # peek() so rejected candidates don't count as hits or move up in the LRU order;
+            # evicted entries return None
+            entry = self.semantic_cache.peek(key)
+            if entry and (semantic_filter is None or semantic_filter(entry["response"])):
+                self.semantic_cache.get(key)  # Count the hit and refresh the entry
+                print(f"DEBUG: Semantic LLM cache hit ({self.call_site}): '{semantic_key}' ~ '{entry['text']}'")
+                return entry["response"]
+        self.semantic_cache.count_miss()
+        return None
+
+    def _semantic_store(self, semantic_key: str, system_prompt: Optional[str], response: str):
+        key = self._semantic_entry_key(semantic_key, system_prompt)
+        namespace = make_cache_key(*self._namespace(system_prompt))
+        self.semantic_cache.set(key, {
+            "namespace": namespace,
+            "text": semantic_key,
+            "response": response
+        }, self.ttl)
+        with self._lock:
+            self._load_index()
+            if key in self._index_keys:
+                return
+            self._index_keys.append(key)
+            self._index_namespaces.append(namespace)
+            self._index_vectors = np.vstack([self._index_vectors, ngram_vector(semantic_key)])
+            overflow = len(self._index_keys) - settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES
+            if overflow > 0:
+                del self._index_keys[:overflow]
+                del self._index_namespaces[:overflow]
+                self._index_vectors = self._index_vectors[overflow:]
+
+    def generate(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None,
+                 semantic_key: Optional[str] = None, semantic_filter: Optional[Callable[[str], bool]] = None) -> str:
+        key = self.cache_key(prompt, history, system_prompt) if self.exact else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"DEBUG: LLM cache hit ({self.call_site})")
+                return cached
+
+        use_semantic = self.semantic and bool(semantic_key and semantic_key.strip())
+        if use_semantic:
+            cached = self._semantic_lookup(semantic_key, system_prompt, semantic_filter)
+            if cached is not None:
+                return cached
+
+        response = self.provider.generate(prompt, history=history, system_prompt=system_prompt)
+        if response:
+            if key:
+                self.cache.set(key, response, self.ttl)
+            if use_semantic and (semantic_filter is None or semantic_filter(response)):
+                self._semantic_store(semantic_key, system_prompt, response)
+        return response
+
+    def generate_json(self, prompt: str, schema: Type[ModelT], history: list[dict] = [], system_prompt: Optional[str] = None) -> ModelT:
+        key = make_cache_key(self.cache_key(prompt, history, system_prompt), "json", schema.__name__, schema.model_json_schema()) if self.exact else None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            print(f"DEBUG: LLM cache hit ({self.call_site})")
+            return schema.model_validate(cached)
+
+        # Only validated objects reach the cache
+        result = self.provider.generate_json(prompt, schema, history=history, system_prompt=system_prompt)
+        if key:
+            self.cache.set(key, result.model_dump(mode="json"), self.ttl)
+        return result
+
+    def stream(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> Generator[str, None, None]:
+        key = self.cache_key(prompt, history, system_prompt) if self.exact else None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            print(f"DEBUG: LLM cache hit ({self.call_site})")
+            yield cached
+            return
+
+        parts = []
+        for part in self.provider.stream(prompt, history=history, system_prompt=system_prompt):
+            parts.append(part)
+            yield part
+        # Only reached when the stream was consumed to the end
+        if key and parts:
+            self.cache.set(key, "".join(parts), self.ttl)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"exact": self.cache.stats(), "semantic": self.semantic_cache.stats()}
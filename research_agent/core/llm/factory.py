@@ -1,17 +1,54 @@
+from typing import Optional
 from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.llm.cached_provider import CachedLLMProvider
 from research_agent.core.llm.openai_provider import OpenAIProvider
 from research_agent.core.llm.mock_provider import MockLLMProvider
 from research_agent.config.settings import settings
 
-def get_llm_provider() -> BaseLLMProvider:
+def resolve_model(call_site: Optional[str] = None) -> Optional[str]:
+    """
+    Model for a call site: LLM_MODEL if set, else the call site's entry in LLM_CALL_SITE_MODELS
+    ("fast"/"strong" tiers per provider, or a model name). None means the provider's default.
+    """
+    if settings.LLM_MODEL:
+        return settings.LLM_MODEL
+    provider_name = settings.DEFAULT_LLM_PROVIDER.lower()
+    choice = settings.LLM_CALL_SITE_MODELS.get(call_site, "strong") if call_site else "strong"
+    if choice == "fast":
+        return settings.LLM_FAST_MODELS.get(provider_name)
+    if choice == "strong":
+        return settings.LLM_STRONG_MODELS.get(provider_name)
+    return choice
+
+def _build_provider(model: Optional[str] = None) -> BaseLLMProvider:
     provider_name = settings.DEFAULT_LLM_PROVIDER.lower()
     
     if provider_name == "openai":
-        return OpenAIProvider()
+        return OpenAIProvider(model=model)
     elif provider_name == "mock":
-        return MockLLMProvider()
+        return MockLLMProvider(model=model)
+    elif provider_name == "anthropic":
+        from research_agent.core.llm.anthropic_provider import AnthropicProvider
+        return AnthropicProvider(model=model)
     elif provider_name == "google":
         from research_agent.core.llm.google_provider import GoogleGeminiProvider
-        return GoogleGeminiProvider()
+        return GoogleGeminiProvider(model=model)
     else:
         raise ValueError(f"Unsupported LLM provider: {provider_name}")
+
+def get_llm_provider(call_site: Optional[str] = None) -> BaseLLMProvider:
+    """
+    Build the configured LLM provider. call_site names the caller (classify, plan, report,
+    report_map, summary) and selects its model via resolve_model(). Call sites get a
+    CachedLLMProvider, which caches responses if the site is listed in LLM_CACHE_CALL_SITES /
+    LLM_SEMANTIC_CACHE_CALL_SITES and passes calls through otherwise.
+    """
+    provider = _build_provider(resolve_model(call_site))
+    if call_site is None:
+        return provider
+    return CachedLLMProvider(
+        provider,
+        call_site,
+        exact=settings.LLM_CACHE_ENABLED and call_site in settings.LLM_CACHE_CALL_SITES,
+        semantic=settings.LLM_CACHE_ENABLED and call_site in settings.LLM_SEMANTIC_CACHE_CALL_SITES
+    )
@@ -1,77 +1,71 @@
-from typing import Generator, Optional
+from functools import lru_cache
+from typing import Any, Dict, Generator, Optional, Tuple, Type
 import google.generativeai as genai
+from pydantic import BaseModel
 from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.llm.structured import schema_instruction
+from research_agent.core.resilience import get_guard
+from research_agent.core.retry import RetryPolicy
 from research_agent.config.settings import settings
 
+@lru_cache(maxsize=128)
+def format_history(turns: Tuple[Tuple[str, str], ...]) -> str:
+    """Chat history as the text block Gemini gets; cached since the same history is sent several times per turn."""
+    if not turns:
+        return ""
+    context_str = "Conversation History:\n"
+    for role, content in turns:
+        context_str += f"{role.capitalize()}: {content}\n"
+    return context_str + "\n"
+
 class GoogleGeminiProvider(BaseLLMProvider):
-    def __init__(self):
+    def __init__(self, model: Optional[str] = None):
         if not settings.GOOGLE_API_KEY:
             print("Error: GOOGLE_API_KEY is missing in settings!")
         else:
             print(f"Google API Key loaded: {settings.GOOGLE_API_KEY[:5]}...{settings.GOOGLE_API_KEY[-4:]}")
             
         genai.configure(api_key=settings.GOOGLE_API_KEY)
-        model_name = 'gemini-2.5-flash'
+        model_name = model or 'gemini-2.5-flash'
         print(f"DEBUG: Initializing Google Model: {model_name}")
         self.model = genai.GenerativeModel(model_name)
+        self.guard = get_guard("google")
+        self.retry = RetryPolicy("google")
 
-    def generate(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> str:
-        # Construct chat history for Gemini
-        context_str = ""
-        if history:
-            context_str = "Conversation History:\n"
-            for msg in history:
-                role = msg.get("role")
-                content = msg.get("content")
-                if role in ["user", "assistant"]:
-                    context_str += f"{role.capitalize()}: {content}\n"
-            context_str += "\n"
+    def cache_params(self) -> Dict[str, Any]:
+        return {"model": self.model.model_name}
 
-        full_prompt = prompt
+    def _build_prompt(self, prompt: str, history: list[dict], system_prompt: Optional[str]) -> str:
+        context_str = format_history(tuple(
+            (msg.get("role"), msg.get("content")) for msg in history if msg.get("role") in ["user", "assistant"]
+        ))
         if system_prompt:
-            full_prompt = f"System Instruction: {system_prompt}\n\n{context_str}User Query: {prompt}"
-        else:
-            full_prompt = f"{context_str}User Query: {prompt}"
-            
-        # Retry logic
-        max_retries = 3
-        base_delay = 5
-        
-        import time
-        import random
-        
-        for attempt in range(max_retries):
-            try:
-                response = self.model.generate_content(full_prompt)
-                return response.text
-            except Exception as e:
-                if "429" in str(e) or "quota" in str(e).lower():
-                    if attempt < max_retries - 1:
-                        delay = (base_delay * (2 ** attempt)) + random.uniform(0, 1)
-                        print(f"DEBUG: Rate limit hit. Retrying in {delay:.2f}s...")
-                        time.sleep(delay)
-                        continue
-                raise e
-        return ""
+            return f"System Instruction: {system_prompt}\n\n{context_str}User Query: {prompt}"
+        return f"{context_str}User Query: {prompt}"
 
-    def stream(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> Generator[str, None, None]:
-        context_str = ""
-        if history:
-            context_str = "Conversation History:\n"
-            for msg in history:
-                role = msg.get("role")
-                content = msg.get("content")
-                if role in ["user", "assistant"]:
-                    context_str += f"{role.capitalize()}: {content}\n"
-            context_str += "\n"
+    def generate(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> str:
+        full_prompt = self._build_prompt(prompt, history, system_prompt)
+        response = self.retry.call(self.guard.call, self.model.generate_content, full_prompt)
+        return response.text
 
-        full_prompt = prompt
-        if system_prompt:
-            full_prompt = f"System Instruction: {system_prompt}\n\n{context_str}User Query: {prompt}"
-        else:
-            full_prompt = f"{context_str}User Query: {prompt}"
+    def _generate_json_text(self, prompt: str, schema: Type[BaseModel], history: list[dict], system_prompt: Optional[str]) -> str:
+        # JSON mode guarantees syntactically valid JSON; the schema itself is described in the prompt
+        full_prompt = self._build_prompt(prompt + schema_instruction(schema), history, system_prompt)
+        response = self.retry.call(
+            self.guard.call,
+            self.model.generate_content,
+            full_prompt,
+            generation_config=genai.GenerationConfig(response_mime_type="application/json")
+        )
+        return response.text
 
-        response = self.model.generate_content(full_prompt, stream=True)
+    def _stream_chunks(self, full_prompt: str) -> Generator[str, None, None]:
+        response = self.guard.call(self.model.generate_content, full_prompt, stream=True)
         for chunk in response:
-            if chunk.text:
+            # chunk.text raises on chunks without parts (e.g. the final finish-reason chunk)
+            if chunk.parts and chunk.text:
                 yield chunk.text
+
+    def stream(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> Generator[str, None, None]:
+        full_prompt = self._build_prompt(prompt, history, system_prompt)
+        yield from self.retry.stream(lambda: self._stream_chunks(full_prompt))
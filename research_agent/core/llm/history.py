@@ -0,0 +1,80 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from research_agent.core.context.budget import CHARS_PER_TOKEN, estimate_tokens
+from research_agent.config.settings import settings
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+Turns = Tuple[Tuple[str, str], ...]
+
+def _clip(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + " …[truncated]"
+
+@lru_cache(maxsize=1024)
+def _summary_line(role: str, content: str, max_words: int = 30) -> str:
+    """One extractive line per message: the question, or the first sentence of the answer."""
+    text = " ".join(line.strip("#*- ") for line in content.splitlines() if line.strip())
+    if role == "assistant":
+        text = _SENTENCE_END_RE.split(text, 1)[0]
+    words = text.split()
+    return f"- {role.capitalize()}: {' '.join(words[:max_words])}{' …' if len(words) > max_words else ''}"
+
+@lru_cache(maxsize=256)
+def _compact(turns: Turns, keep_turns: int, token_budget: int, message_tokens: int, summary_tokens: int) -> Turns:
+    if keep_turns <= 0 or not turns:
+        return ()
+
+    # The last keep_turns exchanges, each clipped, oldest dropped first until they fit the budget
+    recent = [(role, _clip(content, message_tokens)) for role, content in turns[-keep_turns * 2:]]
+    while len(recent) > 1 and sum(estimate_tokens(content) for _, content in recent) > token_budget:
+        recent.pop(0)
+    older = turns[:len(turns) - len(recent)]
+
+    compacted = []
+    if older and summary_tokens > 0:
+        # Rolling extractive summary, keeping the most recent lines that fit
+        lines, used = [], estimate_tokens(SUMMARY_PREFIX)
+        for role, content in reversed(older):
+            line = _summary_line(role, content)
+            used += estimate_tokens(line)
+            if used > summary_tokens:
+                break
+            lines.append(line)
+        if lines:
+            compacted.append(("user", "\n".join([SUMMARY_PREFIX] + lines[::-1])))
+    return tuple(compacted + recent)
+
+class HistoryManager:
+    """
+    Gives each LLM call site a compacted view of the conversation: the last N turns
+    (HISTORY_CALL_SITE_TURNS) within HISTORY_TOKEN_BUDGET, with over-long messages such as
+    previous reports clipped, and an extractive rolling summary of the older turns.
+    Views are memoised on the history contents, so repeated calls in a turn and unchanged
+    earlier turns are not re-processed.
+    """
+
+    def __init__(self):
+        self.default_turns = settings.HISTORY_KEEP_TURNS
+        self.call_site_turns = settings.HISTORY_CALL_SITE_TURNS
+        self.token_budget = settings.HISTORY_TOKEN_BUDGET
+        self.message_tokens = settings.HISTORY_MESSAGE_MAX_TOKENS
+        self.summary_tokens = settings.HISTORY_SUMMARY_TOKENS
+
+    def view(self, history: List[Dict], call_site: str) -> List[Dict]:
+        turns = tuple(
+            (msg.get("role"), msg.get("content") or "")
+            for msg in history if msg.get("role") in ["user", "assistant"]
+        )
+        compacted = _compact(
+            turns,
+            self.call_site_turns.get(call_site, self.default_turns),
+            self.token_budget,
+            self.message_tokens,
+            self.summary_tokens
+        )
+        return [{"role": role, "content": content} for role, content in compacted]
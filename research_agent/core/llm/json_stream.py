@@ -0,0 +1,75 @@
+import json
+from typing import List
+
+class StreamingArrayParser:
+    """
+    Incremental parser for streamed JSON model output.
+
+    Feed it text chunks as they arrive; feed() returns the string elements of the array under
+    `key` (at any object depth) that were completed by that chunk. Only strings, brackets,
+    colons and braces are tracked, so code fences or text around the object are tolerated.
+    The full text is kept in .text for parsing the rest of the object at the end.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.text = ""
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._raw: List[str] = []
+        self._last_key = None  # last completed string directly inside an object
+        self._await_array = False
+        self._array_depth = None  # stack depth of the array being extracted
+        self._done = False
+
+    def feed(self, chunk: str) -> List[str]:
+        self.text += chunk
+        completed = []
+        for char in chunk:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    self._raw.append(char)
+                elif char == "\\":
+                    self._escape = True
+                    self._raw.append(char)
+                elif char == '"':
+                    self._in_string = False
+                    value = self._decode("".join(self._raw))
+                    if self._array_depth is not None and len(self._stack) == self._array_depth:
+                        if value is not None:
+                            completed.append(value)
+                    elif self._stack and self._stack[-1] == "{":
+                        self._last_key = value
+                else:
+                    self._raw.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._raw = []
+            elif char == ":":
+                self._await_array = self._last_key == self.key and self._array_depth is None and not self._done
+                self._last_key = None
+            elif char in "{[":
+                self._stack.append(char)
+                if char == "[" and self._await_array:
+                    self._array_depth = len(self._stack)
+                self._await_array = False
+            elif char in "}]":
+                if self._array_depth is not None and len(self._stack) == self._array_depth:
+                    self._array_depth = None
+                    self._done = True
+                if self._stack:
+                    self._stack.pop()
+            elif not char.isspace():
+                self._await_array = False
+        return completed
+
+    @staticmethod
+    def _decode(raw: str):
+        try:
+            return json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            return None
@@ -3,6 +3,9 @@ import time
 from research_agent.core.llm.base import BaseLLMProvider
 
 class MockLLMProvider(BaseLLMProvider):
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+
     def generate(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> str:
         return f"Mock response to: {prompt}"
 
@@ -1,14 +1,24 @@
-from typing import Generator, Optional
+from typing import Any, Dict, Generator, Optional, Type
 from openai import OpenAI
+from pydantic import BaseModel
 from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.llm.structured import strict_json_schema
+from research_agent.core.resilience import get_guard
+from research_agent.core.retry import RetryPolicy
 from research_agent.config.settings import settings
 
 class OpenAIProvider(BaseLLMProvider):
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = "gpt-4o" # Default to a capable model
+    def __init__(self, model: Optional[str] = None):
+        # Retries are handled by RetryPolicy so they share backoff, budget and metrics
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        self.model = model or "gpt-4o" # Default to a capable model
+        self.guard = get_guard("openai")
+        self.retry = RetryPolicy("openai")
 
-    def generate(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> str:
+    def cache_params(self) -> Dict[str, Any]:
+        return {"model": self.model}
+
+    def _messages(self, prompt: str, history: list[dict], system_prompt: Optional[str]) -> list[dict]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -19,30 +29,45 @@ class OpenAIProvider(BaseLLMProvider):
                 messages.append({"role": msg.get("role"), "content": msg.get("content")})
 
         messages.append({"role": "user", "content": prompt})
+        return messages
 
-        response = self.client.chat.completions.create(
+    def generate(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> str:
+        messages = self._messages(prompt, history, system_prompt)
+        response = self.retry.call(
+            self.guard.call,
+            self.client.chat.completions.create,
             model=self.model,
             messages=messages
         )
         return response.choices[0].message.content
 
     def stream(self, prompt: str, history: list[dict] = [], system_prompt: Optional[str] = None) -> Generator[str, None, None]:
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-            
-        # Add history
-        for msg in history:
-            if msg.get("role") in ["user", "assistant"]:
-                messages.append({"role": msg.get("role"), "content": msg.get("content")})
-
-        messages.append({"role": "user", "content": prompt})
+        messages = self._messages(prompt, history, system_prompt)
+        yield from self.retry.stream(lambda: self._stream_chunks(messages))
 
-        stream = self.client.chat.completions.create(
+    def _stream_chunks(self, messages: list[dict]) -> Generator[str, None, None]:
+        stream = self.guard.call(
+            self.client.chat.completions.create,
             model=self.model,
             messages=messages,
             stream=True
         )
         for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
+            if chunk.choices and chunk.choices[0].delta.content is not None:
                 yield chunk.choices[0].delta.content
+
+    def _generate_json_text(self, prompt: str, schema: Type[BaseModel], history: list[dict], system_prompt: Optional[str]) -> str:
+        # Strict Structured Outputs: decoding is constrained to the schema, so the reply always parses
+        # and has every field; consistency rules (e.g. CHAT needs a response) are still checked by
+        # parse_model in generate_json
+        response = self.retry.call(
+            self.guard.call,
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=self._messages(prompt, history, system_prompt),
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": schema.__name__, "schema": strict_json_schema(schema), "strict": True}
+            }
+        )
+        return response.choices[0].message.content
@@ -0,0 +1,54 @@
+import json
+import re
+from typing import Type, TypeVar
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+class StructuredOutputError(ValueError):
+    """The model's output was not valid JSON for the requested schema."""
+
+def schema_instruction(schema: Type[BaseModel]) -> str:
+    """Prompt suffix for providers without a native schema mode."""
+    return (
+        "\n\nRespond with a single JSON object (no Markdown, no commentary) matching this JSON schema:\n"
+        f"{json.dumps(schema.model_json_schema())}"
+    )
+
+def strict_json_schema(schema: Type[BaseModel]) -> dict:
+    """
+    The schema in the form OpenAI's strict Structured Outputs accept: every object closed with
+    additionalProperties false and all of its properties required (optional fields stay nullable
+    through their anyOf), without default values.
+    """
+    def tighten(node):
+        if isinstance(node, dict):
+            node.pop("default", None)
+            properties = node.get("properties")
+            if node.get("type") == "object" and isinstance(properties, dict):
+                node["additionalProperties"] = False
+                node["required"] = list(properties)
+                for value in properties.values():
+                    tighten(value)
+            for key, value in node.items():
+                if key != "properties":
+                    tighten(value)
+        elif isinstance(node, list):
+            for value in node:
+                tighten(value)
+        return node
+
+    return tighten(schema.model_json_schema())
+
+def parse_model(text: str, schema: Type[ModelT]) -> ModelT:
+    """Validate model output against schema, tolerating code fences or text around the object."""
+    text = _FENCE_RE.sub("", (text or "").strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise StructuredOutputError(f"No JSON object in model output: {text[:200]!r}")
+    try:
+        return schema.model_validate_json(text[start:end + 1])
+    except ValidationError as e:
+        raise StructuredOutputError(f"Model output does not match {schema.__name__}: {e}") from e
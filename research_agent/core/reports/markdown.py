@@ -0,0 +1,166 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+@dataclass(frozen=True)
+class Span:
+    """A run of inline text with uniform formatting."""
+    text: str
+    bold: bool = False
+    italic: bool = False
+    code: bool = False
+    url: Optional[str] = None
+
+@dataclass
+class Heading:
+    level: int
+    spans: List[Span]
+
+@dataclass
+class Paragraph:
+    spans: List[Span]
+
+@dataclass
+class ListItem:
+    spans: List[Span]
+    ordered: bool = False
+    number: int = 1
+    depth: int = 0  # nesting level, from the indentation
+
+@dataclass
+class Table:
+    header: List[List[Span]]
+    rows: List[List[List[Span]]] = field(default_factory=list)
+
+@dataclass
+class CodeBlock:
+    text: str
+
+@dataclass
+class Rule:
+    pass
+
+Block = Union[Heading, Paragraph, ListItem, Table, CodeBlock, Rule]
+
+# A closing run of hashes only counts when separated by whitespace, so "# C#" keeps its "#"
+_HEADING_RE = re.compile(r"(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_LIST_RE = re.compile(r"( *)(?:([-*+])|(\d+)[.)])\s+(.*)")
+_RULE_RE = re.compile(r"\s*([-*_])(\s*\1){2,}\s*$")
+_TABLE_SEPARATOR_CELL_RE = re.compile(r":?-+:?")
+# One alternation, scanned left to right: links, bold, italic, inline code
+_INLINE_RE = re.compile(
+    r"\[(?P<link>[^\]]+)\]\((?P<url>[^)\s]+)\)"
+    r"|\*\*(?P<bold>.+?)\*\*|__(?P<bold2>.+?)__"
+    r"|\*(?P<italic>[^*\s](?:[^*]*[^*\s])?)\*|(?<!\w)_(?P<italic2>[^_\s](?:[^_]*[^_\s])?)_(?!\w)"
+    r"|`(?P<code>[^`]+)`"
+)
+
+def parse_inline(text: str, bold: bool = False, italic: bool = False, url: Optional[str] = None) -> List[Span]:
+    """Split text into formatted spans; bold, italic and link text may contain further markup."""
+    spans, position = [], 0
+    for match in _INLINE_RE.finditer(text):
+        if match.start() > position:
+            spans.append(Span(text[position:match.start()], bold, italic, url=url))
+        if match["link"] is not None:
+            spans.extend(parse_inline(match["link"], bold, italic, match["url"]))
+        elif match["bold"] is not None or match["bold2"] is not None:
+            spans.extend(parse_inline(match["bold"] or match["bold2"], True, italic, url))
+        elif match["italic"] is not None or match["italic2"] is not None:
+            spans.extend(parse_inline(match["italic"] or match["italic2"], bold, True, url))
+        else:
+            spans.append(Span(match["code"], bold, italic, code=True, url=url))
+        position = match.end()
+    if position < len(text):
+        spans.append(Span(text[position:], bold, italic, url=url))
+    return spans
+
+def plain_text(spans: List[Span]) -> str:
+    return "".join(span.text for span in spans)
+
+def _table_cells(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+def _is_table_separator(line: str, columns: int) -> bool:
+    """A separator row has one :?-+:? cell per header column, e.g. |---|:-:|."""
+    if "|" not in line:
+        return False
+    cells = _table_cells(line)
+    return len(cells) == columns and all(_TABLE_SEPARATOR_CELL_RE.fullmatch(cell) for cell in cells)
+
+def parse_markdown(text: str) -> List[Block]:
+    """
+    Parse report Markdown into blocks in a single pass over its lines.
+    Supports ATX headings, paragraphs (consecutive lines are joined), bullet and numbered lists
+    with nesting, pipe tables, fenced code blocks and horizontal rules, plus bold, italic,
+    inline code and links inside them.
+    """
+    blocks: List[Block] = []
+    lines = text.splitlines()
+    paragraph: List[str] = []
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(Paragraph(parse_inline(" ".join(paragraph))))
+            paragraph.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        i += 1
+
+        if not stripped:
+            flush_paragraph()
+            continue
+
+        if stripped.startswith("```"):
+            flush_paragraph()
+            code = []
+            while i < len(lines) and not lines[i].strip().startswith("```"):
+                code.append(lines[i])
+                i += 1
+            i += 1  # Closing fence
+            blocks.append(CodeBlock("\n".join(code)))
+            continue
+
+        heading = _HEADING_RE.match(stripped)
+        if heading:
+            flush_paragraph()
+            blocks.append(Heading(len(heading.group(1)), parse_inline(heading.group(2))))
+            continue
+
+        if _RULE_RE.match(stripped):
+            flush_paragraph()
+            blocks.append(Rule())
+            continue
+
+        if "|" in stripped and i < len(lines) and _is_table_separator(lines[i], len(_table_cells(stripped))):
+            flush_paragraph()
+            table = Table([parse_inline(cell) for cell in _table_cells(stripped)])
+            i += 1  # Separator row
+            while i < len(lines) and "|" in lines[i] and lines[i].strip():
+                table.rows.append([parse_inline(cell) for cell in _table_cells(lines[i])])
+                i += 1
+            blocks.append(table)
+            continue
+
+        item = _LIST_RE.match(line)
+        if item:
+            flush_paragraph()
+            indent, _, number, content = item.groups()
+            blocks.append(ListItem(
+                parse_inline(content),
+                ordered=number is not None,
+                number=int(number) if number else 1,
+                depth=len(indent) // 2
+            ))
+            continue
+
+        paragraph.append(stripped)
+    flush_paragraph()
+    return blocks
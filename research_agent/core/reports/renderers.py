@@ -0,0 +1,251 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from fpdf import FPDF
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import RGBColor
+from openpyxl import Workbook
+from research_agent.core.reports.markdown import Block, CodeBlock, Heading, ListItem, Paragraph, Rule, Span, Table, plain_text
+from research_agent.core.workers import worker_context
+
+# Renderers are module-level functions so they can run in worker processes: fpdf and
+# python-docx are pure Python and would otherwise hold the GIL while a report is laid out.
+FILE_FORMATS = ("pdf", "docx", "excel")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_render_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process-wide pool for rendering report files, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=worker_context())
+        return _pool
+
+def reset_render_pool():
+    """Drop a pool whose workers died so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def render_file(file_format: str, output_dir: str, title: str, blocks: List[Block], sources: List[Dict], documents: List[Dict]) -> str:
+    """Render one report file from the parsed report (see markdown.parse_markdown) and return its path."""
+    if file_format == "pdf":
+        return render_pdf(output_dir, title, blocks)
+    if file_format == "docx":
+        return render_docx(output_dir, title, blocks)
+    if file_format == "excel":
+        return render_excel(output_dir, title, sources, documents)
+    raise ValueError(f"Unsupported report format: {file_format}")
+
+def _pdf_text(text: str) -> str:
+    # The core PDF fonts use cp1252 and fpdf writes str as Latin-1 bytes, so smart quotes and
+    # dashes survive as their cp1252 byte; anything else becomes '?'
+    return text.encode("cp1252", "replace").decode("latin-1")
+
+def _pdf_spans(pdf: FPDF, spans: List[Span], height: float = 6, size: int = 11):
+    for span in spans:
+        style = ("B" if span.bold else "") + ("I" if span.italic else "") + ("U" if span.url else "")
+        pdf.set_font("Courier" if span.code else "Arial", style, size)
+        if span.url:
+            pdf.set_text_color(0, 0, 255)
+            pdf.write(height, _pdf_text(span.text), span.url)
+            pdf.set_text_color(0, 0, 0)
+        else:
+            pdf.write(height, _pdf_text(span.text))
+    pdf.set_font("Arial", "", size)
+
+def _pdf_fit(pdf: FPDF, text: str, width: float) -> str:
+    """Shorten text to fit a table cell, estimating the cut from the measured width."""
+    measured = pdf.get_string_width(text)
+    if measured <= width:
+        return text
+    return text[:max(0, int(len(text) * width / measured) - 3)] + "..."
+
+def render_pdf(output_dir: str, title: str, blocks: List[Block]) -> str:
+    """
+    Render a parsed report to PDF.
+    """
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    
+    # Title
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, _pdf_text(f"Research Report: {title}"), 0, 1, 'C')
+    pdf.ln(10)
+    
+    # Content
+    pdf.set_font("Arial", size=11)
+    page_width = pdf.w - pdf.l_margin - pdf.r_margin
+    
+    for block in blocks:
+        if isinstance(block, Heading):
+            size = {1: 14, 2: 12}.get(block.level, 11)
+            pdf.ln(5 if block.level == 1 else 3)
+            pdf.set_font("Arial", 'B', size)
+            pdf.cell(0, 10, _pdf_text(plain_text(block.spans)), 0, 1)
+            pdf.set_font("Arial", size=11)
+        elif isinstance(block, Paragraph):
+            _pdf_spans(pdf, block.spans)
+            pdf.ln(8)
+        elif isinstance(block, ListItem):
+            pdf.set_x(pdf.l_margin + 5 + 6 * block.depth)
+            pdf.write(6, f"{block.number}. " if block.ordered else chr(149) + " ")
+            _pdf_spans(pdf, block.spans)
+            pdf.ln(7)
+        elif isinstance(block, Table):
+            columns = max(len(block.header), max((len(row) for row in block.rows), default=0))
+            width = page_width / columns
+            for is_header, row in [(True, block.header)] + [(False, row) for row in block.rows]:
+                pdf.set_font("Arial", 'B' if is_header else '', 10)
+                for c in range(columns):
+                    text = _pdf_text(plain_text(row[c])) if c < len(row) else ""
+                    pdf.cell(width, 7, _pdf_fit(pdf, text, width - 2), 1, 0)
+                pdf.ln(7)
+            pdf.set_font("Arial", size=11)
+            pdf.ln(3)
+        elif isinstance(block, CodeBlock):
+            pdf.set_font("Courier", size=9)
+            pdf.multi_cell(0, 5, _pdf_text(block.text))
+            pdf.set_font("Arial", size=11)
+            pdf.ln(3)
+        elif isinstance(block, Rule):
+            pdf.ln(2)
+            pdf.line(pdf.l_margin, pdf.get_y(), pdf.l_margin + page_width, pdf.get_y())
+            pdf.ln(4)
+            
+    filename = f"{sanitize_filename(title)}_report.pdf"
+    filepath = os.path.join(output_dir, filename)
+    pdf.output(filepath)
+    return filepath
+
+def _docx_hyperlink(paragraph, span: Span, link_ids: Dict[str, str]):
+    # python-docx has no hyperlink API; build the w:hyperlink element around a styled run.
+    # relate_to() scans every relationship to reuse or number one, so ids are assigned here
+    if span.url not in link_ids:
+        rels = paragraph.part.rels
+        n = len(rels) + 1
+        while f"rId{n}" in rels:
+            n += 1
+        link_ids[span.url] = rels.add_relationship(RT.HYPERLINK, span.url, f"rId{n}", is_external=True).rId
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), link_ids[span.url])
+    run = _docx_run(paragraph, span.text)
+    run.underline = True
+    run.font.color.rgb = RGBColor(0, 0, 255)
+    hyperlink.append(run._r)
+    paragraph._p.append(hyperlink)
+    return run
+
+def _docx_rule(paragraph):
+    # A horizontal rule is an empty paragraph with a bottom border, as Word draws "---"
+    border = OxmlElement("w:bottom")
+    for attribute, value in (("w:val", "single"), ("w:sz", "6"), ("w:space", "1"), ("w:color", "auto")):
+        border.set(qn(attribute), value)
+    borders = OxmlElement("w:pBdr")
+    borders.append(border)
+    paragraph._p.get_or_add_pPr().append(borders)
+
+def _docx_run(paragraph, text: str):
+    # Appending the text element directly skips the run.text setter's clear-and-parse pass
+    run = paragraph.add_run()
+    run._r.add_t(text)
+    return run
+
+def _docx_spans(paragraph, spans: List[Span], link_ids: Dict[str, str], bold: bool = False):
+    for span in spans:
+        run = _docx_hyperlink(paragraph, span, link_ids) if span.url else _docx_run(paragraph, span.text)
+        # Only set properties that differ from the paragraph style; each one is an XML edit
+        if span.bold or bold:
+            run.bold = True
+        if span.italic:
+            run.italic = True
+        if span.code:
+            run.font.name = "Courier New"
+
+def render_docx(output_dir: str, title: str, blocks: List[Block]) -> str:
+    """
+    Render a parsed report to DOCX.
+    """
+    doc = Document()
+    doc.add_heading(f"Research Report: {title}", 0)
+
+    # Style ids and the text width are resolved once: python-docx looks styles up by scanning
+    # styles.xml, and add_table() searches the whole body for the section, on every call
+    style_ids: Dict[str, str] = {}
+    link_ids: Dict[str, str] = {}
+    section = doc.sections[-1]
+    block_width = section.page_width - section.left_margin - section.right_margin
+
+    def style_id(name: str) -> str:
+        if name not in style_ids:
+            style_ids[name] = doc.styles[name].style_id
+        return style_ids[name]
+
+    def add_paragraph(style: Optional[str] = None):
+        paragraph = doc.add_paragraph()
+        if style:
+            paragraph._p.style = style_id(style)
+        return paragraph
+    
+    for block in blocks:
+        if isinstance(block, Heading):
+            _docx_run(add_paragraph(f"Heading {min(block.level, 9)}"), plain_text(block.spans))
+        elif isinstance(block, Paragraph):
+            _docx_spans(add_paragraph(), block.spans, link_ids)
+        elif isinstance(block, ListItem):
+            style = "List Number" if block.ordered else "List Bullet"
+            if block.depth:
+                style += f" {min(block.depth + 1, 3)}"
+            _docx_spans(add_paragraph(style), block.spans, link_ids)
+        elif isinstance(block, Table):
+            columns = max(len(block.header), max((len(row) for row in block.rows), default=0))
+            table = doc._body.add_table(1 + len(block.rows), columns, block_width)
+            table._tbl.tblPr.style = style_id("Table Grid")
+            for r, (table_row, row) in enumerate(zip(table.rows, [block.header] + block.rows)):
+                for cell, spans in zip(table_row.cells, row):
+                    _docx_spans(cell.paragraphs[0], spans, link_ids, bold=r == 0)
+        elif isinstance(block, CodeBlock):
+            add_paragraph().add_run(block.text).font.name = "Courier New"
+        elif isinstance(block, Rule):
+            _docx_rule(add_paragraph())
+                
+    filename = f"{sanitize_filename(title)}_report.docx"
+    filepath = os.path.join(output_dir, filename)
+    doc.save(filepath)
+    return filepath
+
+def render_excel(output_dir: str, title: str, sources: List[Dict], documents: List[Dict]) -> str:
+    """
+    Generate Excel sheet with sources and documents.
+    """
+    wb = Workbook()
+    
+    # Sources Sheet
+    ws_sources = wb.active
+    ws_sources.title = "Sources"
+    ws_sources.append(["Title", "URL"])
+    for source in sources:
+        ws_sources.append([source.get("title"), source.get("url")])
+        
+    # Documents Sheet
+    ws_docs = wb.create_sheet("Documents")
+    ws_docs.append(["Title", "Type", "URL", "Excerpt"])
+    for doc in documents:
+        ws_docs.append([doc.get("title"), doc.get("type"), doc.get("url"), doc.get("excerpt", "")])
+        
+    filename = f"{sanitize_filename(title)}_data.xlsx"
+    filepath = os.path.join(output_dir, filename)
+    wb.save(filepath)
+    return filepath
+
+def sanitize_filename(filename: str) -> str:
+    return "".join([c for c in filename if c.isalpha() or c.isdigit() or c=='_' or c=='.']).rstrip()
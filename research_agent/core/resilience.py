@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict
+from research_agent.config.settings import settings
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Best-effort detection of HTTP 429 / quota errors across requests, httpx and SDK exceptions."""
+    response = getattr(error, "response", None)
+    for status in (getattr(error, "status_code", None), getattr(error, "code", None), getattr(response, "status_code", None)):
+        if status == 429:
+            return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+class TokenBucket:
+    """
+    Adaptive token-bucket rate limiter.
+    Starts at the provider's quota rate; throttle() halves the rate after a 429 and
+    recover() adds it back gradually on success. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, min_fraction: float = 0.1):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.min_rate = rate * min_fraction
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller must wait before using it."""
+        if self.base_rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+    Opens after failure_threshold consecutive failures, then lets a single trial call
+    through once reset_timeout has passed.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+class ProviderGuard:
+    """Rate limiter plus circuit breaker for one upstream provider."""
+
+    def __init__(self, name: str, rate: float, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.limiter = TokenBucket(rate)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    def _before_call(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), failing fast.")
+
+    def _on_error(self, error: Exception):
+        self.breaker.record_failure()
+        if is_rate_limit_error(error):
+            self.limiter.throttle()
+
+    def _on_success(self):
+        self.breaker.record_success()
+        self.limiter.recover()
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        self._before_call()
+        self.limiter.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._on_error(e)
+            raise
+        self._on_success()
+        return result
+
+    async def acall(self, fn: Callable, *args, **kwargs) -> Any:
+        self._before_call()
+        await self.limiter.aacquire()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            self._on_error(e)
+            raise
+        self._on_success()
+        return result
+
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+def get_guard(name: str) -> ProviderGuard:
+    """Process-wide guard for a provider, sized from PROVIDER_RATE_LIMITS."""
+    with _guards_lock:
+        if name not in _guards:
+            _guards[name] = ProviderGuard(
+                name,
+                rate=settings.PROVIDER_RATE_LIMITS.get(name, 0.0),
+                failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_RESET_TIMEOUT
+            )
+        return _guards[name]
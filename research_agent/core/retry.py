@@ -0,0 +1,153 @@
+import contextvars
+import email.utils
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, Iterator, Optional
+from tenacity import RetryCallState, Retrying, retry_if_exception, wait_exponential, wait_random
+from research_agent.core.resilience import CircuitOpenError, is_rate_limit_error
+from research_agent.config.settings import settings
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504, 529}
+# SDK exception classes (OpenAI, google-api-core) for timeouts and dropped connections
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "InternalServerError", "ServiceUnavailable",
+    "DeadlineExceeded", "ResourceExhausted", "TooManyRequests"
+}
+# Gemini puts the suggested delay in the message rather than a header
+_RETRY_DELAY_PATTERNS = [
+    re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)")
+]
+
+_turn_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("turn_deadline", default=None)
+
+@contextmanager
+def retry_budget(seconds: float):
+    """
+    Limit retries to the given wall-clock budget: inside the block, a retry is only
+    scheduled if its backoff would end before the deadline. Threads started with
+    contextvars.copy_context() inherit the budget.
+    """
+    token = _turn_deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+    try:
+        yield
+    finally:
+        _turn_deadline.reset(token)
+
+def _status_code(error: BaseException) -> Optional[int]:
+    response = getattr(error, "response", None)
+    for status in (getattr(error, "status_code", None), getattr(error, "code", None), getattr(response, "status_code", None)):
+        if isinstance(status, int):
+            return status
+    return None
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Best-effort detection of transient errors: throttling, 5xx, timeouts and connection resets."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    # An exhausted quota (e.g. OpenAI's insufficient_quota 429) won't clear within the turn unless the
+    # server says when to come back, as Gemini's per-minute quotas do
+    if "quota" in str(error).lower() and retry_after_seconds(error) is None:
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return _status_code(error) in RETRYABLE_STATUS or is_rate_limit_error(error)
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-suggested delay from Retry-After / retry-after-ms headers or the error message."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            if value.strip().isdigit():
+                return float(value)
+            # HTTP-date form
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(str(error))
+        if match:
+            return float(match.group(1))
+    return None
+
+class RetryMetrics:
+    """Per-provider retry counters: calls, retries, calls that gave up and seconds spent backing off."""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, field: str, amount: float = 1):
+        with self._lock:
+            counts = self._counts.setdefault(name, {"calls": 0, "retries": 0, "gave_up": 0, "backoff_seconds": 0.0})
+            counts[field] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+retry_metrics = RetryMetrics()
+
+class RetryPolicy:
+    """
+    Shared retry policy for provider calls: exponential backoff with jitter, honouring the
+    server's Retry-After when given, capped by max_attempts and by the current retry_budget().
+    Streams are only retried until their first chunk, since a partial answer cannot be replayed.
+    """
+
+    def __init__(self, name: str, max_attempts: int = None, base_delay: float = None, max_delay: float = None):
+        self.name = name
+        self.max_attempts = max_attempts or settings.LLM_RETRY_MAX_ATTEMPTS
+        self.max_delay = max_delay or settings.LLM_RETRY_MAX_DELAY
+        base_delay = base_delay or settings.LLM_RETRY_BASE_DELAY
+        self._backoff = wait_exponential(multiplier=base_delay, max=self.max_delay) + wait_random(0, base_delay)
+
+    def _wait(self, retry_state: RetryCallState) -> float:
+        suggested = retry_after_seconds(retry_state.outcome.exception())
+        if suggested is not None:
+            return min(suggested, self.max_delay)
+        return self._backoff(retry_state)
+
+    def _stop(self, retry_state: RetryCallState) -> bool:
+        deadline = _turn_deadline.get()
+        out_of_budget = deadline is not None and time.monotonic() + retry_state.upcoming_sleep > deadline
+        if retry_state.attempt_number >= self.max_attempts or out_of_budget:
+            retry_metrics.record(self.name, "gave_up")
+            return True
+        return False
+
+    def _before_sleep(self, retry_state: RetryCallState):
+        retry_metrics.record(self.name, "retries")
+        retry_metrics.record(self.name, "backoff_seconds", retry_state.upcoming_sleep)
+        print(f"DEBUG: {self.name} call failed ({retry_state.outcome.exception()}). "
+              f"Retry {retry_state.attempt_number}/{self.max_attempts - 1} in {retry_state.upcoming_sleep:.2f}s...")
+
+    def _retrying(self) -> Retrying:
+        return Retrying(
+            retry=retry_if_exception(is_retryable_error),
+            wait=self._wait,
+            stop=self._stop,
+            before_sleep=self._before_sleep,
+            reraise=True
+        )
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        retry_metrics.record(self.name, "calls")
+        return self._retrying()(fn, *args, **kwargs)
+
+    def stream(self, make_stream: Callable[[], Iterator[str]]) -> Generator[str, None, None]:
+        retry_metrics.record(self.name, "calls")
+        end = object()
+        for attempt in self._retrying():
+            with attempt:
+                iterator = iter(make_stream())
+                first = next(iterator, end)
+        if first is end:
+            return
+        yield first
+        yield from iterator
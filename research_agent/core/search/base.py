@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 
@@ -9,3 +10,18 @@ class BaseSearchProvider(ABC):
         Each result should be a dict with 'title', 'url', and 'content'.
         """
         pass
+
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of search().
+        Providers with an HTTP API override this to use the shared async client;
+        the default runs search() in a worker thread.
+        """
+        return await asyncio.to_thread(self.search, query)
+
+    def cache_params(self) -> Dict[str, Any]:
+        """
+        Provider parameters that change the results for a given query.
+        Used by caching layers as part of the cache key.
+        """
+        return {}
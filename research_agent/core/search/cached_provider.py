@@ -0,0 +1,89 @@
+import re
+from typing import List, Dict, Any, Optional
+from research_agent.core.cache.store import SQLiteCache, get_sqlite_cache, make_cache_key
+from research_agent.core.search.base import BaseSearchProvider
+from research_agent.core.resilience import CircuitOpenError
+from research_agent.config.settings import settings
+
+# Queries about fast-moving topics only get the short TTL
+VOLATILE_QUERY_PATTERN = re.compile(
+    r"\b(latest|today|tonight|yesterday|now|current|live|breaking|news|price|prices|stock|stocks|"
+    r"score|scores|weather|forecast|rate|rates|election)\b"
+)
+
+class CachedSearchProvider(BaseSearchProvider):
+    """
+    Caching decorator around any search provider.
+    Results are keyed by provider, normalized query and provider parameters.
+    """
+
+    def __init__(self, provider: BaseSearchProvider, cache: Optional[SQLiteCache] = None):
+        self.provider = provider
+        self.cache = cache or get_sqlite_cache(
+            settings.SEARCH_CACHE_PATH, "search_results", settings.SEARCH_CACHE_MAX_ENTRIES
+        )
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def ttl_for(self, query: str) -> int:
+        if VOLATILE_QUERY_PATTERN.search(self.normalize_query(query)):
+            return settings.SEARCH_CACHE_TTL_SHORT
+        return settings.SEARCH_CACHE_TTL_LONG
+
+    def cache_key(self, query: str) -> str:
+        return make_cache_key(
+            self.provider.__class__.__name__, self.normalize_query(query), self.provider.cache_params()
+        )
+
+    def cache_params(self) -> Dict[str, Any]:
+        return self.provider.cache_params()
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        key = self.cache_key(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"DEBUG: Search cache hit for '{query}'")
+            return cached
+
+        try:
+            results = self.provider.search(query)
+        except CircuitOpenError as e:
+            return self._serve_stale(key, query, e)
+        # Providers return [] on errors, so empty results are not worth keeping
+        if self._cacheable(results):
+            self.cache.set(key, results, self.ttl_for(query))
+        return results
+
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        key = self.cache_key(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"DEBUG: Search cache hit for '{query}'")
+            return cached
+
+        try:
+            results = await self.provider.asearch(query)
+        except CircuitOpenError as e:
+            return self._serve_stale(key, query, e)
+        if self._cacheable(results):
+            self.cache.set(key, results, self.ttl_for(query))
+        return results
+
+    @staticmethod
+    def _cacheable(results: List[Dict[str, Any]]) -> bool:
+        # A hedge won by the secondary (e.g. snippets standing in for Exa deep research)
+        # must not be served later under the primary's key
+        return bool(results) and not getattr(results, "from_secondary", False)
+
+    def _serve_stale(self, key: str, query: str, error: CircuitOpenError) -> List[Dict[str, Any]]:
+        """The provider is failing fast; fall back to an expired cache entry if there is one."""
+        stale = self.cache.get(key, allow_stale=True) if settings.SEARCH_SERVE_STALE_ON_OPEN_CIRCUIT else None
+        if stale is None:
+            raise error
+        print(f"DEBUG: Provider circuit open, serving stale cached results for '{query}'")
+        return stale
+
+    def stats(self) -> Dict[str, int]:
+        return self.cache.stats()
@@ -0,0 +1,113 @@
+import hashlib
+import re
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import numpy as np
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "_ga", "_gl", "spm", "cmpid", "ocid", "amp", "outputtype"
+}
+HOST_PREFIXES = ("www.", "amp.", "m.")
+_TOKEN_RE = re.compile(r"\w+")
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different links to the same page compare equal.
+    Drops scheme differences, www/mobile/AMP hosts and paths, tracking parameters,
+    fragments, default ports and trailing slashes. Query parameters are sorted.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return url.lower()
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path)
+    path = re.sub(r"/amp/?$", "", path)
+    path = re.sub(r"\.amp(\.html?)?$", r"\1", path)
+    path = path.rstrip("/")
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def simhash(text: str, shingle_size: int = 3, min_tokens: int = 8) -> Optional[int]:
+    """
+    64-bit SimHash over word shingles. Returns None for texts too short to fingerprint.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < min_tokens:
+        return None
+    shingles = {" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    # One row of 64 bits per shingle; a fingerprint bit is set when most shingles set it
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    majority = (bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)).astype(np.uint8)
+    return int(np.packbits(majority, bitorder="little").view(np.uint64)[0])
+
+def hamming_distances(fingerprints: np.ndarray, fingerprint: int) -> np.ndarray:
+    """Hamming distance between one fingerprint and an array of fingerprints."""
+    xor = fingerprints ^ np.uint64(fingerprint)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+class ResultDeduplicator:
+    """
+    Incrementally filters search results that repeat an already seen page.
+    A result is a duplicate when its canonical URL was seen before, or when its
+    content is a near-duplicate (SimHash within max_distance bits) of kept content.
+    """
+
+    def __init__(self, max_distance: int = 6):
+        self.max_distance = max_distance
+        self.seen_urls = set()
+        self.seen_texts = set()
+        self.dropped = 0
+        self._fingerprints = np.empty(0, dtype=np.uint64)
+
+    def add(self, result: Dict[str, Any]) -> bool:
+        """Record the result and return True if it is new, False if it is a duplicate."""
+        url_key = canonicalize_url(result.get("url", ""))
+        if url_key and url_key in self.seen_urls:
+            self.dropped += 1
+            return False
+
+        text = result.get("content") or ""
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            text_key = " ".join(_TOKEN_RE.findall(text.lower()))
+            duplicate = bool(text_key) and text_key in self.seen_texts
+        else:
+            text_key = None
+            duplicate = bool(self._fingerprints.size) and bool(
+                (hamming_distances(self._fingerprints, fingerprint) <= self.max_distance).any()
+            )
+
+        if url_key:
+            self.seen_urls.add(url_key)
+        if duplicate:
+            self.dropped += 1
+            return False
+        if fingerprint is None:
+            if text_key:
+                self.seen_texts.add(text_key)
+        else:
+            self._fingerprints = np.append(self._fingerprints, np.uint64(fingerprint))
+        return True
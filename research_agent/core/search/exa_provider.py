@@ -1,5 +1,8 @@
+import httpx
 import requests
 from typing import List, Dict, Any
+from research_agent.core.resilience import get_guard
+from research_agent.core.http import get_session, get_async_client, request_timeout, async_timeout
 from research_agent.core.search.base import BaseSearchProvider
 from research_agent.config.settings import settings
 
@@ -7,47 +10,138 @@ class ExaSearchProvider(BaseSearchProvider):
     def __init__(self):
         self.api_key = settings.EXA_API_KEY
         self.base_url = "https://api.exa.ai/search"
-    
-    def search(self, query: str) -> List[Dict[str, Any]]:
-        """
-        Perform a search using Exa Deep Research API.
-        """
+        self.contents_url = "https://api.exa.ai/contents"
+        self.num_results = 15
+        # "bounded": highlights and summaries first, then full text for the top results only
+        self.content_mode = settings.EXA_CONTENT_MODE
+        self.max_chars_per_result = settings.EXA_MAX_CHARS_PER_RESULT
+        self.full_text_results = settings.EXA_FULL_TEXT_RESULTS
+        self.full_text_char_budget = settings.EXA_FULL_TEXT_CHAR_BUDGET
+        self.guard = get_guard("exa")
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {
+            "type": "deep",
+            "numResults": self.num_results,
+            "contentMode": self.content_mode,
+            "maxCharacters": self.max_chars_per_result,
+            "fullTextResults": self.full_text_results,
+            "fullTextBudget": self.full_text_char_budget
+        }
+
+    def _headers(self) -> Dict[str, str]:
         if not self.api_key:
             raise ValueError("EXA_API_KEY is not set. Please add it to your .env file.")
         
-        headers = {
+        return {
             'x-api-key': self.api_key,
             'Content-Type': 'application/json'
         }
-        
+
+    def _build_request(self, query: str) -> tuple:
+        if self.content_mode == "bounded":
+            contents = {
+                'highlights': {'numSentences': 3, 'highlightsPerUrl': 3},
+                'summary': True
+            }
+        else:
+            contents = {
+                'text': {'maxCharacters': self.max_chars_per_result},
+                'summary': True
+            }
+
         # Using Deep Research mode
         payload = {
             'query': query,
             'useAutoprompt': True,
             'type': 'deep',
-            'numResults': 15,
-            'contents': {
-                'text': True,
-                'summary': True
-            }
+            'numResults': self.num_results,
+            'contents': contents
         }
+        return self._headers(), payload
+
+    def _post(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = get_session().post(url, headers=headers, json=payload, timeout=request_timeout(settings.EXA_READ_TIMEOUT))
+        response.raise_for_status()
+        return response.json()
+
+    async def _apost(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await get_async_client().post(url, headers=headers, json=payload, timeout=async_timeout(settings.EXA_READ_TIMEOUT))
+        response.raise_for_status()
+        return response.json()
+
+    def _parse_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        results = []
+        for item in data.get('results', []):
+            content = item.get('text') or "\n".join(filter(None, [item.get('summary')] + (item.get('highlights') or [])))
+            results.append({
+                'id': item.get('id') or item.get('url', ''),
+                'title': item.get('title', 'No Title'),
+                'url': item.get('url', ''),
+                'content': content[:self.max_chars_per_result]
+            })
         
+        return results
+
+    def _full_text_batches(self, results: List[Dict[str, Any]], batch_size: int = 2):
+        """
+        Plan incremental /contents requests for the top-ranked results.
+        Yields (batch, payload) pairs until the result count or character budget is used up.
+        """
+        remaining = self.full_text_char_budget
+        top = results[:self.full_text_results]
+        for start in range(0, len(top), batch_size):
+            if remaining <= 0:
+                return
+            batch = top[start:start + batch_size]
+            max_chars = min(self.max_chars_per_result, remaining // len(batch))
+            remaining -= max_chars * len(batch)
+            yield batch, {'ids': [r['id'] for r in batch], 'text': {'maxCharacters': max_chars}}
+
+    @staticmethod
+    def _merge_full_text(batch: List[Dict[str, Any]], data: Dict[str, Any]):
+        texts = {item.get('id') or item.get('url'): item.get('text') for item in data.get('results', [])}
+        for result in batch:
+            if texts.get(result['id']):
+                result['content'] = texts[result['id']]
+    
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Perform a search using Exa Deep Research API.
+        In bounded mode, full page text is then fetched only for the top-ranked results.
+        """
+        headers, payload = self._build_request(query)
         try:
             print(f"Exa Provider: Performing Deep Research for '{query}'...")
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            for item in data.get('results', []):
-                results.append({
-                    'title': item.get('title', 'No Title'),
-                    'url': item.get('url', ''),
-                    'content': item.get('text', item.get('summary', ''))
-                })
-            
-            return results
-            
+            results = self._parse_results(self.guard.call(self._post, self.base_url, headers, payload))
         except requests.exceptions.RequestException as e:
             print(f"Exa API Error: {e}")
             return []
+
+        if self.content_mode == "bounded":
+            for batch, contents_payload in self._full_text_batches(results):
+                try:
+                    self._merge_full_text(batch, self.guard.call(self._post, self.contents_url, headers, contents_payload))
+                except requests.exceptions.RequestException as e:
+                    # Keep the highlights we already have
+                    print(f"Exa Contents Error: {e}")
+                    break
+        return results
+
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        headers, payload = self._build_request(query)
+        try:
+            print(f"Exa Provider: Performing Deep Research for '{query}'...")
+            results = self._parse_results(await self.guard.acall(self._apost, self.base_url, headers, payload))
+        except httpx.HTTPError as e:
+            print(f"Exa API Error: {e}")
+            return []
+
+        if self.content_mode == "bounded":
+            for batch, contents_payload in self._full_text_batches(results):
+                try:
+                    self._merge_full_text(batch, await self.guard.acall(self._apost, self.contents_url, headers, contents_payload))
+                except httpx.HTTPError as e:
+                    print(f"Exa Contents Error: {e}")
+                    break
+        return results
@@ -0,0 +1,47 @@
+from research_agent.core.search.base import BaseSearchProvider
+from research_agent.config.settings import settings
+
+def _build_provider(provider_name: str) -> BaseSearchProvider:
+    provider_name = provider_name.lower()
+
+    if provider_name == "exa":
+        from research_agent.core.search.exa_provider import ExaSearchProvider
+        return ExaSearchProvider()
+    elif provider_name == "mock":
+        from research_agent.core.search.mock_provider import MockSearchProvider
+        return MockSearchProvider()
+    elif provider_name == "tavily":
+        from research_agent.core.search.tavily_provider import TavilySearchProvider
+        return TavilySearchProvider()
+    else:
+        from research_agent.core.search.serper_provider import SerperProvider
+        return SerperProvider()
+
+def get_search_provider(use_deep_research: bool = False) -> BaseSearchProvider:
+    if use_deep_research:
+        primary_name = "exa"
+        provider = _build_provider(primary_name)
+        # Deep research hedges to the standard provider when Exa is unusually slow
+        secondary_name = settings.DEFAULT_SEARCH_PROVIDER
+        initial_delay = settings.EXA_HEDGE_INITIAL_DELAY
+    else:
+        primary_name = settings.DEFAULT_SEARCH_PROVIDER
+        provider = _build_provider(primary_name)
+        secondary_name = settings.SEARCH_HEDGE_PROVIDER
+        initial_delay = settings.SEARCH_HEDGE_INITIAL_DELAY
+
+    if settings.SEARCH_HEDGE_MODE != "off" and secondary_name:
+        from research_agent.core.search.hedged_provider import HedgedSearchProvider
+        provider = HedgedSearchProvider(
+            provider,
+            _build_provider(secondary_name),
+            mode=settings.SEARCH_HEDGE_MODE,
+            initial_delay=initial_delay,
+            min_delay=settings.SEARCH_HEDGE_MIN_DELAY,
+            latency_key=f"{primary_name.lower()}->{secondary_name.lower()}"
+        )
+
+    if settings.SEARCH_CACHE_ENABLED:
+        from research_agent.core.search.cached_provider import CachedSearchProvider
+        provider = CachedSearchProvider(provider)
+    return provider
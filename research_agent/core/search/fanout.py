@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+class SearchFanOut:
+    """
+    Run search queries concurrently with a bounded number of requests in flight.
+    Use it as a context manager so its threads are stopped however the caller exits.
+
+    Queries can be submitted while results are being consumed. Each query gets its own
+    deadline, measured from the moment a worker starts it, so queries waiting for a free
+    slot are not penalised. A query that misses its deadline is reported as failed and
+    its late result is discarded.
+    """
+
+    def __init__(self, search_fn: Callable[[str], List[Dict[str, Any]]], max_in_flight: int = 4, timeout: Optional[float] = None):
+        self.search_fn = search_fn
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="search")
+        self._done: Queue = Queue()
+        self._lock = threading.Lock()
+        self._queries: List[str] = []
+        self._started: Dict[int, float] = {}
+        self._closed = False
+        self._stopped = False
+
+    def submit(self, query: str) -> int:
+        """Schedule a query and return its submission index."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit queries to a closed fan-out.")
+            index = len(self._queries)
+            self._queries.append(query)
+        self._executor.submit(self._run, index, query)
+        return index
+
+    def close(self):
+        """Signal that no more queries will be submitted."""
+        with self._lock:
+            self._closed = True
+        self._done.put(None)  # Wake up a consumer blocked in results()
+
+    def shutdown(self):
+        """Close the fan-out and stop its threads; queries not yet started are cancelled."""
+        with self._lock:
+            self._closed = True
+            self._stopped = True
+        self._done.put(None)  # Wake up a consumer blocked in results()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "SearchFanOut":
+        return self
+
+    def __exit__(self, *exc_info):
+        # Also runs when the caller fails or stops before (or while) iterating results()
+        self.shutdown()
+
+    def _run(self, index: int, query: str):
+        with self._lock:
+            self._started[index] = time.monotonic()
+        try:
+            self._done.put((index, self.search_fn(query), None))
+        except Exception as e:
+            self._done.put((index, None, e))
+
+    def _expired(self, finished: Dict[int, Dict]) -> List[Dict]:
+        if self.timeout is None:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            started = list(self._started.items())
+        return [
+            self._outcome(index, None, TimeoutError(f"Search timed out after {self.timeout:.0f}s"))
+            for index, start in started
+            if index not in finished and now - start > self.timeout
+        ]
+
+    def _outcome(self, index: int, results: Optional[List[Dict[str, Any]]], error: Optional[Exception]) -> Dict:
+        return {"index": index, "query": self._queries[index], "results": results or [], "error": error}
+
+    def results(self, ordered: bool = False) -> Iterator[Dict]:
+        """
+        Yield one outcome dict per query: 'index', 'query', 'results' and 'error'.
+        With ordered=True outcomes are yielded in submission order, otherwise as they finish.
+        Iteration ends once the fan-out is closed and every submitted query has finished,
+        or as soon as it is shut down.
+        """
+        finished: Dict[int, Dict] = {}
+        buffered: Dict[int, Dict] = {}
+        next_index = 0
+        try:
+            while True:
+                with self._lock:
+                    if self._stopped or (self._closed and len(finished) == len(self._queries)):
+                        break
+                try:
+                    item = self._done.get(timeout=0.1 if self.timeout else None)
+                except Empty:
+                    item = None
+
+                outcomes = []
+                if item is not None and item[0] not in finished:
+                    outcomes.append(self._outcome(*item))
+                outcomes.extend(self._expired(finished))
+
+                for outcome in outcomes:
+                    if outcome["index"] in finished:
+                        continue
+                    finished[outcome["index"]] = outcome
+                    if not ordered:
+                        yield outcome
+                        continue
+                    buffered[outcome["index"]] = outcome
+                    while next_index in buffered:
+                        yield buffered.pop(next_index)
+                        next_index += 1
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from research_agent.core.search.base import BaseSearchProvider
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedged-search")
+# A running loser cannot be cancelled, so it keeps its _executor thread until it returns (up to a
+# minute for a deep research call). Hedging pauses while this many are still running, so abandoned
+# calls can never take over the pool that new primaries and hedges need.
+MAX_ABANDONED = 8
+_abandoned = 0
+_abandoned_lock = threading.Lock()
+# Primary latency windows shared by every provider built for the same latency_key, so the
+# observed p95 survives the agent rebuilding its search provider
+_latency_windows: Dict[str, Tuple[deque, threading.Lock]] = {}
+_latency_windows_lock = threading.Lock()
+
+def _latency_window(key: Optional[str], window: int) -> Tuple[deque, threading.Lock]:
+    if key is None:
+        return deque(maxlen=window), threading.Lock()
+    with _latency_windows_lock:
+        if key not in _latency_windows:
+            _latency_windows[key] = (deque(maxlen=window), threading.Lock())
+        return _latency_windows[key]
+
+def _abandon(future):
+    global _abandoned
+    if future.cancel():
+        return
+    with _abandoned_lock:
+        _abandoned += 1
+    future.add_done_callback(_release_abandoned)
+
+def _release_abandoned(_future):
+    global _abandoned
+    with _abandoned_lock:
+        _abandoned -= 1
+
+def abandoned_calls() -> int:
+    """Hedged calls that lost but are still running in the shared pool."""
+    with _abandoned_lock:
+        return _abandoned
+
+class SecondaryResults(list):
+    """Results that came from the secondary provider; caches keyed on the primary must not store them."""
+    from_secondary = True
+
+class HedgedSearchProvider(BaseSearchProvider):
+    """
+    Sends a query to a primary provider and, if it is slow or fails, to a secondary one.
+
+    mode="hedge": the secondary is only started once the primary has taken longer than its
+    observed p95 latency (never less than min_delay; initial_delay until enough samples exist),
+    or has failed.
+    mode="race": both start at once.
+    The first non-empty result wins and the other request is cancelled (async) or abandoned (sync).
+    Sync calls only hedge while fewer than MAX_ABANDONED abandoned losers are still running.
+    Providers built with the same latency_key share their latency window; without one each
+    instance starts from initial_delay.
+    """
+
+    def __init__(self, primary: BaseSearchProvider, secondary: BaseSearchProvider, mode: str = "hedge",
+                 initial_delay: float = 3.0, min_delay: float = 0.5, min_samples: int = 20, window: int = 200,
+                 latency_key: Optional[str] = None):
+        self.primary = primary
+        self.secondary = secondary
+        self.mode = mode
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.hedges = 0
+        self._latencies, self._lock = _latency_window(latency_key, window)
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {
+            "primary": [self.primary.__class__.__name__, self.primary.cache_params()],
+            "secondary": [self.secondary.__class__.__name__, self.secondary.cache_params()]
+        }
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the primary before starting the secondary."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            p95 = float(np.percentile(np.fromiter(self._latencies, dtype=np.float64), 95))
+        # A near-zero p95 would otherwise hedge nearly every call
+        return max(p95, self.min_delay)
+
+    def _record(self, provider: BaseSearchProvider, started: float):
+        if provider is self.primary:
+            with self._lock:
+                self._latencies.append(time.monotonic() - started)
+
+    def _timed_search(self, provider: BaseSearchProvider, query: str) -> List[Dict[str, Any]]:
+        started = time.monotonic()
+        results = provider.search(query)
+        self._record(provider, started)
+        return results
+
+    async def _timed_asearch(self, provider: BaseSearchProvider, query: str) -> List[Dict[str, Any]]:
+        started = time.monotonic()
+        results = await provider.asearch(query)
+        self._record(provider, started)
+        return results
+
+    def _count_hedge(self, query: str):
+        with self._lock:
+            self.hedges += 1
+        print(f"DEBUG: Hedging search '{query}' to {self.secondary.__class__.__name__}")
+
+    def _won(self, provider: BaseSearchProvider, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return SecondaryResults(results) if provider is self.secondary else results
+
+    @staticmethod
+    def _acceptable(task) -> bool:
+        return not task.cancelled() and task.exception() is None and bool(task.result())
+
+    @staticmethod
+    def _fallback(primary_task, tasks) -> List[Dict[str, Any]]:
+        """No acceptable result: return any empty result, else re-raise the primary's error."""
+        for task in tasks:
+            if not task.cancelled() and task.exception() is None:
+                return task.result()
+        raise primary_task.exception()
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        primary = _executor.submit(self._timed_search, self.primary, query)
+        futures = [primary]
+        if self.mode != "race":
+            done, _ = wait(futures, timeout=self.hedge_delay())
+            if done and self._acceptable(primary):
+                return primary.result()
+        if not primary.done() and abandoned_calls() >= MAX_ABANDONED:
+            # Hedging now could strand another thread; wait for the primary instead
+            return primary.result()
+        self._count_hedge(query)
+        futures.append(_executor.submit(self._timed_search, self.secondary, query))
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if self._acceptable(future):
+                    for loser in pending:
+                        _abandon(loser)
+                    return self._won(self.primary if future is primary else self.secondary, future.result())
+        return self._fallback(primary, futures)
+
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        primary = asyncio.ensure_future(self._timed_asearch(self.primary, query))
+        tasks = [primary]
+        if self.mode != "race":
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if done and self._acceptable(primary):
+                return primary.result()
+        self._count_hedge(query)
+        tasks.append(asyncio.ensure_future(self._timed_asearch(self.secondary, query)))
+
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if self._acceptable(task):
+                        return self._won(self.primary if task is primary else self.secondary, task.result())
+        finally:
+            for task in pending:
+                task.cancel()
+        return self._fallback(primary, tasks)
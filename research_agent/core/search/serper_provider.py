@@ -1,5 +1,8 @@
+import httpx
 import requests
 from typing import List, Dict, Any
+from research_agent.core.resilience import get_guard
+from research_agent.core.http import get_session, get_async_client, request_timeout, async_timeout
 from research_agent.core.search.base import BaseSearchProvider
 from research_agent.config.settings import settings
 
@@ -7,19 +10,16 @@ class SerperProvider(BaseSearchProvider):
     def __init__(self):
         self.api_key = settings.SERPER_API_KEY
         self.base_url = "https://google.serper.dev/search"
-    
-    def search(self, query: str) -> List[Dict[str, Any]]:
-        """
-        Perform a search using Serper.dev API.
-        Returns a list of results with 'title', 'url', and 'content'.
-        """
+        self.num_results = 10
+        self.guard = get_guard("serper")
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {"num": self.num_results}
+
+    def _build_request(self, query: str) -> tuple:
         if not self.api_key:
             raise ValueError("SERPER_API_KEY is not set. Please add it to your .env file or Streamlit Secrets.")
         
-        # Debug: Check if API key is loaded (without exposing the full key)
-        if self.api_key:
-            print(f"Serper API Key loaded: {self.api_key[:10]}...{self.api_key[-4:]}")
-        
         headers = {
             'X-API-KEY': self.api_key,
             'Content-Type': 'application/json'
@@ -27,27 +27,52 @@ class SerperProvider(BaseSearchProvider):
         
         payload = {
             'q': query,
-            'num': 10  # Number of results
+            'num': self.num_results  # Number of results
         }
+        return headers, payload
+
+    def _post(self, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = get_session().post(self.base_url, headers=headers, json=payload, timeout=request_timeout())
+        response.raise_for_status()
+        return response.json()
+
+    async def _apost(self, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await get_async_client().post(self.base_url, headers=headers, json=payload, timeout=async_timeout())
+        response.raise_for_status()
+        return response.json()
+
+    def _parse_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        results = []
+        
+        # Process organic results
+        if 'organic' in data:
+            for item in data['organic']:
+                results.append({
+                    'title': item.get('title', ''),
+                    'url': item.get('link', ''),
+                    'content': item.get('snippet', '')
+                })
         
+        return results
+    
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Perform a search using Serper.dev API.
+        Returns a list of results with 'title', 'url', and 'content'.
+        """
+        headers, payload = self._build_request(query)
         try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            
-            # Process organic results
-            if 'organic' in data:
-                for item in data['organic']:
-                    results.append({
-                        'title': item.get('title', ''),
-                        'url': item.get('link', ''),
-                        'content': item.get('snippet', '')
-                    })
-            
-            return results
+            return self._parse_results(self.guard.call(self._post, headers, payload))
             
         except requests.exceptions.RequestException as e:
             print(f"Serper API Error: {e}")
             return []
+
+    async def asearch(self, query: str) -> List[Dict[str, Any]]:
+        headers, payload = self._build_request(query)
+        try:
+            return self._parse_results(await self.guard.acall(self._apost, headers, payload))
+
+        except httpx.HTTPError as e:
+            print(f"Serper API Error: {e}")
+            return []
@@ -1,14 +1,19 @@
 from typing import List, Dict, Any
 from tavily import TavilyClient
 from research_agent.core.search.base import BaseSearchProvider
+from research_agent.core.resilience import get_guard
 from research_agent.config.settings import settings
 
 class TavilySearchProvider(BaseSearchProvider):
     def __init__(self):
         self.client = TavilyClient(api_key=settings.TAVILY_API_KEY)
+        self.guard = get_guard("tavily")
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {"search_depth": "advanced"}
 
     def search(self, query: str) -> List[Dict[str, Any]]:
-        response = self.client.search(query, search_depth="advanced")
+        response = self.guard.call(self.client.search, query, search_depth="advanced")
         results = []
         for result in response.get("results", []):
             results.append({
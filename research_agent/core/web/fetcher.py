@@ -0,0 +1,198 @@
+import codecs
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+import requests
+from requests.compat import chardet
+from research_agent.core.cache.store import SQLiteCache, get_sqlite_cache
+from research_agent.core.http import ensure_public_url, get_session, request_timeout
+from research_agent.config.settings import settings
+
+SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe", "template", "button"}
+BLOCK_TAGS = {"p", "div", "li", "br", "tr", "section", "article", "main", "blockquote", "pre", "h1", "h2", "h3", "h4", "h5", "h6"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+CHARSET_RE = re.compile(rb"""charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+
+class ReadableTextExtractor(HTMLParser):
+    """
+    Extracts readable text from HTML.
+    Drops scripts, navigation, headers/footers and forms, prefers <main>/<article>
+    content when the page has it, and skips short link-bar style lines.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._heading = False
+        self._lines: List[tuple] = []  # (text, in_main, is_heading)
+        self._current: List[str] = []
+
+    def _flush(self):
+        text = " ".join("".join(self._current).split())
+        if text:
+            self._lines.append((text, self._main_depth > 0, self._heading))
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if tag in ("main", "article"):
+            self._main_depth += 1
+        self._heading = tag in HEADING_TAGS or self._heading
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if tag in ("main", "article"):
+            self._main_depth = max(0, self._main_depth - 1)
+        if tag in HEADING_TAGS:
+            self._heading = False
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def text(self) -> str:
+        self._flush()
+        lines = self._lines
+        if any(in_main for _, in_main, _ in lines):
+            lines = [line for line in lines if line[1]]
+        return "\n".join(text for text, _, is_heading in lines if is_heading or len(text.split()) >= 5)
+
+def _known_codec(name: Optional[str]) -> Optional[str]:
+    try:
+        return codecs.lookup(name).name if name else None
+    except LookupError:
+        return None
+
+def decode_body(body: bytes, content_type: str) -> str:
+    """
+    Decode a page body. The Content-Type charset wins when the header has one; otherwise the
+    <meta charset> near the top of the page, then UTF-8 if the bytes are valid UTF-8, then detection.
+    (requests falls back to ISO-8859-1 for text/* without a charset, which garbles UTF-8 pages.)
+    """
+    header = CHARSET_RE.search(content_type.encode("latin-1", errors="replace"))
+    meta = CHARSET_RE.search(body[:4096]) if not content_type.startswith("text/plain") else None
+    for match in (header, meta):
+        encoding = _known_codec(match and match.group(1).decode("ascii"))
+        if encoding:
+            return body.decode(encoding, errors="replace")
+    try:
+        # Not final: the byte cap may have cut the last character in half
+        return codecs.getincrementaldecoder("utf-8")().decode(body, final=False)
+    except UnicodeDecodeError:
+        detected = chardet.detect(body).get("encoding") if chardet else None
+        return body.decode(_known_codec(detected) or "utf-8", errors="replace")
+
+def extract_text(html: str) -> str:
+    parser = ReadableTextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+class PageFetcher:
+    """
+    Downloads pages with bounded concurrency and a per-host limit, caps the bytes read per
+    page, and extracts readable text. URLs come from search results, so hosts (and every
+    redirect hop) resolving to loopback, private or link-local addresses are refused. Extracted text is cached on disk by URL together with
+    the page's ETag/Last-Modified, so stale entries are revalidated with a conditional request.
+    """
+
+    def __init__(self, cache: Optional[SQLiteCache] = None):
+        self.max_workers = settings.PAGE_FETCH_MAX_WORKERS
+        self.per_host = settings.PAGE_FETCH_PER_HOST
+        self.max_bytes = settings.PAGE_FETCH_MAX_BYTES
+        self.max_chars = settings.PAGE_FETCH_MAX_CHARS
+        self.timeout = settings.PAGE_FETCH_TIMEOUT
+        self.max_redirects = settings.PAGE_FETCH_MAX_REDIRECTS
+        self.allow_private = settings.PAGE_FETCH_ALLOW_PRIVATE
+        self.fresh_seconds = settings.PAGE_CACHE_FRESH_SECONDS
+        self.cache = cache or get_sqlite_cache(settings.PAGE_CACHE_PATH, "pages", settings.PAGE_CACHE_MAX_ENTRIES)
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _read_capped(self, response: requests.Response, content_type: str) -> str:
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=65536):
+            body.extend(chunk)
+            if len(body) >= self.max_bytes:
+                del body[self.max_bytes:]
+                break
+        return decode_body(bytes(body), content_type)
+
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """GET with redirects followed by hand, so every hop passes the address check."""
+        for _ in range(self.max_redirects + 1):
+            if not self.allow_private:
+                ensure_public_url(url)
+            response = get_session().get(url, headers=headers, stream=True, allow_redirects=False,
+                                         timeout=request_timeout(self.timeout))
+            if not response.is_redirect:
+                return response
+            response.close()
+            url = urljoin(url, response.headers["Location"])
+        raise requests.exceptions.TooManyRedirects(f"more than {self.max_redirects} redirects")
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Return the readable text of a page, or None if it is not an HTML/text page or fails."""
+        cached = self.cache.get(url, allow_stale=True)
+        if cached and time.time() - cached["fetched_at"] < self.fresh_seconds:
+            return cached["text"]
+
+        headers = {"User-Agent": "Mozilla/5.0 (compatible; ResearchAgent/1.0)"}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            with self._host_limit(url):
+                with self._get(url, headers) as response:
+                    if response.status_code == 304 and cached:
+                        cached["fetched_at"] = time.time()
+                        self.cache.set(url, cached, settings.PAGE_CACHE_TTL)
+                        return cached["text"]
+                    response.raise_for_status()
+                    content_type = response.headers.get("Content-Type", "")
+                    if content_type and not re.match(r"text/(html|plain)|application/xhtml", content_type):
+                        return None
+                    body = self._read_capped(response, content_type)
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"DEBUG: Page fetch failed for {url}: {e}")
+            return cached["text"] if cached else None
+
+        text = (body if content_type.startswith("text/plain") else extract_text(body))[:self.max_chars]
+        self.cache.set(url, {"text": text, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}, settings.PAGE_CACHE_TTL)
+        return text
+
+    def _fetch_or_none(self, url: str) -> Optional[str]:
+        # One bad search result must not abort the whole batch (and the turn) from executor.map
+        try:
+            return self.fetch(url)
+        except Exception as e:
+            print(f"DEBUG: Page fetch failed for {url}: {e}")
+            return None
+
+    def fetch_many(self, urls: List[str]) -> Dict[str, str]:
+        """Fetch pages concurrently; returns url -> text for the pages that yielded text."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="page-fetch") as executor:
+            texts = executor.map(self._fetch_or_none, urls)
+            return {url: text for url, text in zip(urls, texts) if text}
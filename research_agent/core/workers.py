@@ -0,0 +1,13 @@
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+def worker_context() -> BaseContext:
+    """
+    Start method for the process pools (document extraction, report rendering).
+    The pools are created inside a multi-threaded process (Streamlit plus the search, hedge and
+    planner threads), and a fork there copies any lock another thread holds at that moment,
+    which can deadlock the worker. forkserver starts workers from a clean single-threaded
+    server; spawn is the fallback where it is unavailable (Windows).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from research_agent.core.intent.classifier import IntentClassifier, load_examples
+
+EVAL_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "core", "intent", "intent_eval.jsonl")
+
+def evaluate(classifier: IntentClassifier, examples):
+    decided, correct, latencies, mistakes = 0, 0, [], []
+    by_source = {}
+    for example in examples:
+        started = time.perf_counter()
+        result = classifier.classify(example["text"])
+        latencies.append(time.perf_counter() - started)
+        if result is None:
+            continue
+        decided += 1
+        stats = by_source.setdefault(result["source"], [0, 0])
+        stats[0] += 1
+        if result["type"] == example["label"]:
+            correct += 1
+            stats[1] += 1
+        else:
+            mistakes.append((example["text"], example["label"], result["type"], result["source"]))
+    return decided, correct, np.array(latencies) * 1e6, by_source, mistakes
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local CHAT/RESEARCH intent classifier.")
+    parser.add_argument("--data", default=EVAL_DATA_PATH, help="labelled JSONL file with text/label")
+    parser.add_argument("--threshold", type=float, default=None, help="model confidence threshold")
+    args = parser.parse_args()
+
+    examples = load_examples(args.data)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Train a fresh model so the evaluation reflects the current training data
+        classifier = IntentClassifier(model_path=os.path.join(tmp, "intent_model.pkl"), threshold=args.threshold)
+        started = time.perf_counter()
+        classifier.classify("warm up")
+        print(f"Training: {(time.perf_counter() - started) * 1000:.1f} ms")
+        decided, correct, latencies, by_source, mistakes = evaluate(classifier, examples)
+
+    print(f"Examples: {len(examples)}")
+    print(f"Handled locally: {decided}/{len(examples)} ({decided / len(examples):.0%}), rest escalated to the LLM")
+    print(f"Accuracy on handled: {correct}/{decided} ({correct / max(decided, 1):.1%})")
+    for source, (count, right) in sorted(by_source.items()):
+        print(f"  {source}: {right}/{count} correct")
+    print(f"Latency: p50 {np.percentile(latencies, 50):.0f} us, p99 {np.percentile(latencies, 99):.0f} us")
+    for text, label, predicted, source in mistakes:
+        print(f"  MISTAKE [{source}] '{text}': expected {label}, got {predicted}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import streamlit as st
 import sys
 import os
+import time
 
 # Add project root to path so we can import modules
 # We need to go up two levels: ui -> research_agent -> root
@@ -8,6 +9,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')
 
 from research_agent.agent.research_agent import ResearchAgent
 
+STREAM_REDRAW_SECONDS = 0.1
+
 st.set_page_config(page_title="Research AI Agent", page_icon="🤖")
 
 st.title("🤖 Research AI Agent")
@@ -94,12 +97,25 @@ if prompt := st.chat_input("What would you like to know?"):
             # Strategy: Pass a callback that initializes st.status ONLY if it receives a "Research" related message.
             # But simpler: Just use st.status for everything, and if it returns fast (Chat), it will just close.
             
+            # The report is streamed into the placeholder as it is written; files, audio and
+            # sources are shown once the whole pipeline has finished. Re-rendering the growing
+            # Markdown on every chunk is quadratic, so redraw at most every STREAM_REDRAW_SECONDS;
+            # the final answer is rendered in full below.
+            streamed = []
+            last_redraw = [0.0]
+            def token_update(text):
+                streamed.append(text)
+                now = time.monotonic()
+                if now - last_redraw[0] >= STREAM_REDRAW_SECONDS:
+                    last_redraw[0] = now
+                    response_placeholder.markdown("".join(streamed) + "▌")
+
             with st.status("Thinking...", expanded=True) as status:
                 def status_update(message):
                     status.update(label=message, state="running")
                     status.write(message)
                 
-                response = st.session_state.agent.process_query(prompt, history=history, status_callback=status_update, use_deep_research=use_deep_research)
+                response = st.session_state.agent.process_query(prompt, history=history, status_callback=status_update, use_deep_research=use_deep_research, token_callback=token_update)
                 
                 status.update(label="Complete!", state="complete", expanded=False)
 
@@ -111,7 +127,7 @@ if prompt := st.chat_input("What would you like to know?"):
             docx_path = response.get("docx_path")
             excel_path = response.get("excel_path")
 
-            st.markdown(answer)
+            response_placeholder.markdown(answer)
             if audio:
                 st.audio(audio, format="audio/mp3")
             
@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.agent.analyzer import AnalyzerAgent
+from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.reports.renderers import get_render_pool
+from research_agent.config.settings import settings
+
+class StreamingLLM(BaseLLMProvider):
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+
+    def generate(self, prompt, history=[], system_prompt=None):
+        raise AssertionError("generate() should not be used when streaming")
+
+    def stream(self, prompt, history=[], system_prompt=None):
+        for i, chunk in enumerate(["# Report\n\n", "Fusion ", "is ", "promising."]):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield chunk
+
+COLLECTED = {
+    "context": "Fusion energy text.",
+    "sources": [{"title": "Fusion", "url": "http://example.com/fusion"}],
+    "documents": []
+}
+
+def make_analyzer(tmp_path, llm):
+    analyzer = AnalyzerAgent()
+    analyzer.llm = llm
+    analyzer.output_dir = str(tmp_path)
+    return analyzer
+
+def test_report_tokens_are_streamed_before_files_are_rendered(tmp_path):
+    """Test that report chunks reach the token callback and the files use the full text."""
+    tokens = []
+    result = make_analyzer(tmp_path, StreamingLLM()).analyze("fusion", COLLECTED, token_callback=tokens.append)
+
+    assert tokens[:4] == ["# Report\n\n", "Fusion ", "is ", "promising."]
+    assert "## References" in tokens[-1]
+    assert result["report_content"] == "".join(tokens)
+    assert os.path.exists(result["pdf_path"])
+
+def test_interrupted_stream_keeps_partial_report(tmp_path):
+    """Test that a stream failing midway keeps the text produced so far."""
+    tokens = []
+    result = make_analyzer(tmp_path, StreamingLLM(fail_after=2)).analyze("fusion", COLLECTED, token_callback=tokens.append)
+    assert result["report_content"].startswith("# Report\n\nFusion \n\n*The report was cut short")
+
+    failed = make_analyzer(tmp_path, StreamingLLM(fail_after=0)).analyze("fusion", COLLECTED, token_callback=[].append)
+    assert failed["report_content"].startswith("Error generating report: connection reset")
+
+class MapReduceLLM(BaseLLMProvider):
+    def __init__(self):
+        self.prompts = []
+        self.system_prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, history=[], system_prompt=None):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.system_prompts.append(system_prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if "Sources (part" in prompt:
+            part = prompt.split("Sources (part ")[1].split(" ")[0]
+            return "No relevant findings." if part == "2" else f"- Finding from batch {part} (http://example.com/{part})"
+        return "# Report\n\nReduced."
+
+    def stream(self, prompt, history=[], system_prompt=None):
+        yield self.generate(prompt, history, system_prompt)
+
+def test_map_reduce_condenses_batches_in_parallel(tmp_path, monkeypatch):
+    """Test that large corpora are mapped to findings concurrently and reduced into one report."""
+    monkeypatch.setattr(settings, "REPORT_SYNTHESIS_MODE", "auto")
+    monkeypatch.setattr(settings, "REPORT_MAP_BATCH_TOKENS", 500)
+    monkeypatch.setattr(settings, "REPORT_MAP_MAX_WORKERS", 6)
+    llm = MapReduceLLM()
+    analyzer = make_analyzer(tmp_path, llm)
+    analyzer.map_llm = llm
+    analyzer.budgeter.token_budget = 1000
+    passages = [f"Source: Page {i} (http://example.com/{i})\nContent: " + "Fusion plasma record. " * 80 for i in range(6)]
+
+    result = analyzer.analyze("fusion", dict(COLLECTED, passages=passages))
+    map_prompts = [p for p in llm.prompts if "Sources (part" in p]
+    reduce_context = llm.system_prompts[-1]
+
+    assert result["synthesis_mode"] == "map_reduce"
+    assert len(map_prompts) == 6
+    assert llm.max_active > 1
+    assert "Finding from batch 1" in reduce_context and "Finding from batch 6" in reduce_context
+    assert "No relevant findings" not in reduce_context
+    assert result["report_content"].startswith("# Report")
+
+    # Needing more than one wave of map calls, auto keeps the single prompt
+    monkeypatch.setattr(settings, "REPORT_MAP_MAX_WORKERS", 3)
+    assert analyzer._synthesis_mode(passages) == "single"
+
+def test_files_render_in_worker_processes_while_caller_continues(tmp_path, monkeypatch):
+    """Test that files render in the process pool after analyze() returns and finish_files() collects them."""
+    monkeypatch.setattr(settings, "REPORT_RENDER_PROCESSES", 2)
+    analyzer = make_analyzer(tmp_path, StreamingLLM())
+    result = analyzer.analyze("fusion", COLLECTED, requested_formats=["pdf", "docx", "excel"], token_callback=[].append, wait_for_files=False)
+
+    assert result["pdf_path"] is None and set(result["file_jobs"]) == {"pdf", "docx", "excel"}
+    result = analyzer.finish_files(result)
+    assert "file_jobs" not in result
+    for key, ext in [("pdf_path", ".pdf"), ("docx_path", ".docx"), ("excel_path", ".xlsx")]:
+        assert result[key].endswith(ext) and os.path.exists(result[key])
+    # Workers must not be forked from this multi-threaded process
+    assert get_render_pool(2)._mp_context.get_start_method() != "fork"
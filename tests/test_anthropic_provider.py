@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.llm.anthropic_provider import AnthropicProvider
+from research_agent.config.settings import settings
+
+class MessagesAPIStandIn(BaseHTTPRequestHandler):
+    """Minimal local Messages API: records requests and reports cached prefixes like the real API."""
+    requests = []
+    cached_prefixes = set()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+
+        # Everything up to the last cache_control breakpoint counts as the cacheable prefix
+        blocks = list(body.get("system", [])) + [block for msg in body["messages"] for block in msg["content"]]
+        breakpoints = [i for i, block in enumerate(blocks) if "cache_control" in block]
+        prefix = json.dumps(blocks[:breakpoints[-1] + 1]) if breakpoints else ""
+        prefix_tokens = len(prefix) // 4
+        usage = {"input_tokens": 5, "output_tokens": 3, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if prefix in self.cached_prefixes:
+            usage["cache_read_input_tokens"] = prefix_tokens
+        elif prefix:
+            usage["cache_creation_input_tokens"] = prefix_tokens
+            self.cached_prefixes.add(prefix)
+
+        message = {"id": "msg_1", "type": "message", "role": "assistant", "model": body["model"],
+                   "stop_reason": "end_turn", "stop_sequence": None, "usage": usage}
+        if not body.get("stream"):
+            self._send("application/json", json.dumps(dict(message, content=[{"type": "text", "text": "Hello there."}])))
+            return
+        events = [
+            ("message_start", {"type": "message_start", "message": dict(message, content=[], stop_reason=None)}),
+            ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+            ("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hello "}}),
+            ("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "there."}}),
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": 7}}),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        self._send("text/event-stream", "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events))
+
+    def _send(self, content_type, text):
+        payload = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+@pytest.fixture
+def provider(monkeypatch):
+    MessagesAPIStandIn.requests = []
+    MessagesAPIStandIn.cached_prefixes = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MessagesAPIStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "ANTHROPIC_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    yield AnthropicProvider(model="claude-test")
+    server.shutdown()
+    server.server_close()
+
+CONTEXT = "Collected Information:\n" + "Fusion plasma record. " * 200
+HISTORY = [{"role": "user", "content": "What is new in fusion?"}, {"role": "assistant", "content": "# Fusion report"}]
+
+def test_stable_prefix_is_marked_for_caching(provider):
+    """Test that the system prompt and the end of the history carry cache breakpoints, the prompt does not."""
+    assert provider.generate("Make it a Word document.", history=HISTORY, system_prompt=CONTEXT) == "Hello there."
+
+    request = MessagesAPIStandIn.requests[-1]
+    assert request["system"] == [{"type": "text", "text": CONTEXT, "cache_control": {"type": "ephemeral"}}]
+    assert [m["role"] for m in request["messages"]] == ["user", "assistant", "user"]
+    assert request["messages"][1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert request["messages"][2]["content"] == [{"type": "text", "text": "Make it a Word document."}]
+
+def test_repeated_context_is_read_from_cache(provider):
+    """Test that a reformat over the same context reports cache reads, including for streamed calls."""
+    provider.generate("Summarize it.", history=HISTORY, system_prompt=CONTEXT)
+    first = provider.usage_stats()
+    assert first["cache_creation_input_tokens"] > 0 and first["cache_read_input_tokens"] == 0
+
+    assert "".join(provider.stream("Make it a Word document.", history=HISTORY, system_prompt=CONTEXT)) == "Hello there."
+    usage = provider.usage_stats()
+    assert usage["cache_read_input_tokens"] == first["cache_creation_input_tokens"]
+    assert usage["output_tokens"] == 3 + 7
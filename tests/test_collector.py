@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.agent import collector as collector_module
+from research_agent.agent.collector import CollectorAgent
+from research_agent.agent.events import SourceFound, DocumentFound, QueryFinished, QueryFailed
+from research_agent.core.cache.store import SQLiteCache
+from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.llm.mock_provider import MockLLMProvider
+from research_agent.core.search.base import BaseSearchProvider
+from research_agent.core.search.fanout import SearchFanOut
+
+class FakeSearchProvider(BaseSearchProvider):
+    def search(self, query):
+        if query.endswith("filetype:docx"):
+            raise RuntimeError("provider down")
+        if query.endswith("filetype:pdf"):
+            return [{"title": "Paper", "url": "http://example.com/paper.pdf", "content": "A paper."}]
+        return [
+            {"title": "Page", "url": "http://example.com/page", "content": "Some content."},
+            {"title": "Page again", "url": "https://www.example.com/page/", "content": "Some content."},
+        ]
+
+class PlanningLLM(BaseLLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, history=[], system_prompt=None):
+        self.calls += 1
+        return '```json\n{"search_queries": ["fusion records", "fusion startups"], "look_for_documents": true}\n```'
+
+    def stream(self, prompt, history=[], system_prompt=None):
+        yield self.generate(prompt, history, system_prompt)
+
+def make_collector():
+    collector = CollectorAgent()
+    collector.llm = MockLLMProvider()  # Not JSON, so the plan falls back to the raw query
+    collector.search_tool = FakeSearchProvider()
+    collector.plan_cache = None
+    collector.page_fetcher = None
+    collector.document_ingestor = None
+    return collector
+
+def test_iter_collect_yields_typed_events():
+    """Test that the streaming collector yields source, document, finished and failed events."""
+    events = list(make_collector().iter_collect("fusion"))
+    assert [e.url for e in events if isinstance(e, SourceFound)] == ["http://example.com/page"]
+    assert [e.type for e in events if isinstance(e, DocumentFound)] == ["pdf"]
+    assert [e.query for e in events if isinstance(e, QueryFailed)] == ["fusion filetype:docx"]
+    assert len([e for e in events if isinstance(e, QueryFinished)]) == 3
+
+def test_collect_is_built_on_events():
+    """Test that collect() aggregates the streamed events into the legacy dict."""
+    data = make_collector().collect("fusion")
+    assert data["sources"] == [{"title": "Page", "url": "http://example.com/page"}]
+    assert data["documents"] == [{"title": "Paper", "url": "http://example.com/paper.pdf", "type": "pdf"}]
+    assert len(data["passages"]) == 2
+    assert data["context"] == "\n\n".join(data["passages"])
+
+def test_fanout_is_shut_down_when_planning_fails(monkeypatch):
+    """Test that an error before results() are consumed still stops the fan-out's threads."""
+    fanouts = []
+
+    class RecordingFanOut(SearchFanOut):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            fanouts.append(self)
+
+    def failing_plan(query, history, status_callback=None, on_query=None):
+        on_query("fusion records")
+        raise RuntimeError("planner crashed")
+
+    monkeypatch.setattr(collector_module, "SearchFanOut", RecordingFanOut)
+    collector = make_collector()
+    collector.plan = failing_plan
+    with pytest.raises(RuntimeError):
+        list(collector.iter_collect("fusion"))
+    assert fanouts[0]._executor._shutdown
+
+def test_document_type_is_lowercased():
+    """Test that upper-case document extensions map to the lower-case types the ingestor reads."""
+    result = {"title": "Annual Report", "url": "http://example.com/REPORT.PDF", "content": "Figures."}
+    events = list(make_collector()._source_events("fusion", result))
+    assert [e.type for e in events if isinstance(e, DocumentFound)] == ["pdf"]
+
+def test_plan_cache_skips_planning_call():
+    """Test that near-identical queries reuse a cached plan but follow-ups in new context do not."""
+    collector = make_collector()
+    collector.llm = PlanningLLM()
+    collector.plan_cache = SQLiteCache(":memory:")
+
+    plan = collector.plan("What is the latest in nuclear fusion?")
+    assert plan == {"search_queries": ["fusion records", "fusion startups"], "look_for_documents": True}
+    assert collector.plan("  latest in Nuclear Fusion ") == plan
+    assert collector.llm.calls == 1
+
+    collector.plan("latest in nuclear fusion", history=[{"role": "user", "content": "Tell me about ITER"}])
+    assert collector.llm.calls == 2
+
+class StreamingPlanLLM(BaseLLMProvider):
+    """Streams a plan and records which searches had started before each chunk."""
+
+    def __init__(self, searches):
+        self.searches = searches
+        self.seen = []
+
+    def generate(self, prompt, history=[], system_prompt=None):
+        raise AssertionError("plan should be streamed")
+
+    def stream(self, prompt, history=[], system_prompt=None):
+        for chunk in ['{"search_queries": ["fusion records"', ', "fusion startups"]', ', "look_for_documents": true}']:
+            # Give the fan-out a moment to start the query submitted for the previous chunk
+            time.sleep(0.05)
+            self.seen.append(list(self.searches))
+            yield chunk
+
+def test_streamed_plan_starts_searches_early():
+    """Test that each planned query is searched as soon as its string is parsed from the stream."""
+    collector = make_collector()
+    searches = []
+    search = collector.search_tool.search
+    collector.search_tool.search = lambda q: searches.append(q) or search(q)
+    collector.llm = StreamingPlanLLM(searches)
+
+    events = list(collector.iter_collect("fusion", ordered=True))
+    assert collector.llm.seen == [[], ["fusion records"], ["fusion records", "fusion startups"]]
+    finished = [e.query for e in events if isinstance(e, (QueryFinished, QueryFailed))]
+    assert finished == ["fusion records", "fusion startups", "fusion filetype:pdf", "fusion filetype:docx", "fusion filetype:xlsx"]
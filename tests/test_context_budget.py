@@ -0,0 +1,28 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.context.budget import ContextBudgeter, chunk_passage, estimate_tokens
+
+def test_chunk_passage_keeps_source_header():
+    """Test that long passages are chunked and every chunk keeps its source line."""
+    passage = "Source: Big Page (http://example.com)\nContent: " + " ".join(["Sentence number %d." % i for i in range(400)])
+    chunks = chunk_passage(passage, max_tokens=100)
+    assert len(chunks) > 1
+    assert all(chunk.startswith("Source: Big Page (http://example.com)\n") for chunk in chunks)
+    assert all(estimate_tokens(chunk) <= 110 for chunk in chunks)
+
+def test_budgeter_prefers_relevant_passages_within_budget():
+    """Test that the most relevant passages are kept and the rest are recorded as dropped."""
+    passages = [
+        "Source: Cooking (http://a)\nContent: " + "A recipe for pasta with tomato sauce. " * 20,
+        "Source: Fusion (http://b)\nContent: " + "Nuclear fusion reactors reached record plasma temperatures. " * 20,
+        "Source: Gardening (http://c)\nContent: " + "How to grow roses in a small garden. " * 20,
+    ]
+    budgeter = ContextBudgeter(token_budget=400, chunk_tokens=300)
+    packed = budgeter.pack("latest nuclear fusion records", passages)
+    assert "Fusion" in packed["context"]
+    assert packed["tokens"] <= 400
+    assert len(packed["dropped"]) == 2
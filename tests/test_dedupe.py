@@ -0,0 +1,27 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.search.dedupe import canonicalize_url, ResultDeduplicator
+
+def test_canonicalize_url_variants():
+    """Test that scheme, host, AMP and tracking variants collapse to one URL."""
+    canonical = canonicalize_url("https://example.com/news/story")
+    assert canonicalize_url("http://www.example.com/news/story/") == canonical
+    assert canonicalize_url("https://example.com/news/story/amp?utm_source=x&fbclid=1#top") == canonical
+    assert canonicalize_url("https://amp.example.com/news/story?amp=1") == canonical
+    assert canonicalize_url("https://example.com/news/story?id=2") != canonical
+
+def test_deduplicator_drops_repeated_and_syndicated_results():
+    """Test that repeated URLs and near-identical syndicated text are dropped."""
+    article = ("The central bank raised interest rates by a quarter point on Wednesday, "
+               "citing persistent inflation and a strong labour market across most regions.")
+    dedupe = ResultDeduplicator()
+    assert dedupe.add({"url": "https://news.example.com/rates", "content": article})
+    assert not dedupe.add({"url": "http://news.example.com/rates/?utm_medium=feed", "content": "other"})
+    assert not dedupe.add({"url": "https://syndicate.example.org/a1", "content": article + " Reuters"})
+    assert dedupe.add({"url": "https://other.example.org/b", "content": "Quantum computers use qubits that "
+                       "can represent zero and one at the same time through superposition."})
+    assert dedupe.dropped == 2
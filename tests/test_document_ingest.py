@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from docx import Document
+from fpdf import FPDF
+from openpyxl import Workbook
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.documents.ingest import DocumentIngestor, extract_document_chunks, get_process_pool, reset_process_pool
+
+def make_files(directory):
+    pdf = FPDF()
+    for page in range(30):
+        pdf.add_page()
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 6, f"Page {page}: fusion reactor output measurements. " * 10)
+    pdf.output(os.path.join(directory, "report.pdf"))
+
+    doc = Document()
+    doc.add_paragraph("Tokamak design overview.")
+    table = doc.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "Year"
+    table.rows[0].cells[1].text = "Output"
+    doc.save(os.path.join(directory, "notes.docx"))
+
+    wb = Workbook()
+    wb.active.append(["Year", "Output MW"])
+    wb.active.append([2024, 500])
+    wb.save(os.path.join(directory, "data.xlsx"))
+
+def test_extract_document_chunks_is_bounded(tmp_path):
+    """Test page-by-page PDF extraction stops at max_chars and DOCX/XLSX tables are read."""
+    make_files(str(tmp_path))
+    chunks = extract_document_chunks(str(tmp_path / "report.pdf"), "pdf", max_chars=3000, chunk_chars=1000)
+    assert chunks[0].startswith("Page 0: fusion")
+    assert 2500 < sum(len(c) for c in chunks) < 3100
+    assert "Year | Output" in extract_document_chunks(str(tmp_path / "notes.docx"), "docx", 1000, 500)[0]
+    assert "2024 | 500" in extract_document_chunks(str(tmp_path / "data.xlsx"), "xlsx", 1000, 500)[0]
+
+def test_ingestor_downloads_and_extracts_in_process_pool(tmp_path):
+    """Test that documents are streamed from a local server, size-limited and extracted."""
+    site = tmp_path / "site"
+    site.mkdir()
+    make_files(str(site))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=str(site)))
+    server.RequestHandlerClass.log_message = lambda *args: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        ingestor = DocumentIngestor()
+        ingestor.download_dir = str(tmp_path / "downloads")
+        ingestor.max_bytes = 200_000
+        documents = [
+            {"title": "Report", "url": f"{base}/report.pdf", "type": "pdf"},
+            {"title": "Notes", "url": f"{base}/notes.docx", "type": "docx"},
+            {"title": "Data", "url": f"{base}/data.xlsx", "type": "xlsx"},
+            {"title": "Missing", "url": f"{base}/missing.pdf", "type": "pdf"},
+        ]
+        extracted = ingestor.ingest(documents)
+        assert set(extracted) == {f"{base}/report.pdf", f"{base}/notes.docx", f"{base}/data.xlsx"}
+
+        ingestor.max_bytes = 100
+        os.remove(ingestor.download(f"{base}/report.pdf", "pdf"))
+        assert ingestor.download(f"{base}/report.pdf", "pdf") is None
+    finally:
+        server.shutdown()
+
+def test_download_dir_is_capped_least_recently_used_first(tmp_path):
+    """Test that eviction removes the oldest downloads first and a cache hit counts as a use."""
+    ingestor = DocumentIngestor()
+    ingestor.download_dir = str(tmp_path)
+    reused_url = "http://example.com/reused.pdf"
+    reused = f"{hashlib.sha1(reused_url.encode('utf-8')).hexdigest()}.pdf"
+    for age, name in enumerate(["c.pdf", "b.pdf", "a.pdf", reused]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+
+    # The oldest file is served from the cache, which makes it the most recently used
+    assert ingestor.download(reused_url, "pdf") == str(tmp_path / reused)
+    ingestor.max_dir_bytes = 250
+    ingestor.evict()
+    assert sorted(os.listdir(tmp_path)) == sorted(["c.pdf", reused])
+
+class DripStandIn(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "100000")
+        self.end_headers()
+        try:
+            for _ in range(200):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+def test_slow_drip_download_hits_the_overall_deadline(tmp_path):
+    """Test that a server sending a byte at a time cannot stall a download past its timeout."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DripStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        ingestor = DocumentIngestor()
+        ingestor.download_dir = str(tmp_path)
+        ingestor.timeout = 0.5
+        started = time.monotonic()
+        assert ingestor.download(f"http://127.0.0.1:{server.server_port}/slow.pdf", "pdf") is None
+        assert time.monotonic() - started < 5.0  # the drip alone would take 10 s
+        assert os.listdir(tmp_path) == []
+    finally:
+        server.shutdown()
+
+def test_reset_process_pool_kills_stuck_workers():
+    """Test that a pool stuck on a task is terminated and replaced by a fresh one."""
+    pool = get_process_pool()
+    assert pool._mp_context.get_start_method() != "fork"
+    future = pool.submit(time.sleep, 30)
+    while not future.running():
+        time.sleep(0.01)
+    workers = list(pool._processes.values())
+    reset_process_pool(pool)
+    for worker in workers:
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+    assert get_process_pool() is not pool
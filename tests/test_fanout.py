@@ -0,0 +1,71 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.search.fanout import SearchFanOut
+
+def test_fanout_ordered_results_and_concurrency():
+    """Test that queries run concurrently, bounded, and merge in submission order."""
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def search(query):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.2 if query == "slow" else 0.05)
+        with lock:
+            in_flight["now"] -= 1
+        return [{"title": query, "url": f"http://example.com/{query}", "content": ""}]
+
+    fanout = SearchFanOut(search, max_in_flight=3)
+    for q in ["slow", "a", "b", "c", "d"]:
+        fanout.submit(q)
+    fanout.close()
+
+    queries = [outcome["query"] for outcome in fanout.results(ordered=True)]
+    assert queries == ["slow", "a", "b", "c", "d"]
+    # Concurrency is checked on the in-flight counter rather than wall-clock time, which flakes on busy CI
+    assert in_flight["max"] == 3
+
+def test_fanout_per_query_deadline_and_errors():
+    """Test that slow queries time out and failures are reported, not raised."""
+    def search(query):
+        if query == "boom":
+            raise RuntimeError("provider down")
+        time.sleep(1.0 if query == "hang" else 0.01)
+        return [{"title": query, "url": "", "content": ""}]
+
+    fanout = SearchFanOut(search, max_in_flight=4, timeout=0.2)
+    for q in ["ok", "hang", "boom"]:
+        fanout.submit(q)
+    fanout.close()
+
+    outcomes = {outcome["query"]: outcome for outcome in fanout.results()}
+    assert outcomes["ok"]["error"] is None and len(outcomes["ok"]["results"]) == 1
+    assert isinstance(outcomes["hang"]["error"], TimeoutError)
+    assert isinstance(outcomes["boom"]["error"], RuntimeError)
+
+def test_fanout_context_manager_stops_threads_without_results():
+    """Test that leaving the with-block before iterating results() shuts the pool down and cancels queued queries."""
+    release = threading.Event()
+    started = []
+
+    def search(query):
+        started.append(query)
+        release.wait(5)
+        return []
+
+    with SearchFanOut(search, max_in_flight=1) as fanout:
+        fanout.submit("running")
+        fanout.submit("queued")
+        while not started:
+            time.sleep(0.01)
+    release.set()
+    fanout._executor.shutdown(wait=True)
+    assert started == ["running"]
+    assert list(fanout.results()) == []  # a shut-down fan-out doesn't wait for cancelled queries
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.search.base import BaseSearchProvider
+from research_agent.core.search import hedged_provider
+from research_agent.core.search.hedged_provider import HedgedSearchProvider, abandoned_calls
+
+class SlowProvider(BaseSearchProvider):
+    def __init__(self, name, delay, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.released = threading.Event()  # set() lets a blocked sync search return early
+
+    def search(self, query):
+        self.calls += 1
+        self.released.wait(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return [{"title": self.name, "url": f"http://{self.name}", "content": query}]
+
+    async def asearch(self, query):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [{"title": self.name, "url": f"http://{self.name}", "content": query}]
+
+def test_hedge_only_fires_when_primary_is_slow():
+    """Test that a fast primary is not hedged and a slow one is."""
+    fast = HedgedSearchProvider(SlowProvider("primary", 0.01), SlowProvider("secondary", 0.01), initial_delay=0.2)
+    assert fast.search("q")[0]["title"] == "primary"
+    assert fast.secondary.calls == 0
+
+    # The primary blocks until released, so only the hedge can produce the answer
+    slow = HedgedSearchProvider(SlowProvider("primary", 30.0), SlowProvider("secondary", 0.01), initial_delay=0.1)
+    try:
+        assert slow.search("q")[0]["title"] == "secondary"
+        assert slow.hedges == 1
+    finally:
+        slow.primary.released.set()
+
+def test_hedge_on_primary_failure_and_async_race():
+    """Test that a failing primary falls through and the async race cancels the loser."""
+    # Bounds are far below the delays they guard against, so a loaded CI machine can't trip them
+    failing = HedgedSearchProvider(SlowProvider("primary", 0.0, fail=True), SlowProvider("secondary", 0.01), initial_delay=30.0)
+    start = time.monotonic()
+    assert failing.search("q")[0]["title"] == "secondary"
+    assert time.monotonic() - start < 10.0
+
+    race = HedgedSearchProvider(SlowProvider("primary", 30.0), SlowProvider("secondary", 0.01), mode="race")
+    start = time.monotonic()
+    assert asyncio.run(race.asearch("q"))[0]["title"] == "secondary"
+    assert time.monotonic() - start < 10.0  # the primary's 30 s sleep was cancelled, not awaited
+
+def test_hedge_delay_tracks_primary_p95():
+    """Test that the hedge delay follows observed primary latency once warmed up."""
+    provider = HedgedSearchProvider(SlowProvider("primary", 0.0), SlowProvider("secondary", 0.0), initial_delay=9.0, min_samples=5)
+    assert provider.hedge_delay() == 9.0
+    for _ in range(5):
+        provider.search("q")
+    assert provider.hedge_delay() == provider.min_delay  # instant primaries don't hedge every call
+
+def test_latency_window_survives_rebuilt_providers():
+    """Test that providers sharing a latency_key keep the observed p95 across instances."""
+    first = HedgedSearchProvider(SlowProvider("primary", 0.0), SlowProvider("secondary", 0.0), initial_delay=9.0,
+                                 min_samples=3, latency_key="test-primary->test-secondary")
+    for _ in range(3):
+        first.search("q")
+    rebuilt = HedgedSearchProvider(SlowProvider("primary", 0.0), SlowProvider("secondary", 0.0), initial_delay=9.0,
+                                   min_samples=3, latency_key="test-primary->test-secondary")
+    assert rebuilt.hedge_delay() < 1.0
+
+def wait_for_abandoned_calls(timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while abandoned_calls() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_hedging_pauses_while_abandoned_calls_hold_threads(monkeypatch):
+    """Test that no new hedges start once MAX_ABANDONED losers are still running, and the count drains."""
+    wait_for_abandoned_calls()  # losers released by earlier tests
+    monkeypatch.setattr(hedged_provider, "MAX_ABANDONED", 1)
+    stuck = HedgedSearchProvider(SlowProvider("primary", 30.0), SlowProvider("secondary", 0.01), initial_delay=0.05)
+    try:
+        assert stuck.search("q")[0]["title"] == "secondary"
+        assert abandoned_calls() == 1
+
+        slow = HedgedSearchProvider(SlowProvider("primary", 0.3), SlowProvider("secondary", 0.01), initial_delay=0.05)
+        assert slow.search("q")[0]["title"] == "primary"
+        assert slow.secondary.calls == 0 and slow.hedges == 0
+    finally:
+        stuck.primary.released.set()
+    wait_for_abandoned_calls()
+    assert abandoned_calls() == 0
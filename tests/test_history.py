@@ -0,0 +1,45 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.context.budget import estimate_tokens
+from research_agent.core.llm.history import SUMMARY_PREFIX, HistoryManager, _compact
+
+def make_history(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i} about fusion energy?"})
+        history.append({"role": "assistant", "content": f"# Report {i}\n\nAnswer {i} is long. " + "Detail sentence. " * 2000})
+    return history
+
+def test_views_keep_recent_turns_and_summarize_the_rest():
+    """Test that call sites get their number of recent turns, clipped, plus a rolling summary."""
+    manager = HistoryManager()
+    manager.call_site_turns = {"classify": 1, "report": 3, "summary": 0}
+    manager.message_tokens = 200
+    history = make_history(10)
+
+    classify = manager.view(history, "classify")
+    assert classify[0]["content"].startswith(SUMMARY_PREFIX)
+    assert "- User: Question 8 about fusion energy?" in classify[0]["content"]
+    assert "- Assistant: Report 8 Answer 8 is long." in classify[0]["content"]
+    assert [m["content"] for m in classify[1:2]] == ["Question 9 about fusion energy?"]
+    assert classify[2]["content"].endswith("…[truncated]")
+
+    report = manager.view(history, "report")
+    assert len(report) == 7
+    assert sum(estimate_tokens(m["content"]) for m in report[1:]) <= manager.token_budget
+    assert estimate_tokens(report[0]["content"]) <= manager.summary_tokens
+    assert manager.view(history, "summary") == []
+    assert manager.view([], "report") == []
+
+def test_views_are_memoised_across_calls():
+    """Test that an unchanged history is not compacted again."""
+    manager = HistoryManager()
+    history = make_history(4)
+    before = _compact.cache_info().hits
+    manager.view(history, "plan")
+    manager.view([dict(m) for m in history], "plan")
+    assert _compact.cache_info().hits == before + 1
@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.intent.classifier import IntentClassifier
+
+def test_rules_answer_small_talk_and_obvious_research(tmp_path):
+    """Test that greetings get a canned reply and clear questions skip the LLM."""
+    classifier = IntentClassifier(model_path=str(tmp_path / "intent.pkl"), threshold=0.7)
+    hello = classifier.classify("Hello there!")
+    assert hello["type"] == "CHAT" and hello["source"] == "rule" and hello["response"]
+    assert classifier.classify("Thanks, FRIDAY")["type"] == "CHAT"
+    assert classifier.classify("Who is the CEO of Google?")["type"] == "RESEARCH"
+    assert classifier.classify("Tesla stock price")["source"] == "rule"
+
+def test_personal_and_creative_inputs_are_not_researched(tmp_path):
+    """Test that second-person and creative requests escalate to the LLM instead of matching research rules."""
+    classifier = IntentClassifier(model_path=str(tmp_path / "intent.pkl"), threshold=0.8)
+    for text in ["how much do you love me", "Explain yourself", "compare yourself to jarvis",
+                 "what is the best way to say thanks", "write a poem about the current state of love"]:
+        assert classifier.classify(text) is None, text
+
+def test_model_is_trained_once_and_escalates_ambiguous_inputs(tmp_path):
+    """Test that the n-gram model is pickled on first use and unsure inputs return None."""
+    path = tmp_path / "intent.pkl"
+    classifier = IntentClassifier(model_path=str(path), threshold=0.7)
+    result = classifier.classify("effects of climate change on agriculture")
+    assert result["type"] == "RESEARCH" and result["source"] == "model"
+    assert path.exists()
+
+    # Model CHAT predictions need an LLM-written reply, so they are escalated
+    assert classifier.classify("write me a song about summer") is None
+    reloaded = IntentClassifier(model_path=str(path), threshold=0.99)
+    assert reloaded.research_probability("population of Brazil") > reloaded.research_probability("i feel lonely")
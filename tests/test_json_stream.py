@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.llm.json_stream import StreamingArrayParser
+
+PLAN = ('```json\n{"note": "not [\\"search_queries\\"]", "search_queries": ["fusion \\"records\\"", "a, [b]", '
+        '{"nested": "skip"}, "caf\\u00e9"], "look_for_documents": true, "more": {"search_queries": ["late"]}}\n```')
+
+def feed_in_chunks(text, size):
+    parser = StreamingArrayParser("search_queries")
+    found = []
+    for i in range(0, len(text), size):
+        found.extend(parser.feed(text[i:i + size]))
+    return parser, found
+
+def test_array_strings_survive_any_chunking():
+    """Test that strings split across chunks, escapes and brackets inside strings are parsed the same."""
+    for size in (1, 2, 3, 7, len(PLAN)):
+        parser, found = feed_in_chunks(PLAN, size)
+        assert found == ['fusion "records"', "a, [b]", "café"]
+        assert parser.text == PLAN
+
+def test_elements_are_emitted_when_complete():
+    """Test that a query is returned by the chunk that closes it, before the array ends."""
+    parser = StreamingArrayParser("search_queries")
+    assert parser.feed('{"search_queries": ["first", "sec') == ["first"]
+    assert parser.feed('ond"') == ["second"]
+    assert parser.feed('], "look_for_documents": false}') == []
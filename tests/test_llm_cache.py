@@ -0,0 +1,108 @@
+import os
+import json
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.agent.research_agent import is_research_verdict
+from research_agent.core.cache.store import SQLiteCache
+from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.llm.cached_provider import CachedLLMProvider, ngram_vector
+
+class CountingLLM(BaseLLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, history=[], system_prompt=None):
+        self.calls += 1
+        return f"response {self.calls}"
+
+    def stream(self, prompt, history=[], system_prompt=None):
+        self.calls += 1
+        yield "streamed "
+        yield "response"
+
+def make_cached(tmp_path, **kwargs):
+    llm = CountingLLM()
+    path = str(tmp_path / "llm.sqlite3")
+    return llm, CachedLLMProvider(llm, "classify", cache=SQLiteCache(path, "exact"),
+                                  semantic_cache=SQLiteCache(path, "semantic"), **kwargs)
+
+def test_exact_cache_keys_on_prompt_history_and_system_prompt(tmp_path):
+    """Test that only byte-identical requests are served from the exact tier."""
+    llm, cached = make_cached(tmp_path)
+    history = [{"role": "user", "content": "hi"}]
+
+    assert cached.generate("Hello", history, "sys") == "response 1"
+    assert cached.generate("Hello", history, "sys") == "response 1"
+    assert cached.generate("Hello", [], "sys") == "response 2"
+    assert cached.generate("Hello", history, "other") == "response 3"
+    assert llm.calls == 3
+    assert "".join(cached.stream("Hi there")) == "streamed response"
+    assert list(cached.stream("Hi there")) == ["streamed response"]
+    assert llm.calls == 4
+
+def test_semantic_tier_reuses_near_identical_queries(tmp_path):
+    """Test that the semantic tier matches reworded greetings but not different questions."""
+    llm, cached = make_cached(tmp_path, exact=False, semantic=True)
+
+    assert cached.generate("prompt a", [], "sys", semantic_key="Hello, how are you?") == "response 1"
+    assert cached.generate("prompt b", [{"role": "user", "content": "x"}], "sys", semantic_key="hello how are you") == "response 1"
+    assert cached.generate("prompt c", [], "sys", semantic_key="Who is the CEO of Google?") == "response 2"
+    assert cached.generate("prompt d", [], "other sys", semantic_key="Hello, how are you?") == "response 3"
+    assert llm.calls == 3
+
+    # A fresh wrapper rebuilds its similarity index from disk
+    reloaded = CachedLLMProvider(llm, "classify", exact=False, semantic=True,
+                                 cache=cached.cache, semantic_cache=cached.semantic_cache)
+    assert reloaded.generate("prompt e", [], "sys", semantic_key="hello, how are you") == "response 1"
+    assert float(ngram_vector("abc") @ ngram_vector("abc")) > 0.99
+
+class ClassifierLLM(BaseLLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, history=[], system_prompt=None):
+        self.calls += 1
+        if "dragon" in prompt:
+            return json.dumps({"type": "CHAT", "response": f"Story {self.calls}: " + prompt.split("named ")[1]})
+        return json.dumps({"type": "RESEARCH", "response": None})
+
+    def stream(self, prompt, history=[], system_prompt=None):
+        yield self.generate(prompt, history, system_prompt)
+
+def test_semantic_tier_never_shares_chat_replies(tmp_path):
+    """Test that near-identical CHAT requests get their own reply while RESEARCH verdicts are reused."""
+    llm = ClassifierLLM()
+    path = str(tmp_path / "llm.sqlite3")
+    cached = CachedLLMProvider(llm, "classify", exact=False, semantic=True,
+                               cache=SQLiteCache(path, "exact"), semantic_cache=SQLiteCache(path, "semantic"))
+
+    def classify(query):
+        return json.loads(cached.generate(query, [], "sys", semantic_key=query, semantic_filter=is_research_verdict))
+
+    assert classify("Write me a story about a dragon named Max")["response"] == "Story 1: Max"
+    assert classify("Write me a story about a dragon named Mia")["response"] == "Story 2: Mia"
+    assert llm.calls == 2
+
+    assert classify("Latest news on nuclear fusion?")["type"] == "RESEARCH"
+    assert classify("latest news on nuclear fusion")["type"] == "RESEARCH"
+    assert llm.calls == 3
+
+def test_semantic_lookup_leaves_other_namespaces_untouched(tmp_path):
+    """Test that entries of other call sites are neither read nor refreshed, and each lookup counts once."""
+    llm, planner = make_cached(tmp_path, exact=False, semantic=True)
+    planner.call_site = "plan"
+    planner.generate("prompt", [], "sys", semantic_key="fusion power plants")
+    semantic_cache = planner.semantic_cache
+    (key, _), = semantic_cache.items()
+    accessed = semantic_cache._connect().execute("SELECT accessed_at FROM semantic WHERE key = ?", (key,)).fetchone()[0]
+    before = semantic_cache.stats()
+
+    classifier = CachedLLMProvider(llm, "classify", exact=False, semantic=True,
+                                   cache=planner.cache, semantic_cache=semantic_cache)
+    assert classifier.generate("prompt", [], "sys", semantic_key="fusion power plants") == "response 2"
+    stats = semantic_cache.stats()
+    assert (stats["hits"] - before["hits"], stats["misses"] - before["misses"]) == (0, 1)
+    assert semantic_cache._connect().execute("SELECT accessed_at FROM semantic WHERE key = ?", (key,)).fetchone()[0] == accessed
@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.llm.factory import get_llm_provider, resolve_model
+from research_agent.config.settings import settings
+
+def test_call_sites_route_to_fast_and_strong_models(monkeypatch):
+    """Test that call sites resolve to their tier's model for the active provider."""
+    monkeypatch.setattr(settings, "DEFAULT_LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "LLM_MODEL", "")
+    monkeypatch.setattr(settings, "LLM_CALL_SITE_MODELS", {"classify": "fast", "report": "strong", "summary": "my-custom-model"})
+    assert resolve_model("classify") == settings.LLM_FAST_MODELS["openai"]
+    assert resolve_model("report") == settings.LLM_STRONG_MODELS["openai"]
+    assert resolve_model("summary") == "my-custom-model"
+    assert resolve_model("unknown") == settings.LLM_STRONG_MODELS["openai"]
+
+    monkeypatch.setattr(settings, "LLM_MODEL", "gpt-4.1")
+    assert resolve_model("classify") == "gpt-4.1"
+
+def test_factory_passes_model_to_provider(monkeypatch):
+    """Test that the routed model reaches the provider and its cache key parameters."""
+    monkeypatch.setattr(settings, "DEFAULT_LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "LLM_MODEL", "")
+    classifier = get_llm_provider("classify")
+    reporter = get_llm_provider("report")
+    assert classifier.provider.model == settings.LLM_FAST_MODELS["openai"]
+    assert reporter.cache_params() == {"model": settings.LLM_STRONG_MODELS["openai"]}
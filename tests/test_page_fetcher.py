@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.cache.store import SQLiteCache
+from research_agent.core.web.fetcher import PageFetcher, decode_body, extract_text
+
+ARTICLE = b"""<html><head><title>t</title><script>var tracking = 1;</script></head><body>
+<nav><a href="/">Home</a> <a href="/news">News</a></nav>
+<main><h1>Fusion Record</h1>
+<p>Researchers held a plasma at one hundred million degrees for a record time.</p>
+<div class="share">Share</div>
+<p>The result brings commercial fusion power a step closer, the team said.</p></main>
+<footer>Copyright 2024 Example News. All rights reserved worldwide.</footer></body></html>"""
+
+UNLABELLED = "<html><body><main><p>Der Kernfusionsreaktor in Greifswald erzielte einen neuen Rekord für Plasmen.</p></main></body></html>"
+
+class SiteStandIn(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        SiteStandIn.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/article" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        if self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/article")
+            self.end_headers()
+            return
+        if self.path == "/unlabelled":
+            body, content_type = UNLABELLED.encode("utf-8"), "text/html"
+        elif self.path == "/article":
+            body, content_type = ARTICLE, "text/html; charset=utf-8"
+        else:
+            body, content_type = b"x" * 10000, "text/plain"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_extract_text_strips_boilerplate():
+    """Test that navigation, scripts, footers and short fragments are dropped."""
+    text = extract_text(ARTICLE.decode())
+    assert text.splitlines() == [
+        "Fusion Record",
+        "Researchers held a plasma at one hundred million degrees for a record time.",
+        "The result brings commercial fusion power a step closer, the team said.",
+    ]
+
+def test_page_fetcher_caps_size_and_revalidates_with_etag():
+    """Test concurrent fetching against a local site, the byte cap and ETag revalidation."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        fetcher = PageFetcher(cache=SQLiteCache(":memory:"))
+        fetcher.allow_private = True  # the stand-in site is on loopback
+        fetcher.max_bytes = 1000
+
+        texts = fetcher.fetch_many([f"{base}/article", f"{base}/big"])
+        assert texts[f"{base}/article"].startswith("Fusion Record")
+        assert len(texts[f"{base}/big"]) == 1000
+
+        SiteStandIn.requests = []
+        assert fetcher.fetch(f"{base}/article").startswith("Fusion Record")
+        assert SiteStandIn.requests == []  # fresh cache entry, no request
+
+        fetcher.fresh_seconds = 0
+        assert fetcher.fetch(f"{base}/article").startswith("Fusion Record")
+        assert SiteStandIn.requests == [("/article", '"v1"')]
+    finally:
+        server.shutdown()
+
+def test_page_without_charset_is_not_decoded_as_latin1():
+    """Test that a UTF-8 page served as bare text/html keeps its non-ASCII characters."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        fetcher = PageFetcher(cache=SQLiteCache(":memory:"))
+        fetcher.allow_private = True  # the stand-in site is on loopback
+        text = fetcher.fetch(f"http://127.0.0.1:{server.server_port}/unlabelled")
+        assert "Rekord für Plasmen" in text
+    finally:
+        server.shutdown()
+
+def test_private_addresses_and_bad_urls_are_refused():
+    """Test that loopback hosts are refused by default, redirects are followed, and bad URLs don't abort the batch."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        SiteStandIn.requests = []
+        fetcher = PageFetcher(cache=SQLiteCache(":memory:"))
+        assert fetcher.fetch_many([f"{base}/article", "http://[::1/broken", "http://169.254.169.254/latest/meta-data/"]) == {}
+        assert SiteStandIn.requests == []
+
+        fetcher.allow_private = True
+        assert fetcher.fetch(f"{base}/moved").startswith("Fusion Record")
+        assert [path for path, _ in SiteStandIn.requests] == ["/moved", "/article"]
+    finally:
+        server.shutdown()
+
+def test_decode_body_prefers_header_then_meta_charset():
+    """Test the charset order: Content-Type header, then <meta charset>, then UTF-8."""
+    page = '<meta charset="windows-1252"><p>caf\u00e9</p>'.encode("cp1252")
+    assert "caf\u00e9" in decode_body(page, "text/html")
+    assert "caf\u00e9" in decode_body("caf\u00e9".encode("utf-8"), "text/html")
+    assert decode_body("caf\u00e9".encode("latin-1"), "text/plain; charset=ISO-8859-1") == "caf\u00e9"
+    # A multi-byte character cut by the byte cap does not turn the page into mojibake
+    assert decode_body("\u00fcber caf\u00e9".encode("utf-8")[:-1], "text/html") == "\u00fcber caf"
@@ -0,0 +1,81 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.oxml.ns import qn
+from pypdf import PdfReader
+from research_agent.core.reports.markdown import CodeBlock, Heading, ListItem, Paragraph, Rule, Span, Table, parse_markdown
+from research_agent.core.reports.renderers import render_docx, render_pdf
+
+REPORT = """# Executive Summary
+Fusion made **real [progress](https://example.com/a)** this year,
+with *new* records in `Q > 1` shots and no snake_case_names mangled.
+
+| Device | Result |
+|---|:-:|
+| JET | **69 MJ** |
+
+1. First
+2. Second
+   - Nested detail
+---
+```
+raw *text*
+```
+## References
+
+- [Fusion — “review”](https://example.com/b)
+"""
+
+def test_parse_builds_blocks_and_inline_spans():
+    """Test that one parse yields headings, joined paragraphs, tables, lists, code and inline formatting."""
+    blocks = parse_markdown(REPORT)
+    assert [type(b) for b in blocks] == [Heading, Paragraph, Table, ListItem, ListItem, ListItem, Rule, CodeBlock, Heading, ListItem]
+
+    paragraph = blocks[1].spans
+    assert Span("real ", bold=True) in paragraph
+    assert Span("progress", bold=True, url="https://example.com/a") in paragraph
+    assert Span("new", italic=True) in paragraph and Span("Q > 1", code=True) in paragraph
+    assert "this year, with " in "".join(s.text for s in paragraph)
+    assert "snake_case_names" in paragraph[-1].text
+
+    table = blocks[2]
+    assert [s[0].text for s in table.header] == ["Device", "Result"]
+    assert table.rows[0][1] == [Span("69 MJ", bold=True)]
+    assert [(b.ordered, b.number, b.depth) for b in blocks[3:6]] == [(True, 1, 0), (True, 2, 0), (False, 1, 1)]
+    assert blocks[7].text == "raw *text*"
+    assert blocks[9].spans == [Span("Fusion — “review”", url="https://example.com/b")]
+
+def test_parse_edge_cases():
+    """Test that only real separator rows start tables and headings keep hashes that belong to the text."""
+    not_a_table = parse_markdown("Fees | taxes went up\n---\nNext paragraph")
+    assert [type(b) for b in not_a_table] == [Paragraph, Rule, Paragraph]
+    mismatched = parse_markdown("| A | B |\n|---|\n| 1 | 2 |")
+    assert not any(isinstance(b, Table) for b in mismatched)
+
+    assert parse_markdown("# C#")[0].spans == [Span("C#")]
+    assert parse_markdown("## F# and C# ##")[0].spans == [Span("F# and C#")]
+
+def test_docx_rule_is_a_bottom_border(tmp_path):
+    """Test that a horizontal rule renders as a bordered paragraph rather than a blank line."""
+    doc = Document(render_docx(str(tmp_path), "rule", parse_markdown("Above\n\n---\n\nBelow")))
+    rule = doc.paragraphs[2]
+    assert rule.text == "" and rule._p.pPr.find(qn("w:pBdr")).find(qn("w:bottom")).get(qn("w:val")) == "single"
+
+def test_renderers_share_the_parsed_blocks(tmp_path):
+    """Test that the PDF and DOCX renderers produce tables and clickable links from the same blocks."""
+    blocks = parse_markdown(REPORT)
+
+    pdf = PdfReader(render_pdf(str(tmp_path), "fusion", blocks))
+    text = pdf.pages[0].extract_text()
+    assert "Fusion — “review”" in text and "**" not in text
+    links = [a.get_object()["/A"]["/URI"] for a in pdf.pages[0]["/Annots"]]
+    assert links == ["https://example.com/a", "https://example.com/b"]
+
+    doc = Document(render_docx(str(tmp_path), "fusion", blocks))
+    assert [p.style.name for p in doc.paragraphs[1:3]] == ["Heading 1", "Normal"]
+    assert doc.tables[0].cell(1, 1).text == "69 MJ" and doc.tables[0].cell(1, 1).paragraphs[0].runs[0].bold
+    assert sorted(r.target_ref for r in doc.part.rels.values() if r.is_external) == ["https://example.com/a", "https://example.com/b"]
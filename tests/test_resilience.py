@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.cache.store import SQLiteCache
+from research_agent.core.resilience import CircuitOpenError, ProviderGuard, TokenBucket
+from research_agent.core.search.base import BaseSearchProvider
+from research_agent.core.search.cached_provider import CachedSearchProvider
+
+def test_circuit_breaker_fails_fast_and_recovers():
+    """Test that the breaker opens after repeated failures and closes after a good trial call."""
+    guard = ProviderGuard("test", rate=0, failure_threshold=2, reset_timeout=0.1)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            guard.call(failing)
+    with pytest.raises(CircuitOpenError):
+        guard.call(failing)
+    assert len(calls) == 2
+
+    time.sleep(0.15)
+    assert guard.call(lambda: "ok") == "ok"
+    assert guard.breaker.state == "closed"
+
+def test_token_bucket_paces_and_throttles_on_429():
+    """Test that the bucket allows a burst, then paces, and halves its rate on rate-limit errors."""
+    bucket = TokenBucket(rate=20, capacity=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert bucket.reserve() > 0
+
+    guard = ProviderGuard("test-429", rate=20, failure_threshold=10)
+
+    def throttled():
+        raise RuntimeError("429 Too Many Requests")
+
+    with pytest.raises(RuntimeError):
+        guard.call(throttled)
+    assert guard.limiter.rate == 10
+
+def test_cached_provider_serves_stale_results_when_circuit_is_open():
+    """Test that an open circuit falls back to an expired cache entry."""
+    class DownProvider(BaseSearchProvider):
+        def search(self, query):
+            raise CircuitOpenError("down")
+
+    cached = CachedSearchProvider(DownProvider(), cache=SQLiteCache(":memory:"))
+    cached.cache.set(cached.cache_key("fusion"), [{"title": "old", "url": "", "content": ""}], ttl=-1)
+    assert cached.search("fusion")[0]["title"] == "old"
+    with pytest.raises(CircuitOpenError):
+        cached.search("never cached")
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.resilience import CircuitOpenError
+from research_agent.core.retry import RetryPolicy, is_retryable_error, retry_after_seconds, retry_budget, retry_metrics
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+class Flaky:
+    def __init__(self, errors, result="ok"):
+        self.errors = list(errors)
+        self.calls = 0
+        self.result = result
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+def test_retry_after_parsing_and_classification():
+    """Test Retry-After headers, Gemini's message hint and which errors are retried."""
+    assert retry_after_seconds(HTTPError(429, {"retry-after": "7"})) == 7
+    assert retry_after_seconds(HTTPError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(Exception("429 Quota exceeded. Please retry in 12.5s.")) == 12.5
+    assert retry_after_seconds(HTTPError(500)) is None
+    assert is_retryable_error(HTTPError(503)) and is_retryable_error(TimeoutError())
+    assert not is_retryable_error(HTTPError(400))
+    assert not is_retryable_error(CircuitOpenError("open"))
+    assert is_retryable_error(Exception("429 Quota exceeded. Please retry in 12.5s."))
+    assert not is_retryable_error(Exception("429 You exceeded your current quota (insufficient_quota)"))
+
+def test_policy_retries_transient_errors_and_records_metrics():
+    """Test that transient failures are retried using the server's delay and counted."""
+    policy = RetryPolicy("test-retry", max_attempts=3, base_delay=0.01, max_delay=0.05)
+    fn = Flaky([HTTPError(429, {"retry-after": "0"}), HTTPError(502)])
+    assert policy.call(fn) == "ok"
+    assert fn.calls == 3
+    metrics = retry_metrics.snapshot()["test-retry"]
+    assert metrics["calls"] == 1 and metrics["retries"] == 2
+
+    with pytest.raises(HTTPError):
+        policy.call(Flaky([HTTPError(400)]))
+    with pytest.raises(HTTPError):
+        policy.call(Flaky([HTTPError(500)] * 3))
+    assert retry_metrics.snapshot()["test-retry"]["gave_up"] == 1
+
+def test_retry_budget_stops_retries_past_the_deadline():
+    """Test that no retry is scheduled when its backoff would overrun the turn budget."""
+    policy = RetryPolicy("test-budget", max_attempts=5, max_delay=30)
+    fn = Flaky([HTTPError(429, {"retry-after": "5"})])
+    started = time.monotonic()
+    with retry_budget(1.0):
+        with pytest.raises(HTTPError):
+            policy.call(fn)
+    assert fn.calls == 1
+    assert time.monotonic() - started < 0.5
+
+def test_stream_is_retried_only_before_the_first_chunk():
+    """Test that a stream failing to start is retried but a broken stream is not."""
+    policy = RetryPolicy("test-stream", max_attempts=3, base_delay=0.01, max_delay=0.01)
+    attempts = []
+
+    def make_stream():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise HTTPError(503)
+        yield "a"
+        yield "b"
+        if len(attempts) == 2:
+            raise HTTPError(503)
+
+    received = []
+    with pytest.raises(HTTPError):
+        for chunk in policy.stream(make_stream):
+            received.append(chunk)
+    assert received == ["a", "b"]
+    assert len(attempts) == 2
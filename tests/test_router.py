@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.agent.research_agent import ResearchAgent
+from research_agent.agent.router import RouterDecision, route
+from research_agent.core.llm.base import BaseLLMProvider
+from research_agent.core.llm.structured import StructuredOutputError, parse_model, strict_json_schema
+
+class ScriptedLLM(BaseLLMProvider):
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate(self, prompt, history=[], system_prompt=None, semantic_key=None, semantic_filter=None):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+    def stream(self, prompt, history=[], system_prompt=None):
+        yield self.generate(prompt, history, system_prompt)
+
+RESEARCH = {"type": "RESEARCH", "response": None, "search_queries": ["fusion record 2025", "tokamak news"],
+            "look_for_documents": True, "output_formats": ["docx"]}
+
+def test_parse_model_validates_schema():
+    """Test that fenced JSON is accepted and inconsistent decisions are rejected."""
+    decision = parse_model("```json\n" + json.dumps(RESEARCH) + "\n```", RouterDecision)
+    assert decision.search_queries == ["fusion record 2025", "tokamak news"]
+    with pytest.raises(StructuredOutputError):
+        parse_model('{"type": "RESEARCH", "search_queries": []}', RouterDecision)
+    with pytest.raises(StructuredOutputError):
+        parse_model("Sure! Here is your plan.", RouterDecision)
+
+def test_strict_schema_requires_every_field():
+    """Test that the OpenAI strict schema is closed, requires all fields and keeps optional ones nullable."""
+    schema = strict_json_schema(RouterDecision)
+    assert schema["additionalProperties"] is False
+    assert schema["required"] == list(RouterDecision.model_fields)
+    assert not any("default" in field for field in schema["properties"].values())
+    assert {"type": "null"} in schema["properties"]["response"]["anyOf"]
+
+def test_route_uses_schema_instruction_by_default():
+    """Test that providers without a native JSON mode get the schema in the prompt."""
+    llm = ScriptedLLM(json.dumps({"type": "CHAT", "response": "Hi there!"}))
+    decision = route(llm, "hello, what can you do")
+    assert decision.type == "CHAT" and decision.response == "Hi there!"
+    assert '"search_queries"' in llm.prompts[0]
+
+class RecordingCollector:
+    use_deep_research = False
+
+    def __init__(self):
+        self.plans = []
+
+    def plan(self, query, history=[], status_callback=None):
+        raise AssertionError("the router already planned the searches")
+
+    def collect(self, query, history=[], status_callback=None, plan=None):
+        self.plans.append(plan)
+        return {"context": "", "passages": [], "sources": [], "documents": []}
+
+def test_fused_router_replaces_classify_and_plan_calls(tmp_path):
+    """Test that one router call drives classification, planning and output formats."""
+    agent = ResearchAgent()
+    agent.intent_classifier = None
+    agent.router_llm = ScriptedLLM(json.dumps(RESEARCH))
+    agent.classifier_llm = ScriptedLLM()
+    agent.collector = RecordingCollector()
+    agent.analyzer.llm = ScriptedLLM("# Report")
+    agent.analyzer.output_dir = str(tmp_path)
+    agent.summary_llm = ScriptedLLM("Summary.")
+    agent.tts_tool.speak = lambda text: b""
+
+    result = agent.process_query("Give me the latest fusion records as a report")
+    assert agent.collector.plans == [{"search_queries": RESEARCH["search_queries"], "look_for_documents": True}]
+    assert agent.classifier_llm.prompts == []
+    assert result["docx_path"]
+
+    # Malformed router output falls back to the separate classifier
+    agent.router_llm = ScriptedLLM("not json")
+    agent.classifier_llm = ScriptedLLM(json.dumps({"type": "CHAT", "response": "Hello!"}))
+    assert agent.process_query("tell me something fun")["answer"] == "Hello!"
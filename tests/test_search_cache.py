@@ -0,0 +1,64 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.cache.store import SQLiteCache
+from research_agent.core.search.base import BaseSearchProvider
+from research_agent.core.search.cached_provider import CachedSearchProvider
+from research_agent.config.settings import settings
+
+class CountingProvider(BaseSearchProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def search(self, query):
+        self.calls += 1
+        return [{"title": query, "url": "http://example.com", "content": "text"}]
+
+def test_cached_search_hits_on_normalized_query(tmp_path):
+    """Test that repeated queries are served from the cache."""
+    provider = CountingProvider()
+    cached = CachedSearchProvider(provider, cache=SQLiteCache(str(tmp_path / "cache.sqlite3")))
+
+    first = cached.search("Quantum  Computing filetype:pdf")
+    second = cached.search("quantum computing FILETYPE:PDF ")
+    assert first == second
+    assert provider.calls == 1
+    assert cached.stats()["hits"] == 1
+    assert cached.stats()["misses"] == 1
+
+def test_ttl_classes():
+    """Test that volatile queries get the short TTL."""
+    cached = CachedSearchProvider(CountingProvider(), cache=SQLiteCache(":memory:"))
+    assert cached.ttl_for("Latest stock price of Apple") == settings.SEARCH_CACHE_TTL_SHORT
+    assert cached.ttl_for("History of Rome") == settings.SEARCH_CACHE_TTL_LONG
+
+def test_cache_lru_eviction_and_expiry(tmp_path):
+    """Test that the least recently used entry is evicted and expired entries miss."""
+    cache = SQLiteCache(str(tmp_path / "lru.sqlite3"), max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    assert cache.get("a") == 1  # 'b' is now least recently used
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.set("old", 4, ttl=-1)
+    assert cache.get("old") is None
+    assert cache.get("old", allow_stale=True) == 4
+
+class FailingProvider(BaseSearchProvider):
+    def search(self, query):
+        raise RuntimeError("primary down")
+
+def test_secondary_hedge_wins_are_not_cached():
+    """Test that results from the hedge secondary are returned but not stored under the primary's key."""
+    from research_agent.core.search.hedged_provider import HedgedSearchProvider
+    secondary = CountingProvider()
+    cached = CachedSearchProvider(HedgedSearchProvider(FailingProvider(), secondary), cache=SQLiteCache(":memory:"))
+
+    assert cached.search("deep topic")[0]["title"] == "deep topic"
+    assert cached.search("deep topic")[0]["title"] == "deep topic"
+    assert secondary.calls == 2
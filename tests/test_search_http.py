@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from research_agent.core.search.exa_provider import ExaSearchProvider
+from research_agent.core.search.serper_provider import SerperProvider
+
+class SerperStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        SerperStandIn.connections += 1
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"organic": [{"title": payload["q"], "link": "http://example.com", "snippet": "text"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class ExaStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        ExaStandIn.requests.append((self.path, payload))
+        if self.path == "/search":
+            results = [{"id": f"id{i}", "title": f"Result {i}", "url": f"http://example.com/{i}",
+                        "summary": f"Summary {i}", "highlights": [f"Highlight {i}"]} for i in range(6)]
+        else:
+            limit = payload["text"]["maxCharacters"]
+            results = [{"id": i, "text": ("Full text " + i + " ") * 1000} for i in payload["ids"]]
+            results = [dict(r, text=r["text"][:limit]) for r in results]
+        body = json.dumps({"results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_exa_bounded_mode_fetches_full_text_incrementally():
+    """Test that bounded mode requests highlights first, then full text for top results within budget."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ExaStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        provider = ExaSearchProvider()
+        provider.api_key = "test-key"
+        provider.base_url = f"http://127.0.0.1:{server.server_port}/search"
+        provider.contents_url = f"http://127.0.0.1:{server.server_port}/contents"
+        provider.content_mode = "bounded"
+        provider.max_chars_per_result = 1000
+        provider.full_text_results = 5
+        provider.full_text_char_budget = 3000
+
+        ExaStandIn.requests = []
+        results = provider.search("fusion")
+        search_payload = ExaStandIn.requests[0][1]
+        assert "text" not in search_payload["contents"]
+        assert [p["ids"] for path, p in ExaStandIn.requests[1:]] == [["id0", "id1"], ["id2", "id3"]]
+        assert sum(len(r["content"]) for r in results[:4]) <= 3000
+        assert results[0]["content"].startswith("Full text id0")
+        assert results[5]["content"] == "Summary 5\nHighlight 5"
+    finally:
+        server.shutdown()
+
+def test_serper_reuses_pooled_connection_sync_and_async():
+    """Test that sync searches share one keep-alive connection and asearch works."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SerperStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        provider = SerperProvider()
+        provider.api_key = "test-key"
+        provider.base_url = f"http://127.0.0.1:{server.server_port}/search"
+
+        SerperStandIn.connections = 0
+        for q in ["a", "b", "c"]:
+            assert provider.search(q)[0]["title"] == q
+        assert SerperStandIn.connections == 1
+
+        async def run():
+            return await asyncio.gather(provider.asearch("x"), provider.asearch("y"))
+        results = asyncio.run(run())
+        assert [r[0]["title"] for r in results] == ["x", "y"]
+    finally:
+        server.shutdown()